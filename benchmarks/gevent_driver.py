@@ -0,0 +1,96 @@
+'''
+	Benchmark of the gevent stream handler (`CurlStreamHandlerGevent`), at many concurrent transfers.
+
+	Counts the greenlet switches and the CPU time of the client process, while N greenlets send
+	requests at once to a local gevent server (run in a subprocess, so it's not counted).
+
+	Usage:
+
+	python benchmarks/gevent_driver.py --concurrency 5000 --backend curl_cffi
+'''
+import argparse
+import multiprocessing
+import resource
+import time
+
+import gevent
+import greenlet
+import requests
+
+from curl_adapter import CurlCffiAdapter, PyCurlAdapter
+from curl_adapter.stream.handler.gevent_handler import CurlStreamHandlerGevent
+
+
+def run_server(port_queue, delay):
+	from gevent.pywsgi import WSGIServer
+
+	def app(environ, start_response):
+		# Hold the response a bit, so the transfers overlap
+		gevent.sleep(delay)
+		start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", "2")])
+		return [b"ok"]
+
+	server = WSGIServer(("127.0.0.1", 0), app, log=None, backlog=8192)
+	server.init_socket()
+	port_queue.put(server.server_port)
+	server.serve_forever()
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--concurrency", type=int, default=5000)
+	parser.add_argument("--backend", choices=["curl_cffi", "pycurl"], default="curl_cffi")
+	parser.add_argument("--delay", type=float, default=0.5, help="server response delay, in seconds")
+	args = parser.parse_args()
+
+	soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+	if soft < args.concurrency * 2 + 100:
+		resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, args.concurrency * 2 + 100), hard))
+
+	# Not forked, the gevent hub of this process is already running
+	context = multiprocessing.get_context("spawn")
+	port_queue = context.Queue()
+	server = context.Process(target=run_server, args=(port_queue, args.delay), daemon=True)
+	server.start()
+	url = f"http://127.0.0.1:{port_queue.get(timeout=10)}/"
+
+	adapter_class = CurlCffiAdapter if args.backend == "curl_cffi" else PyCurlAdapter
+	adapter = adapter_class(stream_handler=CurlStreamHandlerGevent, handle_pool_size=args.concurrency)
+
+	errors = []
+
+	def fetch():
+		try:
+			r = adapter.send(requests.Request("GET", url).prepare(), timeout=30)
+			assert r.content == b"ok"
+		except Exception as e:
+			errors.append(e)
+
+	switches = 0
+
+	def trace(event, args):
+		nonlocal switches
+		if event in ("switch", "throw"):
+			switches += 1
+
+	previous_trace = greenlet.settrace(trace)
+	cpu_start, wall_start = time.process_time(), time.perf_counter()
+
+	gevent.joinall([gevent.spawn(fetch) for _ in range(args.concurrency)])
+
+	cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+	greenlet.settrace(previous_trace)
+
+	server.terminate()
+
+	print(f"backend:            {args.backend}")
+	print(f"transfers:          {args.concurrency} ({len(errors)} errors)")
+	print(f"wall time:          {wall:.2f}s")
+	print(f"cpu time:           {cpu:.2f}s")
+	print(f"greenlet switches:  {switches} ({switches / args.concurrency:.1f} per transfer)")
+	if errors:
+		print(f"first error:        {errors[0]!r}")
+
+
+if __name__ == "__main__":
+	main()
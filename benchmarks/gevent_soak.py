@@ -0,0 +1,106 @@
+'''
+	Soak test of the gevent stream handler (`CurlStreamHandlerGevent`): sends many requests to a local
+	gevent server (in a subprocess) and checks that the open fds and the memory of the client stay stable.
+
+	Linux only (reads /proc/self).
+
+	Usage:
+
+	python benchmarks/gevent_soak.py --requests 1000000 --concurrency 200 --backend curl_cffi
+'''
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+
+import gevent
+import gevent.pool
+import requests
+
+from curl_adapter import CurlCffiAdapter, PyCurlAdapter
+from curl_adapter.stream.handler.gevent_handler import CurlStreamHandlerGevent
+
+from gevent_driver import run_server
+
+
+def open_fds() -> int:
+	return len(os.listdir("/proc/self/fd"))
+
+
+def rss_mb() -> float:
+	with open("/proc/self/statm") as f:
+		return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--requests", type=int, default=1_000_000)
+	parser.add_argument("--concurrency", type=int, default=200)
+	parser.add_argument("--backend", choices=["curl_cffi", "pycurl"], default="curl_cffi")
+	parser.add_argument("--rotate-every", type=int, default=None, help="rotate the multi handles every N requests")
+	parser.add_argument("--max-connects", type=int, default=None)
+	parser.add_argument("--samples", type=int, default=20)
+	parser.add_argument("--max-fd-growth", type=int, default=16)
+	parser.add_argument("--max-rss-growth", type=float, default=32.0, help="in MB")
+	args = parser.parse_args()
+
+	class StreamHandler(CurlStreamHandlerGevent):
+		rotate_every = args.rotate_every
+		max_connects = args.max_connects
+
+	context = multiprocessing.get_context("spawn")
+	port_queue = context.Queue()
+	server = context.Process(target=run_server, args=(port_queue, 0), daemon=True)
+	server.start()
+	url = f"http://127.0.0.1:{port_queue.get(timeout=10)}/"
+
+	adapter_class = CurlCffiAdapter if args.backend == "curl_cffi" else PyCurlAdapter
+	adapter = adapter_class(stream_handler=StreamHandler, handle_pool_size=args.concurrency)
+
+	errors = 0
+
+	def fetch(_):
+		nonlocal errors
+		try:
+			r = adapter.send(requests.Request("GET", url).prepare(), timeout=30)
+			if r.content != b"ok":
+				errors += 1
+		except Exception:
+			errors += 1
+
+	pool = gevent.pool.Pool(args.concurrency)
+	sample_every = max(args.requests // args.samples, 1)
+	samples = []
+	start = time.perf_counter()
+
+	for done, _ in enumerate(pool.imap_unordered(fetch, range(args.requests)), 1):
+		if done % sample_every == 0:
+			samples.append((done, open_fds(), rss_mb()))
+			print(f"{done:>10} requests  {done / (time.perf_counter() - start):8.0f} req/s  fds: {samples[-1][1]:>5}  rss: {samples[-1][2]:7.1f} MB  errors: {errors}", flush=True)
+
+	server.terminate()
+
+	if len(samples) < 2:
+		print("Not enough samples.")
+		return 1
+
+	# The fds go up & down with the connections in flight, a leak shows as growth from the
+	# first half of the run to the second one
+	half = len(samples) // 2
+	fd_growth = statistics.median(fds for _, fds, _ in samples[half:]) - statistics.median(fds for _, fds, _ in samples[:half])
+	rss_growth = statistics.median(rss for _, _, rss in samples[half:]) - statistics.median(rss for _, _, rss in samples[:half])
+
+	print(f"fd growth: {fd_growth:.0f} (max {max(fds for _, fds, _ in samples)}), rss growth: {rss_growth:.1f} MB, errors: {errors}")
+
+	if errors or fd_growth > args.max_fd_growth or rss_growth > args.max_rss_growth:
+		print("UNSTABLE")
+		return 1
+
+	print("STABLE")
+	return 0
+
+
+if __name__ == "__main__":
+	sys.exit(main())
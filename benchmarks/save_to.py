@@ -0,0 +1,105 @@
+'''
+	Benchmark of saving a large body to a file: `iter_content` + `file.write`, against the
+	`X-Curl-Adapter-Save-To` sink (written straight from curl's write callback), and the curl
+	command line tool when it's installed.
+
+	The body is served by a local server in a subprocess, so it's not counted in the CPU time.
+
+	Usage:
+
+	python benchmarks/save_to.py --size 1024 --backend curl_cffi
+'''
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+
+import requests
+
+from curl_adapter import CurlCffiAdapter, PyCurlAdapter
+
+
+def run_server(port_queue, size):
+	from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+	block = b"x" * (1024 * 1024)
+
+	class QuietHandler(WSGIRequestHandler):
+		def log_message(self, *args):
+			pass
+
+	def app(environ, start_response):
+		start_response("200 OK", [("Content-Type", "application/octet-stream"), ("Content-Length", str(size))])
+		return (block[:min(len(block), size - offset)] for offset in range(0, size, len(block)))
+
+	server = make_server("127.0.0.1", 0, app, handler_class=QuietHandler)
+	port_queue.put(server.server_port)
+	server.serve_forever()
+
+
+def save_iter_content(session: requests.Session, url: str, path: str):
+	with session.get(url, stream=True) as r, open(path, "wb") as f:
+		for chunk in r.iter_content(64 * 1024):
+			f.write(chunk)
+
+
+def save_sink(session: requests.Session, url: str, path: str):
+	session.get(url, headers={"X-Curl-Adapter-Save-To": path})
+
+
+def save_curl_cli(session: requests.Session, url: str, path: str):
+	subprocess.run(["curl", "-s", "-o", path, url], check=True)
+
+
+def cpu_time() -> float:
+	'''
+		CPU time of this process, and of the curl tool once it's exited (the server is still running, so it's not included).
+	'''
+	children = resource.getrusage(resource.RUSAGE_CHILDREN)
+	return time.process_time() + children.ru_utime + children.ru_stime
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--size", type=int, default=1024, help="body size, in MB")
+	parser.add_argument("--backend", choices=["curl_cffi", "pycurl"], default="curl_cffi")
+	args = parser.parse_args()
+
+	size = args.size * 1024 * 1024
+
+	context = multiprocessing.get_context("spawn")
+	port_queue = context.Queue()
+	server = context.Process(target=run_server, args=(port_queue, size), daemon=True)
+	server.start()
+	url = f"http://127.0.0.1:{port_queue.get(timeout=10)}/"
+
+	adapter_class = CurlCffiAdapter if args.backend == "curl_cffi" else PyCurlAdapter
+	session = requests.Session()
+	session.mount("http://", adapter_class())
+
+	modes = [("iter_content", save_iter_content), ("save_to", save_sink)]
+	if shutil.which("curl"):
+		modes.append(("curl -o", save_curl_cli))
+
+	with tempfile.TemporaryDirectory() as directory:
+		path = os.path.join(directory, "body")
+
+		for name, save in modes:
+			cpu_start, start = cpu_time(), time.perf_counter()
+			save(session, url, path)
+			cpu, elapsed = cpu_time() - cpu_start, time.perf_counter() - start
+
+			assert os.path.getsize(path) == size
+			os.remove(path)
+
+			print(f"{name:<13} throughput: {size / elapsed / 1024 / 1024:7.0f} MB/s   cpu: {cpu:6.2f}s")
+
+	server.terminate()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,97 @@
+'''
+	Benchmark of the per-request option setup: small GET requests on a reused handle, with the options
+	of the handle diffed against the previous request's (`diff_curl_options`, the default) or reset & set
+	again each time. Prints the curl calls made per request by `apply_curl_options`, and the time spent
+	preparing the handle (`prepare_curl`) & sending the whole request.
+
+	The server runs in a subprocess, so it's not counted in the CPU time.
+
+	Usage:
+
+	python benchmarks/setopt_calls.py --requests 2000 --backend curl_cffi
+'''
+import argparse
+import multiprocessing
+import time
+
+import requests
+
+from curl_adapter import CurlCffiAdapter, PyCurlAdapter
+
+
+def run_server(port_queue):
+	from http.server import BaseHTTPRequestHandler, HTTPServer
+
+	class Handler(BaseHTTPRequestHandler):
+		protocol_version = "HTTP/1.1"
+		disable_nagle_algorithm = True
+
+		def log_message(self, *args):
+			pass
+
+		def do_GET(self):
+			self.send_response(200)
+			self.send_header("Content-Length", "2")
+			self.end_headers()
+			self.wfile.write(b"ok")
+
+	server = HTTPServer(("127.0.0.1", 0), Handler)
+	port_queue.put(server.server_port)
+	server.serve_forever()
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--requests", type=int, default=2000)
+	parser.add_argument("--backend", choices=["curl_cffi", "pycurl"], default="curl_cffi")
+	args = parser.parse_args()
+
+	context = multiprocessing.get_context("spawn")
+	port_queue = context.Queue()
+	server = context.Process(target=run_server, args=(port_queue,), daemon=True)
+	server.start()
+	url = f"http://127.0.0.1:{port_queue.get(timeout=10)}/"
+
+	adapter_class = CurlCffiAdapter if args.backend == "curl_cffi" else PyCurlAdapter
+
+	class Adapter(adapter_class):
+		calls = 0
+		prepare_time = 0.0
+
+		def apply_curl_options(self, curl, options):
+			count = super().apply_curl_options(curl, options)
+			self.calls += count
+			return count
+
+		def prepare_curl(self, *args, **kwargs):
+			start = time.process_time()
+			try:
+				return super().prepare_curl(*args, **kwargs)
+			finally:
+				self.prepare_time += time.process_time() - start
+
+	for diff_curl_options in (False, True):
+		adapter = Adapter(reuse_curl_handle=True, diff_curl_options=diff_curl_options)
+		session = requests.Session()
+		session.mount("http://", adapter)
+		session.get(url, timeout=10)
+		adapter.calls, adapter.prepare_time = 0, 0.0
+
+		cpu_start = time.process_time()
+		for i in range(args.requests):
+			session.get(url, params={"i": i}, timeout=10)
+		cpu = time.process_time() - cpu_start
+
+		print(
+			f"diff_curl_options={diff_curl_options!s:<5}  "
+			f"calls/request: {adapter.calls / args.requests:5.1f}   "
+			f"prepare: {adapter.prepare_time / args.requests * 1e6:6.1f} us   "
+			f"request: {cpu / args.requests * 1e6:6.1f} us"
+		)
+		adapter.close()
+
+	server.terminate()
+
+
+if __name__ == "__main__":
+	main()
@@ -0,0 +1,126 @@
+'''
+	Benchmark of the body read path: stream handler -> `CurlStreamResponse` -> requests.
+
+	The handler is fed the same 16 KB chunk object over and over (as curl's write callback would hand
+	them over), so every byte allocated while reading is a copy made by the read path. The allocated
+	bytes are measured with tracemalloc (the peak of each read call), then the throughput without it.
+
+	Usage:
+
+	python benchmarks/stream_copies.py --size 1024 --read-size 65536
+'''
+import argparse
+import time
+import tracemalloc
+
+import curl_cffi
+import requests
+from urllib3._collections import HTTPHeaderDict
+
+from curl_adapter.stream.handler.base import CurlStreamHandlerBase, QueueBreakRead
+from curl_adapter.stream.response import CurlStreamResponse
+
+CHUNK = b"x" * 16384
+
+
+class SyntheticStreamHandler(CurlStreamHandlerBase):
+
+	def __init__(self, size: int):
+		super().__init__(curl_cffi.Curl())
+		self._remaining = size
+		self.perform_finished.set()
+		self.initialized.set()
+
+	def _dequeue_chunks(self):
+		if self._remaining <= 0:
+			if self._remaining == 0:
+				self._remaining = -1
+				return None
+			raise QueueBreakRead()
+
+		chunk = CHUNK if self._remaining >= len(CHUNK) else CHUNK[:self._remaining]
+		self._remaining -= len(chunk)
+		return chunk
+
+
+def make_response(size: int) -> requests.Response:
+	request = requests.Request("GET", "http://localhost/").prepare()
+
+	response = requests.Response()
+	response.status_code = 200
+	response.raw = CurlStreamResponse(
+		SyntheticStreamHandler(size),
+		request=request,
+		url=request.url,
+		method="GET",
+		headers=HTTPHeaderDict({"Content-Length": str(size)}),
+		header_list=[b"HTTP/1.1 200 OK", b"Content-Length: %d" % size],
+		status=200,
+	)
+	return response
+
+
+def iter_reads(response: requests.Response, mode: str, read_size: int):
+	if mode == "read":
+		# The whole body at once
+		yield response.raw.read()
+	elif mode == "readinto":
+		# Into the same preallocated buffer
+		buffer = bytearray(read_size)
+		while response.raw.readinto(buffer):
+			yield buffer
+	else:
+		yield from response.iter_content(read_size)
+
+
+def measure(size: int, mode: str, read_size: int, track: bool):
+	'''
+		Returns the (allocated bytes, seconds) to read a body of `size` bytes.
+	'''
+	reads = iter_reads(make_response(size), mode, read_size)
+	allocated = 0
+
+	if track:
+		tracemalloc.start()
+
+	start = time.perf_counter()
+	while True:
+		if track:
+			current_before, _ = tracemalloc.get_traced_memory()
+			tracemalloc.reset_peak()
+
+		data = next(reads, None)
+		if data is None:
+			break
+
+		if track:
+			# Includes the returned data, when it's a new object
+			_, peak = tracemalloc.get_traced_memory()
+			allocated += peak - current_before
+		del data
+
+	elapsed = time.perf_counter() - start
+
+	if track:
+		tracemalloc.stop()
+
+	return allocated, elapsed
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--size", type=int, default=1024, help="body size, in MB")
+	parser.add_argument("--read-size", type=int, default=65536, help="iter_content chunk size, readinto buffer size")
+	args = parser.parse_args()
+
+	size = args.size * 1024 * 1024
+
+	for mode in ("iter_content", "read", "readinto"):
+		allocated, _ = measure(size, mode, args.read_size, track=True)
+		_, elapsed = measure(size, mode, args.read_size, track=False)
+
+		print(f"{mode:<13} copied bytes per body byte: {allocated / size:5.2f}   throughput: {size / elapsed / 1024 / 1024:8.0f} MB/s")
+
+
+if __name__ == "__main__":
+	main()
@@ -8,8 +8,10 @@ A curl HTTP adapter for requests library
 
 __all__ = [
     "CurlCffiAdapter",
+    "CurlCffiRotatingAdapter",
     "PyCurlAdapter",
     "CurlInfo",
+    "CurlMultipart",
     "get_curl_info"
 ]
 
@@ -17,6 +19,8 @@ __all__ = [
 from .base_adapter import CurlInfo, get_curl_info
 from .curl_cffi import CurlCffiAdapter
 from .pycurl import PyCurlAdapter
+from .multipart import CurlMultipart
+from .rotation import CurlCffiRotatingAdapter
 from importlib import metadata
 
 __title__ = "curl_adapter"
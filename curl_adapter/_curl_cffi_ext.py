@@ -0,0 +1,89 @@
+'''
+	libcurl functions that curl_cffi's own bindings don't expose.
+
+	curl_cffi ships libcurl-impersonate inside its `_wrapper` extension module, and the library exports
+	the complete libcurl API. We load the same library again in ABI mode and declare what we need.
+'''
+import cffi
+
+import curl_cffi._wrapper
+from curl_cffi._wrapper import ffi
+
+ext_ffi = cffi.FFI()
+ext_ffi.cdef("""
+	typedef void CURLSH;
+
+	CURLSH *curl_share_init(void);
+	int curl_share_setopt(CURLSH *share, int option, ...);
+	int curl_share_cleanup(CURLSH *share);
+
+	typedef void curl_mime;
+	typedef void curl_mimepart;
+	typedef int64_t curl_off_t;
+
+	curl_mime *curl_mime_init(void *easy);
+	void curl_mime_free(curl_mime *mime);
+	curl_mimepart *curl_mime_addpart(curl_mime *mime);
+	int curl_mime_name(curl_mimepart *part, const char *name);
+	int curl_mime_filename(curl_mimepart *part, const char *filename);
+	int curl_mime_type(curl_mimepart *part, const char *mimetype);
+	int curl_mime_data(curl_mimepart *part, const char *data, size_t datasize);
+	int curl_mime_filedata(curl_mimepart *part, const char *filename);
+	int curl_mime_data_cb(
+		curl_mimepart *part, 
+		curl_off_t datasize, 
+		size_t (*readfunc)(char *buffer, size_t size, size_t nitems, void *arg),
+		int (*seekfunc)(void *arg, curl_off_t offset, int origin),
+		void (*freefunc)(void *arg),
+		void *arg
+	);
+	int curl_mime_headers(curl_mimepart *part, void *headers, int take_ownership);
+
+	struct curl_blob {
+		void *data;
+		size_t len;
+		unsigned int flags;
+	};
+
+	typedef int (*curl_ssls_export_cb)(
+		void *handle,
+		void *userptr,
+		const char *session_key,
+		const unsigned char *shmac,
+		size_t shmac_len,
+		const unsigned char *sdata,
+		size_t sdata_len,
+		curl_off_t valid_until,
+		int ietf_tls_id,
+		const char *alpn,
+		size_t earlydata_max
+	);
+	int curl_easy_ssls_export(void *handle, curl_ssls_export_cb export_fn, void *userptr);
+	int curl_easy_ssls_import(
+		void *handle, 
+		const char *session_key, 
+		const unsigned char *shmac, 
+		size_t shmac_len, 
+		const unsigned char *sdata, 
+		size_t sdata_len
+	);
+
+	void *curl_slist_append(void *list, const char *string);
+	void curl_slist_free_all(void *list);
+""")
+
+ext_lib = ext_ffi.dlopen(curl_cffi._wrapper.__file__)
+
+
+def from_curl_cffi_pointer(pointer) -> "ext_ffi.CData":
+	'''
+		Convert a pointer of curl_cffi's `ffi` (e.g. `Curl._curl`) into a `void *` usable with `ext_lib`.
+	'''
+	return ext_ffi.cast("void *", int(ffi.cast("uintptr_t", pointer)))
+
+
+def to_curl_cffi_pointer(pointer) -> "ffi.CData":
+	'''
+		Convert a pointer of `ext_ffi` into a `void *` usable with curl_cffi's `lib`.
+	'''
+	return ffi.cast("void *", int(ext_ffi.cast("uintptr_t", pointer)))
@@ -1,12 +1,14 @@
+import asyncio
 from concurrent.futures import ThreadPoolExecutor
+import contextlib
 from io import BytesIO
 import math
-import os
 import re
 import threading
 import time
 import traceback
 from typing import TypedDict
+import weakref
 import typing
 import warnings
 
@@ -30,7 +32,7 @@ from requests.compat import urlparse
 from requests.structures import CaseInsensitiveDict
 from requests.cookies import extract_cookies_to_jar
 from requests.adapters import BaseAdapter
-from requests.models import Response
+from requests.models import Response, REDIRECT_STATI
 from requests.exceptions import (
 	RequestException,
 	ConnectionError,
@@ -54,7 +56,15 @@ from curl_cffi.curl import CurlInfo as CurlInfoOpt, CurlOpt, CurlError
 from curl_cffi.const import CurlECode, CurlHttpVersion
 
 from .stream.handler import CurlStreamHandler, CurlStreamHandlerBase
+from .stream.handler.asyncio_handler import CurlStreamHandlerAsyncio
 from .stream.response import CurlStreamResponse
+from .share import create_curl_share
+from .pool import CurlHandlePool, CurlHandleLease
+from .upload import RequestBodyReader, is_streamed_body
+from .multipart import CurlMultipart
+from .compression import compress_body, compress_chunks
+from .options import CurlOptionRecorder, apply_curl_options
+from .ca_bundle import CurlCABundle, create_ca_bundle, path_exists
 
 class CurlInfo(TypedDict):
 	local_ip: str
@@ -80,6 +90,7 @@ class CurlInfo(TypedDict):
 	pretransfer_time: int
 	namelookup_time: int
 	has_used_proxy: int
+	num_connects: int
 
 
 def get_curl_info(response: requests.Response) -> CurlInfo:
@@ -89,6 +100,8 @@ class Response(requests.Response):
 	curl_info: CurlInfo
 	wait_for_body: typing.Callable[[], None]
 
+_NO_LIMIT = contextlib.nullcontext()
+
 class BaseCurlAdapter(BaseAdapter):
 
 	def __init__(self, 
@@ -96,7 +109,19 @@ class BaseCurlAdapter(BaseAdapter):
 		debug=False, 
 		use_curl_content_decoding=False,
 		use_thread_local_curl=True,
-		stream_handler: CurlStreamHandlerBase=None
+		stream_handler: CurlStreamHandlerBase=None,
+		reuse_curl_handle=False,
+		curl_share: typing.Union[bool, typing.Iterable[str]]=False,
+		handle_pool_size: typing.Optional[int]=None,
+		handle_pool_idle_timeout: typing.Optional[float]=60.0,
+		handle_pool_timeout: typing.Optional[float]=30.0,
+		spool_threshold: typing.Optional[int]=None,
+		expect_continue_threshold: typing.Optional[int]=None,
+		expect_continue_timeout: typing.Optional[float]=None,
+		request_compression: typing.Union[str, typing.Mapping[str, str], None]=None,
+		request_compression_threshold: int=1024,
+		diff_curl_options: bool=True,
+		ca_bundle: typing.Union[bool, str, bytes, CurlCABundle, None]=None
 	):
 		self.curl_class: typing.Union[curl_cffi.Curl, pycurl.Curl] = curl_class
 		self.debug = debug
@@ -104,9 +129,83 @@ class BaseCurlAdapter(BaseAdapter):
 		
 		self.use_thread_local_curl = use_thread_local_curl
 
+		self.reuse_curl_handle = reuse_curl_handle
+		'''
+			Keep the curl handle (and its connection cache) between requests, resetting its options instead of closing it.
+		'''
+
 		self.stream_handler = (stream_handler or CurlStreamHandler)
 
-		if self.use_thread_local_curl:
+		self.spool_threshold = spool_threshold
+		'''
+			Most bytes of a response body buffered in memory, the rest is spooled to a temporary file (see `CurlStreamHandlerBase.spool_threshold`).
+		'''
+
+		self.expect_continue_threshold = expect_continue_threshold
+		'''
+			Send `Expect: 100-continue` with request bodies of this many bytes or more (or of an unknown size), so the server can 
+			reject them before they're sent. Smaller bodies never wait for it. By default, curl decides by itself.
+		'''
+
+		self.expect_continue_timeout = expect_continue_timeout
+		'''
+			Seconds to wait for the `100 Continue` response, before sending the body anyway (curl's default is 1 second).
+		'''
+
+		self.request_compression = request_compression
+		'''
+			Content-Encoding of request bodies (gzip, deflate, br or zstd), compressed as they're sent. Either one for every host, 
+			or a mapping of hostnames to encodings (with "*" for the other hosts).
+		'''
+
+		self.request_compression_threshold = request_compression_threshold
+		'''
+			Request bodies smaller than this many bytes are sent as they are (bodies of an unknown size are always compressed).
+		'''
+
+		self.diff_curl_options = diff_curl_options
+		'''
+			Keep the options of a reused handle (`reuse_curl_handle` or the handle pool) between requests, and only set the 
+			ones that changed, instead of resetting the handle and setting them all again.
+		'''
+
+		if ca_bundle and self.curl_class is pycurl.Curl:
+			raise ValueError("In-memory CA bundles aren't supported with pycurl, see `curl_adapter.ca_bundle`.")
+
+		self.ca_bundle = create_ca_bundle(ca_bundle)
+		'''
+			CA bundle loaded in memory once, and set on the handles as a blob (see `curl_adapter.ca_bundle`), for `verify=True`.
+			With it, `verify=<path>` bundles are loaded in memory too. curl_cffi only.
+		'''
+
+		self._applied_options: "weakref.WeakKeyDictionary[typing.Any, dict]" = weakref.WeakKeyDictionary()
+		'''
+			Options set on each reused handle for its last request
+		'''
+
+		self.curl_share = create_curl_share(self.curl_class, curl_share)
+		'''
+			Share handle attached to every curl handle of this adapter, see `curl_adapter.share`
+		'''
+
+		self.handle_pool: typing.Optional[CurlHandlePool] = None
+		'''
+			With `handle_pool_size`, requests check out handles from a bounded pool, instead of using thread-local handles.
+			They wait for a free one for up to `handle_pool_timeout` seconds (forever if None), then raise a `TimeoutError`.
+		'''
+
+		if handle_pool_size:
+			self.use_thread_local_curl = False
+			self.handle_pool = CurlHandlePool(
+				self.create_curl, 
+				max_size=handle_pool_size, 
+				idle_timeout=handle_pool_idle_timeout,
+				checkout_timeout=handle_pool_timeout
+			)
+			self._curl = None
+			self._stream_handler = None
+
+		elif self.use_thread_local_curl:
 			self._local = threading.local()
 			try:
 				from .stream.handler._thread_env import _THREAD_ENV
@@ -115,39 +214,176 @@ class BaseCurlAdapter(BaseAdapter):
 					self._local = gevent_local()
 			except Exception:
 				pass
-			self._local.curl = self.curl_class()
+			self._local.curl = self.create_curl()
+			self._local.stream_handler = None
 		else:
-			self._curl = self.curl_class()
+			self._curl = self.create_curl()
+			self._stream_handler = None
 
-		if self.debug:
-			self.enable_debug()
+		self._batch_local = threading.local()
+		'''
+			Per-thread event loop running the `send_many` batches
+		'''
+
+		self.handle_pool_idle_timeout = handle_pool_idle_timeout
+
+		self._loop_handle_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CurlHandlePool]" = weakref.WeakKeyDictionary()
+		'''
+			Without `handle_pool_size`, the handles of `asend`, kept for each event loop
+		'''
+		self._loop_handle_pools_lock = threading.Lock()
+
+	loop_handle_pool_size: int = 10
+	'''
+		Most handles kept for each event loop by `asend` without a handle pool. Past that many concurrent transfers, 
+		the others get a handle of their own, closed afterwards.
+	'''
+
+	def create_curl(self) -> typing.Union[curl_cffi.Curl, pycurl.Curl]:
+		'''
+			Open a new curl handle
+		'''
+		return self.curl_class()
 
 	@property
 	def curl(self) -> typing.Union[curl_cffi.Curl, pycurl.Curl]:
+		if self.handle_pool:
+			raise RuntimeError("There's no adapter-wide curl handle when using a handle pool.")
 		if self.use_thread_local_curl:
 			if not getattr(self._local, "curl", None):
-				self._local.curl = self.curl_class()
+				self._local.curl = self.create_curl()
 			return self._local.curl
 		return self._curl
+
+	@property
+	def last_stream_handler(self) -> typing.Optional[CurlStreamHandlerBase]:
+		'''
+			The stream handler of the last request sent with the current curl handle.
+		'''
+		if self.use_thread_local_curl:
+			return getattr(self._local, "stream_handler", None)
+		return self._stream_handler
+
+	@last_stream_handler.setter
+	def last_stream_handler(self, stream_handler: typing.Optional[CurlStreamHandlerBase]):
+		if self.use_thread_local_curl:
+			self._local.stream_handler = stream_handler
+		else:
+			self._stream_handler = stream_handler
+
+	def is_curl_busy(self) -> bool:
+		'''
+			Whether the current curl handle is still performing a transfer (e.g. an unconsumed `stream=True` response).
+		'''
+		stream_handler = self.last_stream_handler
+		return bool(stream_handler and not stream_handler.perform_finished.is_set())
 	
 	def reset_curl(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl, None] = None):
 		'''
-			Close current handle and open a new curl handle
+			Close current handle and open a new curl handle.
+
+			With `reuse_curl_handle`, the handle is reset with `curl_easy_reset` instead, so the
+			connection, DNS & TLS session caches survive. A handle that's still busy is left to
+			its response, and a new one is opened.
 		'''
 		if curl is None:
 			curl = self.curl
-		curl.close()
+
+		if self.reuse_curl_handle:
+			if not self.is_curl_busy():
+				self.clean_curl_options(curl)
+				return curl
+		else:
+			curl.close()
+
+		self.last_stream_handler = None
 
 		if self.use_thread_local_curl:
-			self._local.curl = self.curl_class()
+			self._local.curl = self.create_curl()
 			return self._local.curl
 		else:
-			self._curl = self.curl_class()
+			self._curl = self.create_curl()
 			return self._curl
 
-	def enable_debug(self):
+	volatile_curl_options = frozenset({
+		CurlOpt.POSTFIELDS,
+		CurlOpt.READFUNCTION,
+		CurlOpt.READDATA,
+		CurlOpt.SEEKFUNCTION,
+		CurlOpt.SEEKDATA,
+		CurlOpt.HTTPPOST,
+		CurlOpt.MIMEPOST,
+		CurlOpt.DEBUGFUNCTION,
+	})
+	'''
+		Options set for every request even when their value hasn't changed: the body & the callbacks, which belong to a single request.
+	'''
+
+	def reset_curl_options(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl]):
+		'''
+			Reset all options of a handle (`curl_easy_reset`), keeping its connection cache.
+		'''
+		curl.reset()
+		self._applied_options.pop(curl, None)
+
+	def clean_curl_options(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl]):
+		'''
+			Get a reused handle ready for its next request. With `diff_curl_options` its options are kept, 
+			to be compared with the next ones (see `apply_curl_options`), otherwise they're all reset.
+		'''
+		if self.diff_curl_options and curl in self._applied_options:
+			self.release_curl_buffers(curl)
+		else:
+			self.reset_curl_options(curl)
+
+	def release_curl_buffers(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl]):
+		'''
+			Drop what a handle holds for its last request only, without touching its options.
+		'''
+		pass
+
+	def apply_curl_options(
+		self, 
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl], 
+		options: typing.Dict[typing.Hashable, typing.Tuple[str, tuple]]
+	) -> int:
+		'''
+			Set the options recorded for a request on its handle. If every option of the handle is set for the request 
+			too, only the ones with a different value (and the new & volatile ones) are set, otherwise the handle is reset first.
+
+			Returns the number of calls made.
+		'''
+		previous = self._applied_options.get(curl) if self.diff_curl_options else None
+
+		if previous is not None and previous.keys() <= options.keys():
+			calls = [
+				call for option, call in options.items()
+				if option in self.volatile_curl_options or option not in previous or previous[option] != call
+			]
+		else:
+			if previous is not None:
+				self.reset_curl_options(curl)
+			if self.curl_share:
+				self.curl_share.attach(curl)
+			calls = options.values()
+
+		try:
+			count = apply_curl_options(curl, calls)
+		except Exception:
+			# Unknown state, it's reset next time
+			self._applied_options.pop(curl, None)
+			raise
+
+		if self.diff_curl_options:
+			self._applied_options[curl] = options
+		return count
+
+	def enable_debug(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl, CurlOptionRecorder, None] = None):
+		'''
+			Make a handle (the current one by default) print what it does. Set for every request by `prepare_curl`.
+		'''
 		if self.debug:
-			self.curl.setopt(CurlOpt.VERBOSE, 1)
+			(self.curl if curl is None else curl).setopt(CurlOpt.VERBOSE, 1)
 		
 	def cert_verify(self, curl, url: str, verify: bool, cert):
 		"""
@@ -158,12 +394,17 @@ class BaseCurlAdapter(BaseAdapter):
 			if verify is True:
 				curl.setopt(CurlOpt.SSL_VERIFYPEER, 1)
 				curl.setopt(CurlOpt.SSL_VERIFYHOST, 1)
+				if self.ca_bundle:
+					curl.record(CurlOpt.CAINFO_BLOB, self.ca_bundle.refreshed().attach)
 			elif isinstance(verify, str):
-				if not os.path.exists(verify):
+				if not path_exists(verify):
 					raise OSError(
 						f"Could not find a suitable TLS CA certificate bundle at: {verify}"
 					)
-				curl.setopt(CurlOpt.CAINFO, verify)
+				if self.ca_bundle:
+					curl.record(CurlOpt.CAINFO_BLOB, CurlCABundle.from_file(verify).attach)
+				else:
+					curl.setopt(CurlOpt.CAINFO, verify)
 			else:
 				curl.setopt(CurlOpt.SSL_VERIFYPEER, 0)
 				curl.setopt(CurlOpt.SSL_VERIFYHOST, 0)
@@ -171,16 +412,16 @@ class BaseCurlAdapter(BaseAdapter):
 			if cert:
 				if isinstance(cert, (list, tuple)) and len(cert) == 2:
 					cert_file, key_file = cert
-					if not os.path.exists(cert_file):
+					if not path_exists(cert_file):
 						raise OSError(
 							f"Could not find the TLS certificate file at: {cert_file}"
 						)
-					if not os.path.exists(key_file):
+					if not path_exists(key_file):
 						raise OSError(f"Could not find the TLS key file at: {key_file}")
 					curl.setopt(CurlOpt.SSLCERT, cert_file)
 					curl.setopt(CurlOpt.SSLKEY, key_file)
 				elif isinstance(cert, str):
-					if not os.path.exists(cert):
+					if not path_exists(cert):
 						raise OSError(
 							f"Could not find the TLS certificate file at: {cert}"
 						)
@@ -290,7 +531,8 @@ class BaseCurlAdapter(BaseAdapter):
 			"namelookup_time": self.get_curl_info(curl, CurlInfoOpt.NAMELOOKUP_TIME_T),
 
 			# Other
-			"has_used_proxy": self.get_curl_info(curl, CurlInfoOpt.USED_PROXY)
+			"has_used_proxy": self.get_curl_info(curl, CurlInfoOpt.USED_PROXY),
+			"num_connects": self.get_curl_info(curl, CurlInfoOpt.NUM_CONNECTS),
 		}
 
 		if not headers_only:
@@ -443,6 +685,9 @@ class BaseCurlAdapter(BaseAdapter):
 	def _get_request_adapter_options(self, request: requests.PreparedRequest) -> dict:
 		"""
 			Read per-request adapter flags from internal request headers.
+
+			The ones that hold for a whole redirect chain are kept on the request (`resolve_redirects` copies them
+			to the next one), they're never sent.
 		"""
 		options = {}
 
@@ -452,6 +697,20 @@ class BaseCurlAdapter(BaseAdapter):
 				"1", "true", "yes", "on"
 			)
 
+		header_value = request.headers.get("X-Curl-Adapter-Save-To")
+		if header_value:
+			options["save_to"] = str(header_value)
+
+		header_value = request.headers.get("X-Curl-Adapter-Expect-Continue-Threshold")
+		if header_value is not None:
+			header_value = str(header_value).strip().lower()
+			options["expect_continue_threshold"] = None if header_value in ("off", "none", "") else int(header_value)
+
+		header_value = request.headers.get("X-Curl-Adapter-Compress")
+		if header_value is not None:
+			header_value = str(header_value).strip().lower()
+			options["request_compression"] = None if header_value in ("off", "none", "") else header_value
+
 		return options
 	
 	def set_curl_options(self, 
@@ -462,8 +721,10 @@ class BaseCurlAdapter(BaseAdapter):
 			proxies,
 			request_adapter_options=None
 		):
-		request_adapter_options = request_adapter_options or {}
+		if request_adapter_options is None:
+			request_adapter_options = {}
 		disable_tunnel_reuse = bool(request_adapter_options.get("disable_tunnel_reuse", False))
+		save_to = request_adapter_options.get("save_to")
 		
 		if self.debug:
 			print("[DEBUG] Sending: ", url, request.headers, timeout, proxies)
@@ -503,11 +764,38 @@ class BaseCurlAdapter(BaseAdapter):
 				curl.setopt(CurlOpt.LOW_SPEED_TIME, math.ceil(timeout))
 
 		# body
-		body = b"" if not request.body else (
-			request.body.encode() if isinstance(request.body, str) else request.body
-		)
+		headers = request.headers
+		content_encoding = self.get_request_compression(request, url, request_adapter_options)
+		if content_encoding:
+			# Sent compressed, the request itself is kept as is (e.g. for redirects)
+			headers = request.headers.copy()
+			headers["Content-Encoding"] = content_encoding
+			headers.pop("Content-Length", None)
+
+		if isinstance(request.body, CurlMultipart):
+			self.set_multipart_body(curl, request, method)
+			request_adapter_options["multipart"] = request.body
+			body = None
+			body_size = -1
+		elif is_streamed_body(request.body):
+			request_adapter_options["body_reader"] = self.set_streamed_body(
+				curl, request, method, headers=headers,
+				body=compress_chunks(request.body, content_encoding) if content_encoding else None
+			)
+			body = None
+			body_size = int(headers.get("Content-Length", -1))
+		else:
+			body = b"" if not request.body else (
+				request.body.encode() if isinstance(request.body, str) else request.body
+			)
+			if content_encoding:
+				body = compress_body(body, content_encoding)
+				headers["Content-Length"] = str(len(body))
+			body_size = len(body)
 
-		if body or method in ("POST", "PUT", "PATCH"):
+		if body is None:
+			pass
+		elif body or method in ("POST", "PUT", "PATCH"):
 			curl.setopt(CurlOpt.POSTFIELDS, body)
 			# necessary if body contains '\0'
 			curl.setopt(CurlOpt.POSTFIELDSIZE, len(body))
@@ -515,19 +803,23 @@ class BaseCurlAdapter(BaseAdapter):
 				curl.setopt(CurlOpt.CUSTOMREQUEST, method)
 	
 		# headers
-		host_header = request.headers.get("host")
+		host_header = headers.get("host")
 		if host_header is not None:
 			# remove Host header if it's unnecessary, otherwise curl may get confused.
 			# Host header will be automatically added by curl if it's not present.
 			# https://github.com/lexiforest/curl_cffi/issues/119
 			parsed_url = urlparse(url)
 			if host_header == parsed_url.netloc or host_header == parsed_url.hostname:
-				request.headers.pop("Host", None)
+				headers.pop("Host", None)
 
-		request.headers.pop("Expect", None) # Never send `Expect` header. ?
+		headers.pop("Expect", None) # Never send `Expect` header. ?
 		
 		header_lines = []
-		for k, v in request.headers.items():
+		for k, v in headers.items():
+			if k.lower().startswith("x-curl-adapter-"):
+				# Adapter flags, see `_get_request_adapter_options`
+				continue
+
 			# Make Curl Headers Array
 			# Make curl always include empty headers.
 			# See: https://stackoverflow.com/a/32911474/1061155
@@ -538,6 +830,17 @@ class BaseCurlAdapter(BaseAdapter):
 				header_lines.append(f"{k};".encode())  # Add an empty valued header
 			else:
 				header_lines.append(f"{k}: {v}".encode())
+
+		# Expect: 100-continue, when it's configured (otherwise curl decides)
+		expect_continue_threshold = request_adapter_options.get("expect_continue_threshold", self.expect_continue_threshold)
+		if expect_continue_threshold is not None and body_size != 0 and (
+			body_size < 0 or body_size >= expect_continue_threshold
+		):
+			header_lines.append(b"Expect: 100-continue")
+			if self.expect_continue_timeout is not None:
+				curl.setopt(CurlOpt.EXPECT_100_TIMEOUT_MS, int(self.expect_continue_timeout * 1000))
+		elif expect_continue_threshold is not None or "expect_continue_threshold" in request_adapter_options:
+			header_lines.append(b"Expect:")  # Explictly disabled
 	
 		curl.setopt(CurlOpt.HTTPHEADER, header_lines)
 		
@@ -589,6 +892,10 @@ class BaseCurlAdapter(BaseAdapter):
 		if self.use_curl_content_decoding:
 			curl.setopt(CurlOpt.HTTP_CONTENT_DECODING, 1)
 			curl.setopt(CurlOpt.ACCEPT_ENCODING, "gzip, deflate, br, zstd")
+		elif save_to:
+			# Nothing decodes a saved body afterwards, let curl do it. The Accept-Encoding header of the request is still sent.
+			curl.setopt(CurlOpt.HTTP_CONTENT_DECODING, 1)
+			curl.setopt(CurlOpt.ACCEPT_ENCODING, "")
 		else:
 			curl.setopt(CurlOpt.HTTP_CONTENT_DECODING, 0)
 			curl.setopt(CurlOpt.HTTP_TRANSFER_DECODING, 1)
@@ -596,66 +903,158 @@ class BaseCurlAdapter(BaseAdapter):
 		# do not check max_recv_speed
 		curl.setopt(CurlOpt.MAX_RECV_SPEED_LARGE, 0)
 
+	def get_request_compression(
+		self, 
+		request: requests.PreparedRequest, 
+		url: str, 
+		request_adapter_options: dict
+	) -> typing.Optional[str]:
+		'''
+			Content-Encoding to compress the request body with, if any.
+		'''
+		if "request_compression" in request_adapter_options:
+			encoding = request_adapter_options["request_compression"]
+		elif isinstance(self.request_compression, typing.Mapping):
+			hostname = urlparse(url).hostname
+			encoding = self.request_compression.get(hostname, self.request_compression.get("*"))
+		else:
+			encoding = self.request_compression
+
+		if not encoding or not request.body or isinstance(request.body, CurlMultipart):
+			return None
+		if "Content-Encoding" in request.headers:
+			# Already encoded
+			return None
+
+		if is_streamed_body(request.body):
+			size = int(request.headers.get("Content-Length", -1))
+		else:
+			size = len(request.body)
+			if isinstance(request.body, str) and size < self.request_compression_threshold:
+				# Characters, the body is sent encoded
+				size = len(request.body.encode())
+		if 0 <= size < self.request_compression_threshold:
+			return None
+
+		return encoding
+
+	def set_multipart_body(
+		self, 
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl], 
+		request: requests.PreparedRequest, 
+		method: str
+	):
+		'''
+			Let curl encode a multipart/form-data body, reading its files as they're sent.
+		'''
+		# requests takes it as an unknown form object, curl sets these itself
+		if request.headers.get("Content-Type") == "application/x-www-form-urlencoded":
+			request.headers.pop("Content-Type")
+		request.headers.pop("Content-Length", None)
+		request.headers.pop("Transfer-Encoding", None)
+
+		request.body.attach(curl)
+
+		if method == "GET":
+			curl.setopt(CurlOpt.CUSTOMREQUEST, method)
+
+	def set_streamed_body(
+		self, 
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl], 
+		request: requests.PreparedRequest, 
+		method: str,
+		headers: typing.Optional[CaseInsensitiveDict]=None,
+		body=None
+	) -> RequestBodyReader:
+		'''
+			Send a file-like or iterator body through curl's read callback, as it's read. With a known length 
+			(Content-Length), it's given to curl, otherwise the body is sent with chunked transfer encoding.
+
+			`headers` & `body` replace the request's ones, when it's sent differently (e.g. compressed).
+		'''
+		if headers is None:
+			headers = request.headers
+
+		content_length = headers.get("Content-Length")
+		size = int(content_length) if content_length is not None else -1
+
+		if size < 0 and "Transfer-Encoding" not in headers:
+			headers["Transfer-Encoding"] = "chunked"
+
+		if method == "POST":
+			curl.setopt(CurlOpt.POSTFIELDSIZE_LARGE, size)
+		else:
+			curl.setopt(CurlOpt.UPLOAD, 1)
+			curl.setopt(CurlOpt.INFILESIZE_LARGE, size)
+			if method == "GET":
+				curl.setopt(CurlOpt.CUSTOMREQUEST, method)
+
+		body_reader = RequestBodyReader(request.body if body is None else body, debug=self.debug)
+		body_reader.attach(curl)
+		return body_reader
+
 	def send(
 		self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None
 	):
-		curl = self.reset_curl()
-		
-		self.cert_verify(curl, request.url, verify, cert)
+		if not self.handle_pool:
+			curl = self.reset_curl()
+			return self.send_with_curl(curl, request, stream, timeout, verify, cert, proxies)
 
-		url = self.request_url(request, proxies)
-		request_adapter_options = self._get_request_adapter_options(request)
+		lease = CurlHandleLease(self.handle_pool, self.handle_pool.checkout())
+		try:
+			self.clean_curl_options(lease.curl)
+			return self.send_with_curl(lease.curl, request, stream, timeout, verify, cert, proxies, lease=lease)
+		finally:
+			lease.release()
+
+	def send_with_curl(
+		self, 
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl], 
+		request: requests.PreparedRequest, 
+		stream=False, 
+		timeout=None, 
+		verify=True, 
+		cert=None, 
+		proxies=None,
+		lease: typing.Optional[CurlHandleLease]=None
+	):
+		'''
+			Send the request with a given, clean curl handle.
+
+			A pool `lease` is held by the transfer until it's finished.
+		'''
+		url, request_adapter_options = self.prepare_curl(curl, request, timeout, verify, cert, proxies)
 
-		self.set_curl_options(
-			curl,
-			request=request,
-			url=url,
-			timeout=timeout,
-			proxies=proxies,
-			request_adapter_options=request_adapter_options
-		)
 		a = time.time()
+		curl_stream = None
 		try:
-			# Save headers when received
-			header_buffer = BytesIO()
-			curl.setopt(CurlOpt.HEADERDATA, header_buffer)
-
-			# Callbacks for retrieving & saving curl info object
-			curl_info_dict: CurlInfo = {}
-
-			# Perform curl request with threading, and return body in a 'read' like class type (by simply using Curl.WRITEFUNCTION callback)
-			start_curl_stream = (
-				self.stream_handler(
-					curl_instance=curl,
-					callback_after_perform=lambda curl: curl_info_dict.update(self.parse_info(curl)),
-					timeout=timeout,
-					debug=self.debug
-				)
-			).start()
-			
-			# Headers are already available
-			curl_info_dict.update(self.parse_info(curl, headers_only=True))
+			curl_stream, header_buffer, curl_info_dict = self.create_curl_stream(
+				curl, self.stream_handler, timeout, lease, request_adapter_options.get("save_to"), request_adapter_options.get("multipart")
+			)
+			if not lease:
+				self.last_stream_handler = curl_stream
+
+			start_curl_stream = curl_stream.start()
 
 			if self.debug:
 				print("[DEBUG] Curl Start Elapsed Time: ", time.time() - a)
 
-			# Headers are available after start, parse them
-			parsed_headers = self.parse_headers(curl, header_buffer)
-
-			curl_stream_res = CurlStreamResponse(
-				url=url,
-				method=request.method.upper(),
-				request=request,
-				curl_stream_handler=start_curl_stream,
-				use_curl_content_decoding=self.use_curl_content_decoding,
-				**parsed_headers
+			# Headers are already available
+			return self.curl_response(
+				curl, start_curl_stream, request, url, header_buffer, curl_info_dict, 
+				wait_for_body=start_curl_stream._wait_for_complete_body
 			)
-
-			return self.build_response(curl, curl_stream_res, parsed_headers, request, wait_for_body=start_curl_stream._wait_for_body, curl_info_dict=curl_info_dict)
 		except OSError as e:
+			if curl_stream and e is curl_stream._sink_error:
+				# Couldn't save the body
+				raise
 			raise ConnectionError(e, request=request)
 		
 		except (CurlError, pycurl.error) as e:
+			body_reader = request_adapter_options.get("body_reader")
+			if body_reader and body_reader.error:
+				# Aborted by the request body itself
+				raise body_reader.error
 			error_to_throw = self.curl_error_map(e, has_proxy=proxies)
 			raise error_to_throw(e, request=request)
 
@@ -667,11 +1066,345 @@ class BaseCurlAdapter(BaseAdapter):
 			if self.debug:
 				print("[DEBUG] Curl Send Elapsed Time: ", time.time() - a)
 			pass
+
+	async def asend(
+		self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None
+	) -> Response:
+		'''
+			Send a request from an asyncio event loop, without blocking it.
+
+			All the transfers of a loop run on one curl multi handle, driven by the loop itself (see `CurlStreamHandlerAsyncio`).
+			Unless `stream` is set, the body has been received when this returns, and the response can be read as usual.
+			With `stream`, `await response.wait_for_body()` first, or iterate `response.raw._fp.aiter_chunks()`.
+
+			Redirects & cookies are the caller's business, like with `send()`.
+		'''
+		lease = await self._acheckout_curl()
+		try:
+			curl = lease.curl
+			self.clean_curl_options(curl)
+
+			url, request_adapter_options = self.prepare_curl(curl, request, timeout, verify, cert, proxies)
+
+			curl_stream = None
+			try:
+				curl_stream, header_buffer, curl_info_dict = self.create_curl_stream(
+					curl, CurlStreamHandlerAsyncio, timeout, lease, request_adapter_options.get("save_to"), request_adapter_options.get("multipart")
+				)
+				curl_stream.start()
+
+				await curl_stream.wait_for_headers()
+
+				response = self.curl_response(
+					curl, curl_stream, request, url, header_buffer, curl_info_dict,
+					wait_for_body=curl_stream.wait_for_body
+				)
+
+				if not stream:
+					await curl_stream.wait_for_body()
+
+				return response
+
+			except asyncio.CancelledError:
+				if curl_stream:
+					curl_stream.close()
+				raise
+
+			except OSError as e:
+				if curl_stream and e is curl_stream._sink_error:
+					raise
+				raise ConnectionError(e, request=request)
+
+			except (CurlError, pycurl.error) as e:
+				body_reader = request_adapter_options.get("body_reader")
+				if body_reader and body_reader.error:
+					raise body_reader.error
+				error_to_throw = self.curl_error_map(e, has_proxy=proxies)
+				raise error_to_throw(e, request=request)
+		finally:
+			lease.release()
+
+	def send_many(
+		self,
+		requests_list: typing.Iterable[typing.Union[requests.Request, requests.PreparedRequest]],
+		timeout=None,
+		verify=True,
+		cert=None,
+		proxies=None,
+		max_concurrency: typing.Optional[int]=10,
+		max_per_host: typing.Optional[int]=None,
+		ordered=False,
+		return_exceptions=False
+	) -> typing.Iterator[Response]:
+		'''
+			Send many requests at once from a single thread, all of them on one curl multi handle, so
+			connections are reused across the batch. Yields the responses (with their body received) as
+			they complete, or in the input order with `ordered`.
+
+			At most `max_concurrency` transfers run at once, and `max_per_host` per host.
+			A failed request raises its error (cancelling the rest), or with `return_exceptions` the error is yielded instead.
+
+			The batch runs on a private asyncio loop of the calling thread, from async code use `asend` instead.
+		'''
+		prepared_requests = [
+			request.prepare() if isinstance(request, requests.Request) else request
+			for request in requests_list
+		]
+		return self._iter_batch(
+			prepared_requests, timeout, verify, cert, proxies, max_concurrency, max_per_host, ordered, return_exceptions
+		)
+
+	def _iter_batch(
+		self, prepared_requests, timeout, verify, cert, proxies, max_concurrency, max_per_host, ordered, return_exceptions
+	) -> typing.Iterator[Response]:
+		loop = self._get_batch_loop()
+
+		concurrency = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+		host_limits: typing.Dict[str, asyncio.Semaphore] = {}
+
+		async def send_one(request: requests.PreparedRequest):
+			host_limit = None
+			if max_per_host:
+				host = urlparse(request.url).netloc
+				host_limit = host_limits.setdefault(host, asyncio.Semaphore(max_per_host))
+
+			# Wait for the host first, so a request waiting for its host doesn't hold a global slot
+			async with (host_limit or _NO_LIMIT):
+				async with (concurrency or _NO_LIMIT):
+					return await self.asend(request, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+		tasks = [loop.create_task(send_one(request)) for request in prepared_requests]
+		task_order = {task: index for index, task in enumerate(tasks)}
+		pending = set(tasks)
+		try:
+			if ordered:
+				for task in tasks:
+					loop.run_until_complete(asyncio.wait({task}))
+					pending.discard(task)
+					yield self._batch_result(task, return_exceptions)
+			else:
+				while pending:
+					done, pending = loop.run_until_complete(
+						asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+					)
+					for task in sorted(done, key=task_order.get):
+						yield self._batch_result(task, return_exceptions)
+		finally:
+			if pending:
+				for task in pending:
+					task.cancel()
+				loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+
+	def _batch_result(self, task: "asyncio.Task[Response]", return_exceptions: bool) -> typing.Union[Response, Exception]:
+		error = task.exception()
+		if error is None:
+			return task.result()
+		if return_exceptions:
+			return error
+		raise error
+
+	def _get_batch_loop(self) -> asyncio.AbstractEventLoop:
+		try:
+			asyncio.get_running_loop()
+		except RuntimeError:
+			pass
+		else:
+			raise RuntimeError("`send_many` can't run inside an event loop, use `asend` instead.")
+
+		loop = getattr(self._batch_local, "loop", None)
+		if loop is None or loop.is_closed():
+			# Kept for the next batches of this thread, along with the connections of its multi handle
+			loop = self._batch_local.loop = asyncio.new_event_loop()
+		return loop
+
+	async def _acheckout_curl(self) -> CurlHandleLease:
+		'''
+			A handle checked out from the pool without blocking the loop, or without a pool, from the handles of the loop.
+		'''
+		if not self.handle_pool:
+			loop_handle_pool = self._loop_handle_pool(asyncio.get_running_loop())
+			try:
+				return CurlHandleLease(loop_handle_pool, loop_handle_pool.checkout(blocking=False))
+			except TimeoutError:
+				return CurlHandleLease(None, self.create_curl())
+
+		try:
+			return CurlHandleLease(self.handle_pool, self.handle_pool.checkout(blocking=False))
+		except TimeoutError:
+			pass
+
+		future = asyncio.get_running_loop().run_in_executor(None, self.handle_pool.checkout)
+		try:
+			return CurlHandleLease(self.handle_pool, await asyncio.shield(future))
+		except asyncio.CancelledError:
+			# Give the handle back once the checkout is done
+			future.add_done_callback(
+				lambda f: f.cancelled() or f.exception() or self.handle_pool.checkin(f.result())
+			)
+			raise
+
+	def _loop_handle_pool(self, loop: asyncio.AbstractEventLoop) -> CurlHandlePool:
+		'''
+			The handles `asend` reuses on a loop without a handle pool, dropped along with the loop.
+		'''
+		with self._loop_handle_pools_lock:
+			loop_handle_pool = self._loop_handle_pools.get(loop)
+			if loop_handle_pool is None:
+				loop_handle_pool = self._loop_handle_pools[loop] = CurlHandlePool(
+					self.create_curl,
+					max_size=self.loop_handle_pool_size,
+					idle_timeout=self.handle_pool_idle_timeout
+				)
+			return loop_handle_pool
+
+	def prepare_curl(
+		self, 
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl], 
+		request: requests.PreparedRequest, 
+		timeout=None, 
+		verify=True, 
+		cert=None, 
+		proxies=None
+	) -> typing.Tuple[str, dict]:
+		'''
+			Set the options of a clean curl handle for the request. Returns the URL, and the per-request adapter options.
+
+			The options are recorded first, and then set by `apply_curl_options`.
+		'''
+		recorder = CurlOptionRecorder(curl)
+
+		self.enable_debug(recorder)
+		self.cert_verify(recorder, request.url, verify, cert)
+
+		url = self.request_url(request, proxies)
+		request_adapter_options = self._get_request_adapter_options(request)
+
+		self.set_curl_options(
+			recorder,
+			request=request,
+			url=url,
+			timeout=timeout,
+			proxies=proxies,
+			request_adapter_options=request_adapter_options
+		)
+
+		self.apply_curl_options(curl, recorder.options)
+		return url, request_adapter_options
+
+	def open_body_sink(
+		self, 
+		save_to: str, 
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl], 
+		header_buffer: BytesIO
+	) -> typing.Optional[typing.BinaryIO]:
+		'''
+			Open the file a body is saved to (`X-Curl-Adapter-Save-To` header), once its headers are received. 
+			Unbuffered, so each chunk goes to the file descriptor in a single write.
+
+			The body of a redirect isn't saved, it's read as usual, and the file is left for the final response.
+		'''
+		parsed_headers = self.parse_headers(curl, header_buffer)
+		if parsed_headers["status"] in REDIRECT_STATI and "Location" in parsed_headers["headers"]:
+			return None
+		return open(save_to, "wb", buffering=0)
+
+	def create_curl_stream(
+		self,
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl],
+		stream_handler: typing.Type[CurlStreamHandlerBase],
+		timeout=None,
+		lease: typing.Optional[CurlHandleLease]=None,
+		save_to: typing.Optional[str]=None,
+		multipart: typing.Optional[CurlMultipart]=None
+	) -> typing.Tuple[CurlStreamHandlerBase, BytesIO, CurlInfo]:
+		'''
+			Create the stream handler of a prepared curl handle, along with its header buffer and curl info dict.
+
+			With `save_to`, the body is written to that file instead of being read from the response (see `open_body_sink`).
+			A `multipart` body is released when the transfer is finished.
+		'''
+		# Save headers when received
+		header_buffer = BytesIO()
+		curl.setopt(CurlOpt.HEADERDATA, header_buffer)
+
+		# Callbacks for retrieving & saving curl info object
+		curl_info_dict: CurlInfo = {}
+
+		def after_perform(curl):
+			try:
+				curl_info_dict.update(self.parse_info(curl))
+			finally:
+				if multipart:
+					multipart.close()
+				if lease:
+					lease.release()
+
+		# Perform curl request with threading, and return body in a 'read' like class type (by simply using Curl.WRITEFUNCTION callback)
+		curl_stream = stream_handler(
+			curl_instance=curl,
+			callback_after_perform=after_perform,
+			timeout=timeout,
+			debug=self.debug
+		)
+		if save_to:
+			curl_stream.body_sink_opener = lambda: self.open_body_sink(save_to, curl, header_buffer)
+		if self.spool_threshold is not None:
+			curl_stream.spool_threshold = self.spool_threshold
+		if lease:
+			lease.retain()
+
+		return curl_stream, header_buffer, curl_info_dict
+
+	def curl_response(
+		self,
+		curl: typing.Union[curl_cffi.Curl, pycurl.Curl],
+		curl_stream: CurlStreamHandlerBase,
+		request: requests.PreparedRequest,
+		url: str,
+		header_buffer: BytesIO,
+		curl_info_dict: CurlInfo,
+		wait_for_body: typing.Callable
+	) -> Response:
+		'''
+			Build the response of a started curl stream, once its headers have been received.
+		'''
+		if not curl_stream.perform_finished.is_set():
+			curl_info_dict.update(self.parse_info(curl, headers_only=True))
+
+		# Headers are available after start, parse them
+		parsed_headers = self.parse_headers(curl, header_buffer)
+
+		curl_stream_res = CurlStreamResponse(
+			url=url,
+			method=request.method.upper(),
+			request=request,
+			curl_stream_handler=curl_stream,
+			use_curl_content_decoding=self.use_curl_content_decoding,
+			**parsed_headers
+		)
+
+		return self.build_response(curl, curl_stream_res, parsed_headers, request, wait_for_body=wait_for_body, curl_info_dict=curl_info_dict)
 		
 	def close(self) -> None:
 		"""Close the session."""
 		self._closed = True
-		self.curl.close()
+		if self.handle_pool:
+			self.handle_pool.close()
+		else:
+			self.curl.close()
+
+		with self._loop_handle_pools_lock:
+			loop_handle_pools = list(self._loop_handle_pools.values())
+			self._loop_handle_pools.clear()
+		for loop_handle_pool in loop_handle_pools:
+			loop_handle_pool.close()
+
+		if self.curl_share:
+			self.curl_share.close()
+
+		batch_loop = getattr(self._batch_local, "loop", None)
+		if batch_loop is not None and not batch_loop.is_running():
+			batch_loop.close()
 
 	def __enter__(self):
 		return self
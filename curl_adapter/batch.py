@@ -0,0 +1,60 @@
+import typing
+
+import requests
+from requests.cookies import extract_cookies_to_jar
+
+from .base_adapter import BaseCurlAdapter, Response
+
+
+def session_map(
+	session: requests.Session,
+	requests_list: typing.Iterable[requests.Request],
+	timeout=None,
+	verify=None,
+	cert=None,
+	proxies=None,
+	**batch_options
+) -> typing.Iterator[Response]:
+	'''
+		Send many requests at once with the curl adapter mounted on a session, see `BaseCurlAdapter.send_many`.
+
+		The requests are prepared with the session (headers, cookies, auth), and the response cookies are saved in it.
+		All the requests must go to the same curl adapter, and redirects aren't followed.
+
+		Usage:
+
+		for response in session_map(session, [requests.Request("GET", url) for url in urls], max_concurrency=50):
+			print(response.status_code)
+	'''
+	prepared_requests = [session.prepare_request(request) for request in requests_list]
+	if not prepared_requests:
+		return iter(())
+
+	adapter = session.get_adapter(prepared_requests[0].url)
+	for prepared_request in prepared_requests:
+		if session.get_adapter(prepared_request.url) is not adapter:
+			raise ValueError("All the requests must be sent by the same adapter.")
+
+	if not isinstance(adapter, BaseCurlAdapter):
+		raise TypeError("The requests must be sent by a curl adapter.")
+
+	settings = session.merge_environment_settings(
+		prepared_requests[0].url, proxies or {}, None, verify, cert
+	)
+
+	responses = adapter.send_many(
+		prepared_requests,
+		timeout=timeout,
+		verify=settings["verify"],
+		cert=settings["cert"],
+		proxies=settings["proxies"],
+		**batch_options
+	)
+
+	def _save_cookies():
+		for response in responses:
+			if isinstance(response, requests.Response):
+				extract_cookies_to_jar(session.cookies, response.request, response.raw)
+			yield response
+
+	return _save_cookies()
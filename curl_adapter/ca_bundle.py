@@ -0,0 +1,146 @@
+import collections
+import functools
+import os
+import threading
+import time
+import typing
+
+import curl_cffi.curl
+from curl_cffi._wrapper import ffi, lib
+from curl_cffi.curl import CurlOpt
+
+from ._curl_cffi_ext import ext_ffi, to_curl_cffi_pointer
+
+CURL_BLOB_NOCOPY = 0
+
+PATH_CACHE_TTL = 60.0
+'''
+	Seconds a file found by `stat_path` isn't checked again
+'''
+PATH_CACHE_SIZE = 256
+
+_path_stats: "collections.OrderedDict[str, typing.Tuple[float, typing.Tuple[int, int]]]" = collections.OrderedDict()
+'''
+	Path -> when it was checked, and its modification time & size. Least recently used first
+'''
+_path_stats_lock = threading.Lock()
+
+
+def stat_path(path: str) -> typing.Optional[typing.Tuple[int, int]]:
+	'''
+		The modification time (ns) & size of a file, None if it doesn't exist. Files found are cached for `PATH_CACHE_TTL` 
+		seconds: certificate & key files are checked for every request.
+	'''
+	now = time.monotonic()
+	with _path_stats_lock:
+		cached = _path_stats.get(path)
+		if cached is not None and now - cached[0] < PATH_CACHE_TTL:
+			_path_stats.move_to_end(path)
+			return cached[1]
+
+	try:
+		stat = os.stat(path)
+	except OSError:
+		with _path_stats_lock:
+			_path_stats.pop(path, None)
+		return None
+
+	signature = (stat.st_mtime_ns, stat.st_size)
+	with _path_stats_lock:
+		_path_stats[path] = (now, signature)
+		_path_stats.move_to_end(path)
+		while len(_path_stats) > PATH_CACHE_SIZE:
+			_path_stats.popitem(last=False)
+	return signature
+
+
+def path_exists(path: str) -> bool:
+	'''
+		`os.path.exists`, cached by `stat_path`.
+	'''
+	return stat_path(path) is not None
+
+
+class CurlCABundle():
+	'''
+		A CA bundle (PEM) loaded once into memory, and set on curl handles as a blob (`CURLOPT_CAINFO_BLOB`),
+		instead of a file path each handle opens & reads again.
+
+		The memory is shared by all the handles (`CURL_BLOB_NOCOPY`), and kept alive as long as one of them uses it.
+
+		curl_cffi only: pycurl's libcurl resumes TLS sessions across different CA blobs, without verifying the peer again.
+		It caches the CA files itself anyway (in the multi handle).
+	'''
+
+	def __init__(self, data: bytes, path: typing.Optional[str]=None):
+		if not data:
+			raise ValueError("The CA bundle is empty.")
+
+		self.data = data
+		self.path = path
+		'''
+			The file it was read from, if any
+		'''
+
+		self._buffer = ext_ffi.from_buffer(self.data)
+		self._blob = ext_ffi.new("struct curl_blob *")
+		self._blob.data = ext_ffi.cast("void *", self._buffer)
+		self._blob.len = len(self.data)
+		self._blob.flags = CURL_BLOB_NOCOPY
+
+	@classmethod
+	def from_file(cls, path: str) -> "CurlCABundle":
+		'''
+			The bundle of a file, read once for all the adapters, and again once the file has changed.
+		'''
+		signature = stat_path(path)
+		if signature is None:
+			raise OSError(f"Could not find a suitable TLS CA certificate bundle at: {path}")
+		return cls._load_file(path, signature)
+
+	@classmethod
+	@functools.lru_cache(maxsize=16)
+	def _load_file(cls, path: str, signature: typing.Tuple[int, int]) -> "CurlCABundle":
+		with open(path, "rb") as f:
+			return cls(f.read(), path)
+
+	def refreshed(self) -> "CurlCABundle":
+		'''
+			The bundle as its file is now (see `from_file`), or itself if it's not from a file, or the file is gone.
+		'''
+		signature = stat_path(self.path) if self.path is not None else None
+		if signature is None:
+			# Keep the loaded one if the file is gone
+			return self
+		return CurlCABundle._load_file(self.path, signature)
+
+	def attach(self, curl: curl_cffi.Curl):
+		'''
+			Verify peers & HTTPS proxies with this bundle only. This doesn't survive `curl_easy_reset`.
+		'''
+		blob = to_curl_cffi_pointer(self._blob)
+		lib._curl_easy_setopt(curl._curl, CurlOpt.CAINFO_BLOB, blob)
+		lib._curl_easy_setopt(curl._curl, CurlOpt.PROXY_CAINFO_BLOB, blob)
+
+		# No CA file, this also tells curl_cffi not to set its default one before the transfer
+		curl.setopt(CurlOpt.CAINFO, ffi.NULL)
+		curl.setopt(CurlOpt.PROXY_CAINFO, ffi.NULL)
+
+		# The blob must outlive every curl handle that uses it
+		curl._curl_adapter_ca_bundle = self
+
+
+def create_ca_bundle(ca_bundle: typing.Union[bool, str, bytes, CurlCABundle, None]) -> typing.Optional[CurlCABundle]:
+	'''
+		The default CA bundle of an adapter: `True` for certifi's, a file path, PEM data, or a bundle.
+	'''
+	if not ca_bundle:
+		return None
+	if isinstance(ca_bundle, CurlCABundle):
+		return ca_bundle
+	if ca_bundle is True:
+		import certifi
+		return CurlCABundle.from_file(certifi.where())
+	if isinstance(ca_bundle, bytes):
+		return CurlCABundle(ca_bundle)
+	return CurlCABundle.from_file(ca_bundle)
@@ -0,0 +1,100 @@
+import typing
+import zlib
+
+import brotli
+
+try:
+	# Python >= 3.14
+	from compression import zstd
+except ImportError:
+	zstd = None
+
+try:
+	import zstandard
+except ImportError:
+	zstandard = None
+
+
+CONTENT_ENCODINGS = ("gzip", "deflate", "br", "zstd")
+
+DEFAULT_LEVELS = {
+	"gzip": 6,
+	"deflate": 6,
+	"br": 4, # brotli's default (11) is far too slow for uploads
+	"zstd": 3,
+}
+
+
+class BodyCompressor():
+	'''
+		Incremental encoder of a request body, for a `Content-Encoding` (gzip, deflate, br or zstd).
+	'''
+
+	def __init__(self, encoding: str, level: typing.Optional[int]=None):
+		encoding = encoding.strip().lower()
+		if encoding not in CONTENT_ENCODINGS:
+			raise ValueError(f"Unsupported request body encoding: {encoding!r}, use one of: {', '.join(CONTENT_ENCODINGS)}")
+
+		self.encoding = encoding
+		self.level = DEFAULT_LEVELS[encoding] if level is None else level
+
+		if encoding == "gzip":
+			self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+		elif encoding == "deflate":
+			self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, zlib.MAX_WBITS)
+		elif encoding == "br":
+			self._compressor = brotli.Compressor(quality=self.level)
+		elif zstd is not None:
+			self._compressor = zstd.ZstdCompressor(level=self.level)
+		elif zstandard is not None:
+			self._compressor = zstandard.ZstdCompressor(level=self.level).compressobj()
+		else:
+			raise ValueError("zstd request body encoding requires Python >= 3.14 or the `zstandard` package.")
+
+	def compress(self, data: bytes) -> bytes:
+		if self.encoding == "br":
+			return self._compressor.process(data)
+		return self._compressor.compress(data)
+
+	def flush(self) -> bytes:
+		'''
+			The end of the encoded body.
+		'''
+		if self.encoding == "br":
+			return self._compressor.finish()
+		return self._compressor.flush()
+
+
+def compress_body(body: bytes, encoding: str, level: typing.Optional[int]=None) -> bytes:
+	compressor = BodyCompressor(encoding, level)
+	return compressor.compress(body) + compressor.flush()
+
+
+def compress_chunks(
+	body: typing.Union[typing.BinaryIO, typing.Iterable[bytes]],
+	encoding: str,
+	level: typing.Optional[int]=None,
+	chunk_size: int=64 * 1024
+) -> typing.Iterator[bytes]:
+	'''
+		Encode a file-like or iterator body as it's read, one chunk at a time.
+	'''
+	compressor = BodyCompressor(encoding, level)
+
+	def read_chunks():
+		while True:
+			chunk = body.read(chunk_size)
+			if not chunk:
+				return
+			yield chunk
+
+	for chunk in (read_chunks() if hasattr(body, "read") else body):
+		if not chunk:
+			continue
+		if isinstance(chunk, str):
+			chunk = chunk.encode("utf-8")
+		data = compressor.compress(chunk)
+		if data:
+			yield data
+
+	yield compressor.flush()
@@ -1,3 +1,7 @@
+import functools
+import threading
+import time
+import typing
 from typing import TypedDict, List
 
 import curl_cffi.curl
@@ -22,9 +26,16 @@ except ImportError:
 	# curl_cffi < 0.16.0
 	from curl_cffi.requests.impersonate import normalize_browser_type
 
+# It's called for every request
+normalize_browser_type = functools.lru_cache(maxsize=64)(normalize_browser_type)
+
 from .stream.handler.base import CurlStreamHandlerBase
 
 from .base_adapter import BaseCurlAdapter
+from .ca_bundle import CurlCABundle
+from .options import CurlOptionRecorder
+from .profiles import CurlProfileCache
+from .tls_sessions import CurlTLSSessionStore
 
 
 class CurlAdapterConfigurationOptions(TypedDict):
@@ -35,6 +46,12 @@ class CurlAdapterConfigurationOptions(TypedDict):
 
 class CurlCffiAdapter(BaseCurlAdapter):
 
+	profile_cache: typing.Optional[CurlProfileCache] = CurlProfileCache(max_size=32)
+	'''
+		Compiled impersonation profiles, shared by all the adapters. New handles are cloned from the template 
+		handle of their profile, with the impersonation & fingerprint options already set. None to disable it.
+	'''
+
 	def __init__(self, 
 			*,
 			impersonate_browser_type: BrowserTypeLiteral="chrome", 
@@ -43,18 +60,133 @@ class CurlCffiAdapter(BaseCurlAdapter):
 			debug=False, 
 			use_curl_content_decoding=False, 
 			use_thread_local_curl=True,
-			stream_handler: CurlStreamHandlerBase=None
+			stream_handler: CurlStreamHandlerBase=None,
+			reuse_curl_handle=False,
+			curl_share: bool | typing.Iterable[str]=False,
+			handle_pool_size: int | None=None,
+			handle_pool_idle_timeout: float | None=60.0,
+			handle_pool_timeout: float | None=30.0,
+			spool_threshold: int | None=None,
+			expect_continue_threshold: int | None=None,
+			expect_continue_timeout: float | None=None,
+			request_compression: str | typing.Mapping[str, str] | None=None,
+			request_compression_threshold: int=1024,
+			diff_curl_options: bool=True,
+			ca_bundle: bool | str | bytes | CurlCABundle | None=None,
+			tls_session_store: str | CurlTLSSessionStore | None=None,
+			tls_session_export_interval: float | None=60.0
 		):
 
 		self.impersonate_browser_type = impersonate_browser_type
 		self.configuration_options = tls_configuration_options
 		self.http_version = http_version
 
-		super().__init__(curl_cffi.Curl, debug, use_curl_content_decoding, use_thread_local_curl, stream_handler)
+		self._fingerprint_options = None
+		'''
+			Options set by the JA3, Akamai & extra fingerprint configuration, parsed once: (configuration, options)
+		'''
+
+		self.tls_session_store = (
+			CurlTLSSessionStore.open(tls_session_store) if isinstance(tls_session_store, str) else tls_session_store
+		)
+		'''
+			TLS sessions saved to disk, imported into the share handle on start, and exported every `tls_session_export_interval`
+			seconds (during requests) & on `close()`, see `curl_adapter.tls_sessions`.
+		'''
+
+		self.tls_session_export_interval = tls_session_export_interval
+
+		self._tls_sessions_exported_at = time.monotonic()
+		self._tls_sessions_lock = threading.Lock()
+
+		if self.tls_session_store:
+			# The sessions are imported into & exported from the share's TLS session cache
+			if not curl_share:
+				curl_share = ("ssl_session",)
+			elif curl_share is not True and "ssl_session" not in curl_share:
+				raise ValueError("A TLS session store needs the TLS session cache to be shared, `curl_share` must include 'ssl_session'.")
+
+		super().__init__(
+			curl_cffi.Curl, 
+			debug, 
+			use_curl_content_decoding, 
+			use_thread_local_curl, 
+			stream_handler, 
+			reuse_curl_handle=reuse_curl_handle,
+			curl_share=curl_share,
+			handle_pool_size=handle_pool_size,
+			handle_pool_idle_timeout=handle_pool_idle_timeout,
+			handle_pool_timeout=handle_pool_timeout,
+			spool_threshold=spool_threshold,
+			expect_continue_threshold=expect_continue_threshold,
+			expect_continue_timeout=expect_continue_timeout,
+			request_compression=request_compression,
+			request_compression_threshold=request_compression_threshold,
+			diff_curl_options=diff_curl_options,
+			ca_bundle=ca_bundle
+		)
+
+		if self.tls_session_store:
+			self.import_tls_sessions()
 
-	def enable_debug(self):
+	def tls_session_profile(self) -> str:
+		'''
+			Key of the sessions of this adapter in the TLS session store.
+		'''
+		return repr(self.profile_key())
+
+	def import_tls_sessions(self) -> int:
+		'''
+			Import the saved TLS sessions into the share handle. Returns the number of sessions imported.
+		'''
+		curl = curl_cffi.Curl()
+		try:
+			self.curl_share.attach(curl)
+			return self.tls_session_store.import_sessions(curl, self.tls_session_profile())
+		finally:
+			curl.close()
+
+	def export_tls_sessions(self) -> int:
+		'''
+			Export the TLS sessions of the share handle, and save them. Returns the number of sessions exported.
+		'''
+		curl = curl_cffi.Curl()
+		try:
+			self.curl_share.attach(curl)
+			count = self.tls_session_store.export_sessions(curl, self.tls_session_profile())
+		finally:
+			curl.close()
+
+		self._tls_sessions_exported_at = time.monotonic()
+		self.tls_session_store.save()
+		return count
+
+	def prepare_curl(self, curl, request, timeout=None, verify=True, cert=None, proxies=None):
+		if (
+			self.tls_session_store and self.tls_session_export_interval is not None 
+			and time.monotonic() - self._tls_sessions_exported_at >= self.tls_session_export_interval
+			and self._tls_sessions_lock.acquire(blocking=False)
+		):
+			# One request exports them, the others don't wait
+			try:
+				self.export_tls_sessions()
+			finally:
+				self._tls_sessions_lock.release()
+
+		return super().prepare_curl(curl, request, timeout, verify, cert, proxies)
+
+	def close(self) -> None:
+		if self.tls_session_store and not getattr(self, "_closed", False):
+			with self._tls_sessions_lock:
+				self.export_tls_sessions()
+		super().close()
+
+	def enable_debug(self, curl=None):
 		if self.debug:
-			self.curl.debug()
+			curl = self.curl if curl is None else curl
+			# `Curl.debug()`, through `setopt` so it's recorded
+			curl.setopt(CurlOpt.VERBOSE, 1)
+			curl.setopt(CurlOpt.DEBUGFUNCTION, True)
 
 	def get_curl_info(self, curl: curl_cffi.Curl, option_code: int):
 		value = super().get_curl_info(curl, option_code)
@@ -90,6 +222,12 @@ class CurlCffiAdapter(BaseCurlAdapter):
 	def set_curl_options(self, curl, request, url, timeout, proxies, request_adapter_options=None):
 		super().set_curl_options(curl, request, url, timeout, proxies, request_adapter_options=request_adapter_options)
 
+		self.set_profile_options(curl)
+
+	def set_profile_options(self, curl: curl_cffi.Curl):
+		'''
+			The impersonation, fingerprint & HTTP version options, compiled into the profile templates (see `profile_key`).
+		'''
 		# impersonate
 		curl.impersonate(
 			normalize_browser_type(self.impersonate_browser_type), 
@@ -98,35 +236,89 @@ class CurlCffiAdapter(BaseCurlAdapter):
 
 		# additional TLS fingerprint configuration options
 		if self.configuration_options:
+			self.set_fingerprint_options(curl)
+		
+		# HTTP Version
+		if self.http_version:
+			curl_http_version = normalize_http_version(self.http_version)
+			curl.setopt(CurlOpt.HTTP_VERSION, curl_http_version)
+
+	def profile_key(self) -> typing.Hashable:
+		'''
+			What identifies the options set by `set_profile_options`.
+		'''
+		configuration_options = self.configuration_options or {}
+		return (
+			normalize_browser_type(self.impersonate_browser_type),
+			configuration_options.get("ja3_str"),
+			configuration_options.get("permute", False),
+			configuration_options.get("akamai_str"),
+			repr(configuration_options.get("extra_fp")),
+			self.http_version,
+		)
+
+	def create_curl(self) -> curl_cffi.Curl:
+		'''
+			Clone a new handle from the compiled profile of the adapter. Its profile options are known to be set already, 
+			so they're skipped when they're set for a request (see `apply_curl_options`).
+		'''
+		if self.profile_cache is None:
+			return super().create_curl()
+
+		curl, options = self.profile_cache.duplicate(self.profile_key(), self.set_profile_options)
+
+		if self.diff_curl_options:
+			self._applied_options[curl] = options
+		if self.curl_share:
+			self.curl_share.attach(curl)
+		return curl
+
+	def set_fingerprint_options(self, curl: curl_cffi.Curl):
+		'''
+			Set the options of the JA3, Akamai & extra fingerprint configuration. They're parsed once, 
+			and the resulting options are set again for the next requests.
+		'''
+		if self._fingerprint_options is None or self._fingerprint_options[0] is not self.configuration_options:
+			recorder = CurlOptionRecorder(curl)
+
 			if self.configuration_options.get("ja3_str"):
 				self.set_ja3_options(
-					curl, 
+					recorder, 
 					self.configuration_options.get("ja3_str"), 
 					self.configuration_options.get("permute", False)
 				)
 			if self.configuration_options.get("akamai_str"):
 				self.set_akamai_options(
-					curl,
+					recorder,
 					self.configuration_options.get("akamai_str")
 				)
 
 			if self.configuration_options.get("extra_fp"):
 				self.set_extra_fp(
-					curl,
+					recorder,
 					self.configuration_options.get("extra_fp")
 				)
-		
-		# HTTP Version
-		if self.http_version:
-			curl_http_version = normalize_http_version(self.http_version)
-			curl.setopt(CurlOpt.HTTP_VERSION, curl_http_version)
 
-	def reset_curl(self):
-		curl = self.curl
+			self._fingerprint_options = (self.configuration_options, recorder.options)
+
+		for method, args in self._fingerprint_options[1].values():
+			getattr(curl, method)(*args)
+
+	# curl_cffi frees the header lists of a handle after each request
+	volatile_curl_options = BaseCurlAdapter.volatile_curl_options | {
+		CurlOpt.HTTPHEADER,
+		CurlOpt.PROXYHEADER,
+		CurlOpt.RESOLVE,
+	}
+
+	def release_curl_buffers(self, curl: curl_cffi.Curl):
 		if hasattr(curl, 'clean_handles_and_buffers'):
 			# curl_cffi >= 0.14.0: clean_after_perform() was renamed to clean_handles_and_buffers()
 			curl.clean_handles_and_buffers()
 		elif hasattr(curl, 'clean_after_perform'):
 			# curl_cffi < 0.14.0
 			curl.clean_after_perform()
-		return super().reset_curl(curl=curl)
+
+	def reset_curl_options(self, curl: curl_cffi.Curl):
+		self.release_curl_buffers(curl)
+		return super().reset_curl_options(curl)
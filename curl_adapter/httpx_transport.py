@@ -0,0 +1,198 @@
+'''
+	httpx transports backed by the curl adapters.
+
+	Requires httpx (`pip install curl-adapter[httpx]`).
+'''
+import typing
+
+import httpx
+
+import requests
+import requests.exceptions
+from requests.structures import CaseInsensitiveDict
+
+from curl_cffi.const import CurlHttpVersion
+
+from .base_adapter import BaseCurlAdapter
+from .curl_cffi import CurlCffiAdapter
+
+
+HTTP_VERSIONS = {
+	CurlHttpVersion.V1_0: b"HTTP/1.0",
+	CurlHttpVersion.V1_1: b"HTTP/1.1",
+	CurlHttpVersion.V2_0: b"HTTP/2",
+}
+
+REQUESTS_ERROR_TO_HTTPX = (
+	# Most specific first
+	(requests.exceptions.ConnectTimeout, httpx.ConnectTimeout),
+	(requests.exceptions.ReadTimeout, httpx.ReadTimeout),
+	(requests.exceptions.ProxyError, httpx.ProxyError),
+	(requests.exceptions.SSLError, httpx.ConnectError),
+	(requests.exceptions.InvalidSchema, httpx.UnsupportedProtocol),
+	(requests.exceptions.ContentDecodingError, httpx.DecodingError),
+	(requests.exceptions.ChunkedEncodingError, httpx.RemoteProtocolError),
+	(requests.exceptions.HTTPError, httpx.RemoteProtocolError),
+	(requests.exceptions.ConnectionError, httpx.ConnectError),
+	(requests.exceptions.RequestException, httpx.NetworkError),
+)
+
+
+class _CurlTransportMixin():
+
+	def __init__(self, adapter: typing.Optional[BaseCurlAdapter]=None, **adapter_options):
+		'''
+			Use a given adapter, or create a `CurlCffiAdapter` with `adapter_options`.
+		'''
+		if adapter is not None and adapter_options:
+			raise ValueError("Pass either an adapter, or the options of a new one.")
+
+		self._owns_adapter = adapter is None
+		self.adapter = adapter if adapter is not None else CurlCffiAdapter(**adapter_options)
+
+	def _prepare_request(self, request: httpx.Request, body: bytes) -> requests.PreparedRequest:
+		prepared = requests.PreparedRequest()
+		prepared.method = request.method
+		prepared.url = str(request.url)
+
+		headers = CaseInsensitiveDict()
+		for key, value in request.headers.multi_items():
+			headers[key] = f"{headers[key]}, {value}" if key in headers else value
+		prepared.headers = headers
+
+		prepared.body = body or None
+		return prepared
+
+	def _timeout(self, request: httpx.Request):
+		timeout = request.extensions.get("timeout") or {}
+		connect_timeout, read_timeout = timeout.get("connect"), timeout.get("read")
+
+		if connect_timeout is None and read_timeout is None:
+			return None
+
+		# The adapter has no "no timeout" per phase, fall back to the other one
+		return (connect_timeout or read_timeout, read_timeout or connect_timeout)
+
+	def _map_error(self, error: Exception, request: httpx.Request) -> Exception:
+		'''
+			Convert a curl or requests error into the equivalent httpx one.
+		'''
+		if not isinstance(error, requests.exceptions.RequestException):
+			error_class = self.adapter.curl_error_map(error)
+			error = error_class(error)
+
+		for requests_error, httpx_error in REQUESTS_ERROR_TO_HTTPX:
+			if isinstance(error, requests_error):
+				return httpx_error(str(error), request=request)
+
+		return httpx.TransportError(str(error))
+
+	def _build_response(self, curl_response: requests.Response, stream) -> httpx.Response:
+		headers = list(curl_response.raw.headers.items())
+
+		if self.adapter.use_curl_content_decoding:
+			# Curl already decoded the body, don't let httpx do it again
+			headers = [
+				(key, value) for key, value in headers
+				if key.lower() not in ("content-encoding", "content-length")
+			]
+
+		return httpx.Response(
+			status_code=curl_response.status_code,
+			headers=headers,
+			stream=stream,
+			extensions={
+				"http_version": HTTP_VERSIONS.get(curl_response.raw.version, b"HTTP/1.1"),
+				"reason_phrase": (curl_response.reason or "").encode(),
+				"curl_info": curl_response.curl_info,
+			},
+		)
+
+
+class CurlByteStream(httpx.SyncByteStream):
+	'''
+		The raw body chunks of a curl stream handler, as they're received.
+	'''
+
+	def __init__(self, transport: "CurlTransport", curl_response: requests.Response, request: httpx.Request):
+		self._transport = transport
+		self._curl_response = curl_response
+		self._request = request
+
+	def __iter__(self) -> typing.Iterator[bytes]:
+		try:
+			yield from self._curl_response.raw._fp.iter_chunks()
+		except Exception as e:
+			raise self._transport._map_error(e, self._request) from e
+
+	def close(self):
+		self._curl_response.close()
+
+
+class AsyncCurlByteStream(httpx.AsyncByteStream):
+	'''
+		The raw body chunks of an asyncio curl stream handler, as they're received.
+	'''
+
+	def __init__(self, transport: "AsyncCurlTransport", curl_response: requests.Response, request: httpx.Request):
+		self._transport = transport
+		self._curl_response = curl_response
+		self._request = request
+
+	async def __aiter__(self) -> typing.AsyncIterator[bytes]:
+		try:
+			async for chunk in self._curl_response.raw._fp.aiter_chunks():
+				yield chunk
+		except Exception as e:
+			raise self._transport._map_error(e, self._request) from e
+
+	async def aclose(self):
+		self._curl_response.close()
+
+
+class CurlTransport(_CurlTransportMixin, httpx.BaseTransport):
+	'''
+		httpx transport using a curl adapter, with its impersonation options, connection reuse and stream handler.
+
+		Usage:
+
+		client = httpx.Client(transport=CurlTransport(impersonate_browser_type="chrome"))
+	'''
+
+	def handle_request(self, request: httpx.Request) -> httpx.Response:
+		prepared = self._prepare_request(request, request.read())
+
+		try:
+			curl_response = self.adapter.send(prepared, stream=True, timeout=self._timeout(request))
+		except Exception as e:
+			raise self._map_error(e, request) from e
+
+		return self._build_response(curl_response, CurlByteStream(self, curl_response, request))
+
+	def close(self):
+		if self._owns_adapter:
+			self.adapter.close()
+
+
+class AsyncCurlTransport(_CurlTransportMixin, httpx.AsyncBaseTransport):
+	'''
+		Async httpx transport, running the transfers on the event loop (see `BaseCurlAdapter.asend`).
+
+		Usage:
+
+		client = httpx.AsyncClient(transport=AsyncCurlTransport(impersonate_browser_type="chrome"))
+	'''
+
+	async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+		prepared = self._prepare_request(request, await request.aread())
+
+		try:
+			curl_response = await self.adapter.asend(prepared, stream=True, timeout=self._timeout(request))
+		except Exception as e:
+			raise self._map_error(e, request) from e
+
+		return self._build_response(curl_response, AsyncCurlByteStream(self, curl_response, request))
+
+	async def aclose(self):
+		if self._owns_adapter:
+			self.adapter.close()
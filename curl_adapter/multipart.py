@@ -0,0 +1,265 @@
+import os
+import traceback
+import typing
+
+import pycurl
+import curl_cffi.curl
+from curl_cffi.curl import CurlOpt, CurlError
+from requests.exceptions import UnrewindableBodyError
+from requests.utils import guess_filename, super_len, to_key_val_list
+
+from ._curl_cffi_ext import ext_ffi, ext_lib, from_curl_cffi_pointer, to_curl_cffi_pointer
+
+CURL_READFUNC_ABORT = 0x10000000
+
+CURL_SEEKFUNC_OK = 0
+CURL_SEEKFUNC_CANTSEEK = 2
+
+
+class MultipartPart(typing.NamedTuple):
+	name: str
+	filename: typing.Optional[str]
+	content_type: typing.Optional[str]
+	headers: typing.Optional[typing.Mapping[str, str]]
+
+	kind: typing.Literal["data", "file", "stream"]
+	'''
+		"file": read from disk by curl (`source` is the path), "stream": a file-like object read while sending, "data": bytes
+	'''
+
+	source: typing.Any
+
+
+class CurlMultipart():
+	'''
+		A multipart/form-data request body, encoded by curl's MIME API (`curl_mime_*`) while it's sent,
+		instead of by requests in memory beforehand.
+
+		Takes the same `files` & `data` as requests. Files opened from disk are read by curl itself,
+		other file-like objects are read as they're sent. Pass it as the request data:
+
+		`session.post(url, data=CurlMultipart(files={"file": open("large.zip", "rb")}, data={"field": "value"}))`
+	'''
+
+	def __init__(self, files=None, data=None, debug=False):
+		self.debug = debug
+
+		self._mime = None
+		'''
+			curl_cffi MIME handle of the current send
+		'''
+		self._callbacks = []
+		'''
+			The read & seek callbacks of its stream parts
+		'''
+
+		self.parts: typing.List[MultipartPart] = [*self._data_parts(data), *self._file_parts(files)]
+
+		self._start_positions: typing.Dict[int, typing.Optional[int]] = {
+			index: self._tell(part.source) for index, part in enumerate(self.parts) if part.kind == "stream"
+		}
+		'''
+			Where the file object of each stream part starts, to send it again (e.g. after a redirect)
+		'''
+		self._sent = False
+
+	@staticmethod
+	def _tell(fp) -> typing.Optional[int]:
+		try:
+			return fp.tell()
+		except Exception:
+			return None
+
+	def _rewind(self):
+		'''
+			Seek the stream parts back to their start, if the body was sent already.
+		'''
+		if not self._sent:
+			self._sent = True
+			return
+
+		for index, start_position in self._start_positions.items():
+			part = self.parts[index]
+			if start_position is None:
+				raise UnrewindableBodyError(f"Can't send the multipart field {part.name!r} again, its file object can't seek.")
+			try:
+				part.source.seek(start_position)
+			except Exception as e:
+				raise UnrewindableBodyError(f"Can't send the multipart field {part.name!r} again: {e}")
+
+	@staticmethod
+	def _data_parts(data) -> typing.Iterator[MultipartPart]:
+		'''
+			Plain fields, as requests encodes them.
+		'''
+		for field, value in to_key_val_list(data or {}):
+			if isinstance(value, (str, bytes)) or not hasattr(value, "__iter__"):
+				value = [value]
+			for v in value:
+				if v is None:
+					continue
+				if not isinstance(v, bytes):
+					v = str(v).encode("utf-8")
+				name = field.decode("utf-8") if isinstance(field, bytes) else field
+				yield MultipartPart(name, None, None, None, "data", v)
+
+	@staticmethod
+	def _file_parts(files) -> typing.Iterator[MultipartPart]:
+		'''
+			File fields, with requests' `(filename, fileobj, content_type, headers)` tuples.
+		'''
+		for name, value in to_key_val_list(files or {}):
+			content_type = None
+			headers = None
+			if isinstance(value, (tuple, list)):
+				if len(value) == 2:
+					filename, fp = value
+				elif len(value) == 3:
+					filename, fp, content_type = value
+				else:
+					filename, fp, content_type, headers = value
+			else:
+				filename = guess_filename(value) or name
+				fp = value
+
+			if fp is None:
+				continue
+
+			if isinstance(fp, str):
+				yield MultipartPart(name, filename, content_type, headers, "data", fp.encode("utf-8"))
+			elif isinstance(fp, (bytes, bytearray)):
+				yield MultipartPart(name, filename, content_type, headers, "data", bytes(fp))
+			elif hasattr(fp, "read"):
+				path = getattr(fp, "name", None)
+				if isinstance(path, str) and os.path.isfile(path) and "b" in getattr(fp, "mode", "") and fp.tell() == 0:
+					# curl opens and reads it
+					yield MultipartPart(name, filename, content_type, headers, "file", path)
+				else:
+					yield MultipartPart(name, filename, content_type, headers, "stream", fp)
+			else:
+				yield MultipartPart(name, filename, content_type, headers, "data", str(fp).encode("utf-8"))
+
+	def attach(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl]):
+		'''
+			Set the body of a curl handle. curl sets the Content-Type header, with its own boundary.
+		'''
+		self._rewind()
+
+		if isinstance(curl, pycurl.Curl):
+			return self._attach_pycurl(curl)
+		return self._attach_curl_cffi(curl)
+
+	def _attach_curl_cffi(self, curl: curl_cffi.Curl):
+		# Only the MIME handle of the current send is kept
+		self.close()
+
+		mime = self._mime = ext_lib.curl_mime_init(from_curl_cffi_pointer(curl._curl))
+
+		for index, part in enumerate(self.parts):
+			mime_part = ext_lib.curl_mime_addpart(mime)
+			self._check(ext_lib.curl_mime_name(mime_part, part.name.encode("utf-8")), part)
+
+			if part.kind == "file":
+				self._check(ext_lib.curl_mime_filedata(mime_part, os.fsencode(part.source)), part)
+			elif part.kind == "stream":
+				self._set_stream_data(mime_part, part, self._start_positions[index])
+			else:
+				self._check(ext_lib.curl_mime_data(mime_part, part.source, len(part.source)), part)
+
+			if part.filename is not None or part.kind == "file":
+				# A file part is named after its path by default
+				self._check(ext_lib.curl_mime_filename(
+					mime_part, part.filename.encode("utf-8") if part.filename is not None else ext_ffi.NULL
+				), part)
+
+			if part.content_type:
+				self._check(ext_lib.curl_mime_type(mime_part, part.content_type.encode("utf-8")), part)
+
+			if part.headers:
+				headers = ext_ffi.NULL
+				for key, value in part.headers.items():
+					headers = ext_lib.curl_slist_append(headers, f"{key}: {value}".encode("utf-8"))
+				# The part frees them
+				self._check(ext_lib.curl_mime_headers(mime_part, headers, 1), part)
+
+		curl.setopt(CurlOpt.MIMEPOST, to_curl_cffi_pointer(mime))
+
+	def _set_stream_data(self, mime_part, part: MultipartPart, start_position: typing.Optional[int]):
+		fp = part.source
+
+		def read_callback(buffer, size, nitems, arg):
+			try:
+				data = fp.read(size * nitems)
+				if isinstance(data, str):
+					data = data.encode("utf-8")
+			except Exception:
+				if self.debug:
+					traceback.print_exc()
+				return CURL_READFUNC_ABORT
+			if data:
+				ext_ffi.memmove(buffer, data, len(data))
+			return len(data)
+
+		def seek_callback(arg, offset, origin):
+			if start_position is None or origin != os.SEEK_SET:
+				return CURL_SEEKFUNC_CANTSEEK
+			try:
+				fp.seek(start_position + offset)
+			except Exception:
+				return CURL_SEEKFUNC_CANTSEEK
+			return CURL_SEEKFUNC_OK
+
+		read_function = ext_ffi.callback("size_t(char *, size_t, size_t, void *)", read_callback)
+		seek_function = ext_ffi.callback("int(void *, int64_t, int)", seek_callback)
+		self._callbacks.extend((read_function, seek_function))
+
+		# Unknown sizes are sent with chunked encoding
+		size = super_len(fp) or -1
+
+		self._check(ext_lib.curl_mime_data_cb(
+			mime_part, size, read_function, seek_function, ext_ffi.NULL, ext_ffi.NULL
+		), part)
+
+	def _attach_pycurl(self, curl: pycurl.Curl):
+		form = []
+		for part in self.parts:
+			if part.headers:
+				raise ValueError("Multipart part headers aren't supported with pycurl.")
+
+			if part.kind == "file":
+				options = [pycurl.FORM_FILE, part.source]
+				if part.filename is not None:
+					options += [pycurl.FORM_FILENAME, part.filename]
+			else:
+				# pycurl's form API can't stream, read it whole
+				data = part.source.read() if part.kind == "stream" else part.source
+				if isinstance(data, str):
+					data = data.encode("utf-8")
+				if part.filename is not None:
+					options = [pycurl.FORM_BUFFER, part.filename, pycurl.FORM_BUFFERPTR, data]
+				else:
+					options = [pycurl.FORM_CONTENTS, data]
+
+			if part.content_type:
+				options += [pycurl.FORM_CONTENTTYPE, part.content_type]
+
+			form.append((part.name, tuple(options)))
+
+		curl.setopt(pycurl.HTTPPOST, form)
+
+	@staticmethod
+	def _check(code: int, part: MultipartPart):
+		if code != 0:
+			raise CurlError(f"Failed to add the multipart field {part.name!r}, curl code: {code}", code)
+
+	def close(self):
+		'''
+			Free the MIME handle of the last send, once its transfer is finished (it's unbound from the curl handle).
+		'''
+		mime, self._mime = self._mime, None
+		self._callbacks = []
+		if mime is not None:
+			ext_lib.curl_mime_free(mime)
+
+	def __del__(self):
+		self.close()
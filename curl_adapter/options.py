@@ -0,0 +1,66 @@
+import typing
+
+import pycurl
+import curl_cffi.curl
+
+
+class CurlOptionRecorder():
+	'''
+		Stands in for a curl handle while the options of a request are set, recording the
+		`setopt` & `impersonate` calls in order instead of making them, so they can be compared
+		with the ones of the previous request of the handle, and only the differences applied.
+
+		Anything else is passed through to the handle.
+	'''
+
+	def __init__(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl]):
+		self.curl = curl
+		self.options: typing.Dict[typing.Hashable, typing.Tuple[str, tuple]] = {}
+		'''
+			Option (or "impersonate") -> method name (or function) & arguments. Setting an option again overrides it.
+		'''
+
+	@property
+	def __class__(self):
+		# isinstance() checks of the handle type see the recorded handle's
+		return type(self.curl)
+
+	def setopt(self, option: int, value):
+		self.options[option] = ("setopt", (option, value))
+		return 0
+
+	def impersonate(self, target: str, default_headers: bool=True):
+		self.options["impersonate"] = ("impersonate", (target, default_headers))
+		return 0
+
+	def record(self, key: typing.Hashable, function: typing.Callable, *args):
+		'''
+			Record a `function(curl, *args)` call, for options that aren't set with `setopt` (e.g. blobs).
+		'''
+		self.options[key] = (function, args)
+
+	def replay(self, options: typing.Dict[typing.Hashable, typing.Tuple[str, tuple]]):
+		'''
+			Record options recorded earlier, e.g. cached ones.
+		'''
+		self.options.update(options)
+
+	def __getattr__(self, name: str):
+		return getattr(self.curl, name)
+
+
+def apply_curl_options(
+	curl: typing.Union[curl_cffi.Curl, pycurl.Curl],
+	options: typing.Iterable[typing.Tuple[typing.Union[str, typing.Callable], tuple]]
+) -> int:
+	'''
+		Make recorded calls on a handle. Returns the number of calls.
+	'''
+	calls = 0
+	for method, args in options:
+		if callable(method):
+			method(curl, *args)
+		else:
+			getattr(curl, method)(*args)
+		calls += 1
+	return calls
@@ -0,0 +1,216 @@
+import collections
+import threading
+import time
+import typing
+from typing import TypedDict
+
+import pycurl
+import curl_cffi.curl
+
+from .stream.handler._thread_env import _THREAD_ENV
+
+if _THREAD_ENV == "gevent":
+	from gevent.lock import BoundedSemaphore, RLock
+else:
+	from threading import BoundedSemaphore, RLock
+
+
+CurlHandle = typing.Union[curl_cffi.Curl, pycurl.Curl]
+
+
+class CurlHandlePoolStats(TypedDict):
+	max_size: int
+	size: int
+	in_use: int
+	idle: int
+
+	created: int
+	reused: int
+	evicted: int
+	waits: int
+
+
+class CurlHandlePool():
+	'''
+		A bounded pool of curl handles.
+
+		Handles are checked out for the lifetime of a request (until its body is fully received),
+		and checked back in to be reused, keeping their connections alive. At most `max_size` handles
+		exist at once, `checkout` blocks until one is free, for up to `checkout_timeout` seconds.
+
+		Idle handles are closed after `idle_timeout` seconds.
+	'''
+
+	def __init__(self,
+		curl_factory: typing.Callable[[], CurlHandle],
+		max_size: int=10,
+		idle_timeout: typing.Optional[float]=60.0,
+		checkout_timeout: typing.Optional[float]=30.0
+	):
+		if max_size < 1:
+			raise ValueError("The handle pool size must be at least 1.")
+
+		self.curl_factory = curl_factory
+		self.max_size = max_size
+		self.idle_timeout = idle_timeout
+
+		self.checkout_timeout = checkout_timeout
+		'''
+			Longest `checkout` waits for a free handle by default, forever if None. Streamed responses that are
+			never read nor closed keep their handles, this turns a pool they exhausted into an error instead of a hang.
+		'''
+
+		self._semaphore = BoundedSemaphore(max_size)
+		self._lock = RLock()
+
+		self._idle: typing.Deque[typing.Tuple[CurlHandle, float]] = collections.deque()
+		'''
+			Idle handles with their check-in time, the most recently used on the right
+		'''
+		self._in_use = 0
+
+		self._created = 0
+		self._reused = 0
+		self._evicted = 0
+		self._waits = 0
+
+		self.closed = False
+
+	def checkout(self, timeout: typing.Optional[float]=None, blocking: bool=True) -> CurlHandle:
+		'''
+			Get an idle handle, or create a new one. Blocks while all `max_size` handles are in use, for up to
+			`timeout` seconds (`checkout_timeout` by default).
+		'''
+		if self.closed:
+			raise RuntimeError("This curl handle pool is closed.")
+
+		if not self._semaphore.acquire(blocking=False):
+			if not blocking:
+				raise TimeoutError("There's no free curl handle.")
+			with self._lock:
+				self._waits += 1
+			if not self._semaphore.acquire(timeout=self.checkout_timeout if timeout is None else timeout):
+				raise TimeoutError(
+					f"Timed out waiting for a free curl handle, all {self.max_size} are in use. "
+					"A streamed response holds its handle until its body is read, or it's closed."
+				)
+
+		try:
+			with self._lock:
+				self._evict_idle()
+				self._in_use += 1
+				if self._idle:
+					# Most recently used first, its connections are the most likely to still be alive
+					curl, _ = self._idle.pop()
+					self._reused += 1
+					return curl
+				self._created += 1
+		except BaseException:
+			self._semaphore.release()
+			raise
+
+		try:
+			return self.curl_factory()
+		except BaseException:
+			with self._lock:
+				self._in_use -= 1
+			self._semaphore.release()
+			raise
+
+	def checkin(self, curl: CurlHandle):
+		'''
+			Give a handle back to the pool.
+		'''
+		with self._lock:
+			self._in_use -= 1
+			if self.closed:
+				curl.close()
+			else:
+				self._idle.append((curl, time.monotonic()))
+				self._evict_idle()
+
+		self._semaphore.release()
+
+	def prewarm(self, count: int):
+		'''
+			Create idle handles up front, until there are `count` (at most `max_size`), so the first requests don't wait for them.
+		'''
+		with self._lock:
+			if self.closed:
+				raise RuntimeError("This curl handle pool is closed.")
+
+			missing = min(count, self.max_size) - self._in_use - len(self._idle)
+			for _ in range(missing):
+				self._idle.append((self.curl_factory(), time.monotonic()))
+				self._created += 1
+
+	def evict_idle(self):
+		'''
+			Close the handles idle for longer than `idle_timeout`.
+		'''
+		with self._lock:
+			self._evict_idle()
+
+	def _evict_idle(self):
+		if self.idle_timeout is None:
+			return
+
+		expired_before = time.monotonic() - self.idle_timeout
+		while self._idle and self._idle[0][1] < expired_before:
+			curl, _ = self._idle.popleft()
+			curl.close()
+			self._evicted += 1
+
+	def stats(self) -> CurlHandlePoolStats:
+		with self._lock:
+			return {
+				"max_size": self.max_size,
+				"size": self._in_use + len(self._idle),
+				"in_use": self._in_use,
+				"idle": len(self._idle),
+
+				"created": self._created,
+				"reused": self._reused,
+				"evicted": self._evicted,
+				"waits": self._waits,
+			}
+
+	def close(self):
+		'''
+			Close all idle handles. Handles in use are closed when they're checked in.
+		'''
+		with self._lock:
+			self.closed = True
+			while self._idle:
+				curl, _ = self._idle.pop()
+				curl.close()
+
+
+class CurlHandleLease():
+	'''
+		A checked-out handle. It's held by `send()`, and by the transfer once it has started
+		(see `retain`), and goes back to the pool when both have released it.
+
+		Without a pool, the handle is closed instead.
+	'''
+
+	def __init__(self, pool: typing.Optional[CurlHandlePool], curl: CurlHandle):
+		self.pool = pool
+		self.curl = curl
+		self._holders = 1
+		self._lock = threading.Lock()
+
+	def retain(self):
+		with self._lock:
+			self._holders += 1
+
+	def release(self):
+		with self._lock:
+			self._holders -= 1
+			if self._holders != 0:
+				return
+
+		if self.pool is None:
+			self.curl.close()
+		else:
+			self.pool.checkin(self.curl)
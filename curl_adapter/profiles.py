@@ -0,0 +1,106 @@
+import collections
+import typing
+from typing import TypedDict
+
+import curl_cffi.curl
+
+from .options import CurlOptionRecorder, apply_curl_options
+from .stream.handler._thread_env import _THREAD_ENV
+
+if _THREAD_ENV == "gevent":
+	from gevent.lock import RLock
+else:
+	from threading import RLock
+
+
+CurlOptions = typing.Dict[typing.Hashable, typing.Tuple[str, tuple]]
+
+
+class CurlProfileCacheStats(TypedDict):
+	max_size: int
+	size: int
+
+	compiled: int
+	duplicated: int
+	evicted: int
+
+
+class CurlProfileCache():
+	'''
+		An LRU of compiled impersonation profiles: template handles with the impersonation & fingerprint
+		options already set, which the handles of requests are cloned from (`curl_easy_duphandle`), instead
+		of setting those options on each handle.
+
+		Profiles are keyed by whatever identifies their options, e.g. (browser type, ja3, akamai, extra_fp, http_version).
+		The least recently used template is closed when there are more than `max_size`.
+	'''
+
+	def __init__(self, max_size: int=32):
+		if max_size < 1:
+			raise ValueError("The profile cache size must be at least 1.")
+
+		self.max_size = max_size
+
+		self._templates: "collections.OrderedDict[typing.Hashable, typing.Tuple[curl_cffi.Curl, CurlOptions]]" = collections.OrderedDict()
+		'''
+			Profile key -> template handle & the options set on it, most recently used last
+		'''
+
+		self._lock = RLock()
+
+		self._compiled = 0
+		self._duplicated = 0
+		self._evicted = 0
+
+	def _compile(self, build: typing.Callable[[CurlOptionRecorder], None]) -> typing.Tuple[curl_cffi.Curl, CurlOptions]:
+		template = curl_cffi.Curl()
+		recorder = CurlOptionRecorder(template)
+		build(recorder)
+		apply_curl_options(template, recorder.options.values())
+		return template, recorder.options
+
+	def duplicate(
+		self,
+		key: typing.Hashable,
+		build: typing.Callable[[CurlOptionRecorder], None]
+	) -> typing.Tuple[curl_cffi.Curl, CurlOptions]:
+		'''
+			A new handle of a profile, and the options it has. The profile is compiled with `build` the first time,
+			which sets its options on the handle it's given.
+		'''
+		with self._lock:
+			entry = self._templates.get(key)
+			if entry is None:
+				entry = self._compile(build)
+				self._templates[key] = entry
+				self._compiled += 1
+
+				while len(self._templates) > self.max_size:
+					_, (evicted, _) = self._templates.popitem(last=False)
+					evicted.close()
+					self._evicted += 1
+			else:
+				self._templates.move_to_end(key)
+
+			template, options = entry
+			self._duplicated += 1
+			return template.duphandle(), options
+
+	def stats(self) -> CurlProfileCacheStats:
+		with self._lock:
+			return {
+				"max_size": self.max_size,
+				"size": len(self._templates),
+				"compiled": self._compiled,
+				"duplicated": self._duplicated,
+				"evicted": self._evicted,
+			}
+
+	def clear(self):
+		'''
+			Close all the templates, the handles cloned from them aren't affected.
+		'''
+		with self._lock:
+			while self._templates:
+				_, (template, _) = self._templates.popitem()
+				template.close()
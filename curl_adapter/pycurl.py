@@ -1,3 +1,5 @@
+import typing
+
 import pycurl
 from .base_adapter import BaseCurlAdapter
 from .stream.handler.base import CurlStreamHandlerBase
@@ -9,7 +11,18 @@ class PyCurlAdapter(BaseCurlAdapter):
 			debug=False, 
 			use_curl_content_decoding=False, # pyCurl automatic decoding is disabled by default. Because pycurl doesnt support modern decoding algorithms...
 			use_thread_local_curl=True,
-			stream_handler: CurlStreamHandlerBase=None
+			stream_handler: CurlStreamHandlerBase=None,
+			reuse_curl_handle=False,
+			curl_share: typing.Union[bool, typing.Iterable[str]]=False,
+			handle_pool_size: typing.Optional[int]=None,
+			handle_pool_idle_timeout: typing.Optional[float]=60.0,
+			handle_pool_timeout: typing.Optional[float]=30.0,
+			spool_threshold: typing.Optional[int]=None,
+			expect_continue_threshold: typing.Optional[int]=None,
+			expect_continue_timeout: typing.Optional[float]=None,
+			request_compression: typing.Union[str, typing.Mapping[str, str], None]=None,
+			request_compression_threshold: int=1024,
+			diff_curl_options: bool=True
         ):
 
 		super().__init__(
@@ -17,7 +30,18 @@ class PyCurlAdapter(BaseCurlAdapter):
 			debug,
 			use_curl_content_decoding, 
 			use_thread_local_curl,
-			stream_handler
+			stream_handler,
+			reuse_curl_handle=reuse_curl_handle,
+			curl_share=curl_share,
+			handle_pool_size=handle_pool_size,
+			handle_pool_idle_timeout=handle_pool_idle_timeout,
+			handle_pool_timeout=handle_pool_timeout,
+			spool_threshold=spool_threshold,
+			expect_continue_threshold=expect_continue_threshold,
+			expect_continue_timeout=expect_continue_timeout,
+			request_compression=request_compression,
+			request_compression_threshold=request_compression_threshold,
+			diff_curl_options=diff_curl_options
 		)
 
 	def parse_info(self, curl: pycurl.Curl, headers_only=False):
@@ -51,6 +75,7 @@ class PyCurlAdapter(BaseCurlAdapter):
 
 			# Other
 			"has_used_proxy": "unsupported", 
+			"num_connects": self.get_curl_info(curl, pycurl.NUM_CONNECTS),
 		}
 
 		if not headers_only:
@@ -0,0 +1,177 @@
+import random
+import threading
+import typing
+from typing import TypedDict
+
+import requests
+from requests.adapters import BaseAdapter
+from curl_cffi.requests.impersonate import BrowserTypeLiteral
+from curl_cffi.requests.utils import HttpVersionLiteral
+
+from .base_adapter import Response
+from .curl_cffi import CurlCffiAdapter, CurlAdapterConfigurationOptions
+from .share import DEFAULT_SHARED_CURL_DATA
+
+
+class CurlImpersonationProfile(TypedDict, total=False):
+	impersonate_browser_type: BrowserTypeLiteral
+	tls_configuration_options: CurlAdapterConfigurationOptions
+	http_version: HttpVersionLiteral
+
+	weight: float
+	'''
+		How often the profile is picked, relative to the others (1 by default)
+	'''
+
+
+ProfilePolicy = typing.Union[
+	str,
+	typing.Callable[[requests.PreparedRequest, typing.Sequence[str], typing.Sequence[float]], str]
+]
+
+
+class CurlCffiRotatingAdapter(BaseAdapter):
+	'''
+		Rotates between several impersonation profiles, picking one for each request: at random by weight (`"random"`),
+		in a weighted round-robin (`"round_robin"`), with a custom `policy(request, names, weights)`, or the one named by
+		the `X-Curl-Adapter-Profile` header of a request.
+
+		Each profile has its own `CurlCffiAdapter`, with its own handles, connection pool & TLS session cache (a share handle),
+		so a connection negotiated with one fingerprint is never reused by another, and each profile's connections stay warm
+		while the others are used.
+
+		The other options are passed to the adapter of each profile.
+
+		Usage:
+
+		adapter = CurlCffiRotatingAdapter({
+			"chrome": {"impersonate_browser_type": "chrome", "weight": 3},
+			"safari": {"impersonate_browser_type": "safari"},
+			"custom": {"tls_configuration_options": {"ja3_str": "771,4865-4866-..."}},
+		})
+	'''
+
+	def __init__(self,
+		profiles: typing.Mapping[str, CurlImpersonationProfile],
+		*,
+		policy: ProfilePolicy="random",
+		prewarm_handles: int=0,
+		**adapter_options
+	):
+		super().__init__()
+
+		if not profiles:
+			raise ValueError("At least one impersonation profile is required.")
+
+		if isinstance(policy, str) and policy not in ("random", "round_robin"):
+			raise ValueError(f"Invalid profile policy: {policy!r}, expected 'random', 'round_robin' or a callable.")
+
+		curl_share = adapter_options.setdefault("curl_share", DEFAULT_SHARED_CURL_DATA)
+		if curl_share is True:
+			curl_share = DEFAULT_SHARED_CURL_DATA
+		if not curl_share or "connect" not in curl_share:
+			raise ValueError("The profiles need their own connection pool, `curl_share` must include 'connect'.")
+
+		# Keep the handles, with their profile options set
+		adapter_options.setdefault("reuse_curl_handle", True)
+
+		self.policy = policy
+
+		self.adapters: typing.Dict[str, CurlCffiAdapter] = {}
+		'''
+			Profile name -> its adapter
+		'''
+
+		self.weights: typing.Dict[str, float] = {}
+
+		for name, profile in profiles.items():
+			profile = dict(profile)
+			weight = profile.pop("weight", 1)
+			if weight <= 0:
+				raise ValueError(f"The weight of the profile {name!r} must be positive.")
+
+			self.weights[name] = weight
+			self.adapters[name] = self.create_adapter(name, profile, adapter_options)
+
+			if prewarm_handles and self.adapters[name].handle_pool:
+				self.adapters[name].handle_pool.prewarm(prewarm_handles)
+
+		self._names = list(self.adapters)
+		self._weight_values = [self.weights[name] for name in self._names]
+
+		self._lock = threading.Lock()
+		self._round_robin_current = dict.fromkeys(self._names, 0.0)
+		'''
+			Smooth weighted round-robin state (the profile with the highest current weight is picked next)
+		'''
+
+	def create_adapter(self, name: str, profile: CurlImpersonationProfile, adapter_options: dict) -> CurlCffiAdapter:
+		'''
+			The adapter of a profile.
+		'''
+		return CurlCffiAdapter(**adapter_options, **profile)
+
+	def select_profile(self, request: requests.PreparedRequest) -> str:
+		'''
+			Name of the profile a request is sent with.
+		'''
+		name = request.headers.pop("X-Curl-Adapter-Profile", None)
+		if name is not None:
+			if name not in self.adapters:
+				raise ValueError(f"Unknown impersonation profile: {name!r}")
+			return name
+
+		if callable(self.policy):
+			return self.policy(request, self._names, self._weight_values)
+
+		if self.policy == "round_robin":
+			with self._lock:
+				total = 0.0
+				for profile_name in self._names:
+					self._round_robin_current[profile_name] += self.weights[profile_name]
+					total += self.weights[profile_name]
+				name = max(self._names, key=self._round_robin_current.__getitem__)
+				self._round_robin_current[name] -= total
+				return name
+
+		return random.choices(self._names, weights=self._weight_values)[0]
+
+	def send(
+		self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None
+	) -> Response:
+		name = self.select_profile(request)
+		response = self.adapters[name].send(request, stream, timeout, verify, cert, proxies)
+		response.curl_profile = name
+		return response
+
+	async def asend(
+		self, request: requests.PreparedRequest, stream=False, timeout=None, verify=True, cert=None, proxies=None
+	) -> Response:
+		'''
+			Send a request from an asyncio event loop, see `BaseCurlAdapter.asend`.
+		'''
+		name = self.select_profile(request)
+		response = await self.adapters[name].asend(request, stream, timeout, verify, cert, proxies)
+		response.curl_profile = name
+		return response
+
+	def warm_up(self, url: str, method: str="HEAD", timeout=10, **send_kwargs) -> typing.Dict[str, Response]:
+		'''
+			Send a request to `url` with every profile, so each one has a connection (and TLS session) ready for the next ones.
+		'''
+		responses = {}
+		for name, adapter in self.adapters.items():
+			request = requests.Request(method, url).prepare()
+			responses[name] = adapter.send(request, timeout=timeout, **send_kwargs)
+			responses[name].curl_profile = name
+		return responses
+
+	def close(self) -> None:
+		for adapter in self.adapters.values():
+			adapter.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
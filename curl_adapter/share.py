@@ -0,0 +1,184 @@
+import threading
+import typing
+
+import pycurl
+import curl_cffi.curl
+from curl_cffi._wrapper import lib
+from curl_cffi.curl import CurlOpt
+
+from ._curl_cffi_ext import ext_ffi, ext_lib, to_curl_cffi_pointer
+from .stream.handler._thread_env import _THREAD_ENV
+
+CURLSHOPT_SHARE = 1
+CURLSHOPT_LOCKFUNC = 3
+CURLSHOPT_UNLOCKFUNC = 4
+
+CURLSHE_OK = 0
+
+SHARED_CURL_DATA_TYPES = ("dns", "ssl_session", "connect", "cookie", "psl", "hsts")
+
+DEFAULT_SHARED_CURL_DATA = ("dns", "ssl_session", "connect")
+'''
+	DNS cache, TLS session cache & connection pool
+'''
+
+CURL_LOCK_DATA = {
+	"cookie": 2,
+	"dns": 3,
+	"ssl_session": 4,
+	"connect": 5,
+	"psl": 6,
+	"hsts": 7,
+}
+
+PYCURL_LOCK_DATA = {
+	"cookie": pycurl.LOCK_DATA_COOKIE,
+	"dns": pycurl.LOCK_DATA_DNS,
+	"ssl_session": pycurl.LOCK_DATA_SSL_SESSION,
+	"connect": pycurl.LOCK_DATA_CONNECT,
+	"psl": pycurl.LOCK_DATA_PSL,
+	"hsts": pycurl.LOCK_DATA_HSTS,
+}
+
+
+def _allocate_lock():
+	'''
+		A real OS thread lock. Lock callbacks may run on native threadpool threads, even under gevent.
+	'''
+	if _THREAD_ENV == "gevent":
+		from gevent.monkey import get_original
+		return get_original("_thread", "allocate_lock")()
+	return threading.Lock()
+
+
+def _validate_shared_data(shared_data: typing.Iterable[str]) -> typing.Tuple[str, ...]:
+	shared_data = tuple(shared_data)
+	for data_type in shared_data:
+		if data_type not in SHARED_CURL_DATA_TYPES:
+			raise ValueError(
+				f"Invalid shared curl data: {data_type!r}, expected one of: {', '.join(SHARED_CURL_DATA_TYPES)}"
+			)
+	return shared_data
+
+
+class CurlCffiShare():
+	'''
+		A `curl_share_*` handle for curl_cffi handles, with Python lock callbacks.
+
+		Every handle attached to it uses the same DNS cache, TLS session cache and/or connection pool.
+	'''
+
+	def __init__(self, shared_data: typing.Iterable[str]=DEFAULT_SHARED_CURL_DATA):
+		self.shared_data = _validate_shared_data(shared_data)
+
+		self._locks: typing.Dict[int, typing.Any] = {}
+		self._share = ext_lib.curl_share_init()
+
+		if self._share == ext_ffi.NULL:
+			raise RuntimeError("curl_share_init failed.")
+
+		# Keep references to the callbacks, they must live as long as the share handle
+		self._lock_function = ext_ffi.callback("void(void *, int, int, void *)", self._lock)
+		self._unlock_function = ext_ffi.callback("void(void *, int, void *)", self._unlock)
+
+		self._setopt(CURLSHOPT_LOCKFUNC, self._lock_function)
+		self._setopt(CURLSHOPT_UNLOCKFUNC, self._unlock_function)
+
+		for data_type in self.shared_data:
+			self._setopt(CURLSHOPT_SHARE, ext_ffi.cast("int", CURL_LOCK_DATA[data_type]))
+
+	def _setopt(self, option: int, value):
+		code = ext_lib.curl_share_setopt(self._share, option, value)
+		if code != CURLSHE_OK:
+			raise RuntimeError(f"curl_share_setopt failed with code: {code}")
+
+	def _get_lock(self, lock_data: int):
+		lock = self._locks.get(lock_data)
+		if lock is None:
+			lock = self._locks.setdefault(lock_data, _allocate_lock())
+		return lock
+
+	def _lock(self, handle, lock_data: int, access: int, userptr):
+		self._get_lock(lock_data).acquire()
+
+	def _unlock(self, handle, lock_data: int, userptr):
+		self._get_lock(lock_data).release()
+
+	def attach(self, curl: curl_cffi.Curl):
+		'''
+			Attach the share to a curl handle. This survives `curl_easy_reset`.
+		'''
+		if self._share is None:
+			raise RuntimeError("This curl share is closed.")
+
+		lib._curl_easy_setopt(curl._curl, CurlOpt.SHARE, to_curl_cffi_pointer(self._share))
+
+		# The share handle must outlive every curl handle that uses it
+		curl._curl_adapter_share = self
+
+	def close(self):
+		'''
+			Cleanup the share handle. If some curl handles are still attached,
+			the share is cleaned up once the last of them is garbage-collected.
+		'''
+		if getattr(self, "_share", None) is None:
+			# Closed, or failed to initialize
+			return
+
+		if ext_lib.curl_share_cleanup(self._share) == CURLSHE_OK:
+			self._share = None
+
+	def __del__(self):
+		self.close()
+
+
+class PyCurlShare():
+	'''
+		A `pycurl.CurlShare` handle. Pycurl takes care of the locking by itself.
+	'''
+
+	def __init__(self, shared_data: typing.Iterable[str]=DEFAULT_SHARED_CURL_DATA):
+		self.shared_data = _validate_shared_data(shared_data)
+
+		self._share = pycurl.CurlShare()
+		for data_type in self.shared_data:
+			self._share.setopt(pycurl.SH_SHARE, PYCURL_LOCK_DATA[data_type])
+
+	def attach(self, curl: pycurl.Curl):
+		if self._share is None:
+			raise RuntimeError("This curl share is closed.")
+		curl.setopt(pycurl.SHARE, self._share)
+
+	def close(self):
+		if self._share is None:
+			return
+		try:
+			self._share.close()
+			self._share = None
+		except pycurl.error:
+			# Still in use by some curl handles
+			pass
+
+
+def create_curl_share(
+	curl_class: typing.Union[typing.Type[curl_cffi.Curl], typing.Type[pycurl.Curl]],
+	shared_data: typing.Union[bool, typing.Iterable[str]]=True
+) -> typing.Union[CurlCffiShare, PyCurlShare, None]:
+	'''
+		Create the share handle for a curl class.
+
+		`shared_data` is either `True` (DNS, TLS sessions & connections) or the data types to share.
+	'''
+	if not shared_data:
+		return None
+
+	if shared_data is True:
+		shared_data = DEFAULT_SHARED_CURL_DATA
+
+	if issubclass(curl_class, curl_cffi.Curl):
+		return CurlCffiShare(shared_data)
+
+	if issubclass(curl_class, pycurl.Curl):
+		return PyCurlShare(shared_data)
+
+	raise TypeError("Invalid curl class.")
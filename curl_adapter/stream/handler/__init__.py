@@ -8,7 +8,7 @@ if _THREAD_ENV == "gevent":
 	from .gevent_handler import CurlStreamHandlerGevent
 	_Impl = CurlStreamHandlerGevent
 else:
-	# Alternatively, CurlStreamHandlerThreads
+	# Alternatively, CurlStreamHandlerThreads or CurlStreamHandlerEventLoop
 	from .multi_handler import CurlStreamHandlerMulti
 	_Impl = CurlStreamHandlerMulti
 
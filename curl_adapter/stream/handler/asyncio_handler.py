@@ -0,0 +1,182 @@
+import asyncio
+import typing
+import weakref
+
+import pycurl
+import curl_cffi.curl
+
+from curl_cffi.curl import CurlOpt
+
+from curl_adapter.stream.sockets.asyncio_socket import AsyncioCurlBase, AsyncioCurlCffi, AsyncioPyCurl
+
+from .base import (
+	CurlStreamHandlerBase,
+	QueueContinueRead,
+	QueueBreakRead,
+)
+
+from ._thread_env import (
+	_THREAD_ENV, _THREAD_CLASS, _THREAD_SLEEP, _THREAD_EVENT, _THREAD_QUEUE_MODULE
+)
+
+
+class CurlStreamHandlerAsyncio(CurlStreamHandlerBase):
+	'''
+		Curl Stream Handler (c) 2025 by Elis K.
+
+		Asyncio only. Uses curl's socket callbacks with the running event loop, see `AsyncioCurlBase`.
+
+		The transfer only makes progress while the loop runs, so await `wait_for_headers()`/`wait_for_body()`
+		or iterate `aiter_chunks()`. The sync `read` only returns what has already been received.
+	'''
+
+	_drivers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, typing.Dict[str, AsyncioCurlBase]]" = weakref.WeakKeyDictionary()
+	'''
+		One multi handle per event loop and curl type
+	'''
+
+	def __init__(self, curl_instance, callback_after_perform=None, timeout=None, debug=False):
+		super().__init__(curl_instance, callback_after_perform, timeout, debug)
+
+		self.loop = asyncio.get_running_loop()
+
+		self._data_received = asyncio.Event()
+		self._finished = asyncio.Event()
+
+		self.driver: typing.Optional[AsyncioCurlBase] = None
+
+	@classmethod
+	def get_driver(cls, loop: asyncio.AbstractEventLoop, curl_type: typing.Literal["curl_cffi", "pycurl"]) -> AsyncioCurlBase:
+		drivers = cls._drivers.get(loop)
+		if drivers is None:
+			drivers = cls._drivers[loop] = {}
+
+		driver = drivers.get(curl_type)
+		if driver is None or driver.closed:
+			driver = drivers[curl_type] = (
+				AsyncioCurlCffi(loop) if curl_type == "curl_cffi" else AsyncioPyCurl(loop)
+			)
+			# Cleanup the multi handle when the loop is gone
+			weakref.finalize(loop, driver.close)
+
+		return driver
+
+	def _write_callback(self, chunk):
+		result = super()._write_callback(chunk)
+		self._data_received.set()
+		return result
+
+	def _on_transfer_done(self, curl_error: typing.Optional[Exception]=None):
+		if self.debug:
+			print(f"[DEBUG] Closing curl. error: {bool(curl_error)}, quit_event: {self.quit_event.is_set()}")
+
+		self._cleanup_after_perform(curl_error)
+		self._data_received.set()
+		self._finished.set()
+
+	async def _wait_for_data(self):
+		self._data_received.clear()
+		await self._data_received.wait()
+
+	async def wait_for_headers(self):
+		'''
+			Wait until the headers have been received.
+		'''
+		async def _wait():
+			while not self.initialized.is_set():
+				await self._wait_for_data()
+
+		try:
+			await asyncio.wait_for(_wait(), timeout=self.event_timeout)
+		except asyncio.TimeoutError:
+			raise self.read_timeout_error
+
+		if self.debug:
+			print("[DEBUG] Headers received.")
+
+	async def wait_for_body(self):
+		'''
+			Wait until the whole body has been received.
+		'''
+		await self._finished.wait()
+
+	async def aiter_chunks(self) -> typing.AsyncIterator[bytes]:
+		'''
+			Iterate the raw body chunks as they're received.
+		'''
+		for chunk in self._pop_leftover():
+			yield bytes(chunk) if isinstance(chunk, memoryview) else chunk
+
+		while not self.closed:
+			try:
+				chunk = self.chunk_queue.get_nowait()
+			except _THREAD_QUEUE_MODULE.Empty:
+				if self.perform_finished.is_set():
+					break
+				await self._wait_for_data()
+				continue
+
+			if chunk is None:
+				break
+
+			yield self._take_chunk(chunk)
+
+		if self.error:
+			raise self.error
+
+	def _dequeue_chunks(self):
+		try:
+			return self.chunk_queue.get_nowait()
+		except _THREAD_QUEUE_MODULE.Empty:
+			if self.perform_finished.is_set():
+				raise QueueBreakRead()
+			# Blocking here would block the loop, and the transfer along with it
+			raise RuntimeError(
+				"The response body hasn't been received yet, `await response.wait_for_body()` before reading it."
+			)
+
+	def _perform(self):
+		if self.debug:
+			print("[DEBUG] Using Asyncio Stream Handler.")
+
+		if isinstance(self.curl, curl_cffi.Curl):
+			self.curl.setopt(CurlOpt.WRITEFUNCTION, self._write_callback)
+			self.curl._ensure_cacert()
+
+		elif isinstance(self.curl, pycurl.Curl):
+			self.curl.setopt(pycurl.WRITEFUNCTION, self._write_callback)
+		else:
+			raise TypeError("Cannot perform on invalid Curl object.")
+
+		self.driver = self.get_driver(self.loop, self.curl_type)
+		self.driver.add_handle(self.curl, self._on_transfer_done)
+
+	def start(self):
+		'''
+			Start the transfer, without waiting for the headers.
+		'''
+		self._perform()
+		return self
+
+	def close(self):
+		if self.closed:
+			return
+
+		if not self.perform_finished.is_set() and self.driver:
+			self.quit_event.set()
+
+			try:
+				in_loop_thread = asyncio.get_running_loop() is self.loop
+			except RuntimeError:
+				in_loop_thread = False
+
+			if in_loop_thread:
+				self.driver.cancel_handle(self.curl)
+			elif not self.loop.is_closed():
+				self.loop.call_soon_threadsafe(self.driver.cancel_handle, self.curl)
+
+			self.closed = True
+			self._close_spool()
+			return
+
+		return super().close()
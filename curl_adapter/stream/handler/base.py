@@ -1,4 +1,7 @@
+import collections
+import io
 import queue
+import tempfile
 import threading
 import typing
 import traceback
@@ -12,6 +15,9 @@ from ._thread_env import (
 	_THREAD_ENV, _THREAD_CLASS, _THREAD_SLEEP, _THREAD_EVENT, _THREAD_QUEUE_MODULE
 )
 
+CURL_WRITEFUNC_PAUSE = 0x10000001
+CURLPAUSE_CONT = 0
+
 class QueueBreakRead(Exception):
 	pass
 
@@ -23,6 +29,29 @@ class CurlStreamHandlerBase():
 		Curl Stream Handler (c) 2025 by Elis K.
 	'''
 
+	max_buffer_size: typing.Optional[int] = None
+	'''
+		High-water mark of a streamed body, in bytes. Once this much has been received and not read yet,
+		the transfer is paused until the reader drains it below `resume_buffer_size`. Unbounded if None.
+	'''
+
+	resume_buffer_size: typing.Optional[int] = None
+	'''
+		Low-water mark, half of `max_buffer_size` if None.
+	'''
+
+	spool_threshold: typing.Optional[int] = None
+	'''
+		Most bytes of a body buffered in memory, the chunks received past it (while it's not read) are spooled
+		to a temporary file instead, and read back from it in order. Never spooled if None.
+	'''
+
+	max_presize: int = 2**24
+	'''
+		Most bytes allocated upfront for a full-body read (`readall` with a size hint), the buffer grows past it as 
+		the data comes. The size hint is the server's Content-Length, which can't be trusted with more.
+	'''
+
 	def __init__(self, 
 		curl_instance: typing.Union[curl_cffi.Curl, pycurl.Curl], 
 		callback_after_perform: typing.Callable[[typing.Union[curl_cffi.Curl, pycurl.Curl]], None]=None, 
@@ -75,10 +104,57 @@ class CurlStreamHandlerBase():
 			Thread-safe queue for streaming data
 		'''
 
-		self._leftover = bytearray()
+		self._leftover: typing.Deque[bytes] = collections.deque()
+		'''
+			Dequeued chunks not returned yet, when chunk > requested
+		'''
+
+		self._leftover_offset = 0
+		'''
+			Bytes of the first leftover chunk already returned, instead of deleting them from the front
 		'''
-			buffer for leftover data when chunk > requested
+
+		self.buffered_size = 0
 		'''
+			Bytes received and not read yet
+		'''
+
+		self.peak_buffered_size = 0
+		'''
+			Highest `buffered_size` of the transfer, at most `max_buffer_size` + one chunk
+		'''
+
+		self._buffer_lock = threading.Lock()
+		self._paused = False
+		self._unbounded = self.max_buffer_size is None
+
+		self.body_sink: typing.Optional[typing.BinaryIO] = None
+		'''
+			File the body is written to straight from the write callback, instead of the queue. Closed once the transfer is finished.
+		'''
+
+		self.body_sink_opener: typing.Optional[typing.Callable[[], typing.Optional[typing.BinaryIO]]] = None
+		'''
+			Opens the body sink once the headers are received (on the first chunk, or when the transfer is finished), 
+			if it returns None the body is read as usual.
+		'''
+
+		self.saved_size = 0
+		'''
+			Bytes written to the body sink
+		'''
+
+		self._sink_error: typing.Optional[Exception] = None
+
+		self.spooled_size = 0
+		'''
+			Bytes written to the spool file, in total
+		'''
+
+		self._spool: typing.Optional[typing.BinaryIO] = None
+		self._spool_lock = threading.Lock()
+		self._spool_read_pos = 0
+		self._spool_write_pos = 0
 
 		self.callback_after_perform = callback_after_perform
 		self.debug = debug
@@ -90,18 +166,204 @@ class CurlStreamHandlerBase():
 		'''
 			Callback to handle incoming data chunks.
 		'''	
+		if self.body_sink_opener is not None and not self._open_body_sink():
+			self.initialized.set()
+			return -1
+
 		self.initialized.set()
 			
 		if self.quit_event.is_set():
 			return -1  # Signal to stop
 
+		if self.body_sink is not None:
+			return self._write_to_sink(chunk)
+
+		if self.spool_threshold is not None and self.buffered_size + len(chunk) > self.spool_threshold:
+			return self._write_to_spool(chunk)
+
+		if not self._unbounded and self.buffered_size >= self.max_buffer_size:
+			pause = self._on_buffer_full()
+			if pause is not None:
+				return pause
+
+		with self._buffer_lock:
+			self.buffered_size += len(chunk)
+			if self.buffered_size > self.peak_buffered_size:
+				self.peak_buffered_size = self.buffered_size
+
 		self.chunk_queue.put(chunk)  # Add chunk to the queue
 		return len(chunk)
 
+	def _open_body_sink(self) -> bool:
+		'''
+			Open the body sink, before the headers are handed over. Returns False if it couldn't be opened.
+		'''
+		opener, self.body_sink_opener = self.body_sink_opener, None
+		try:
+			self.body_sink = opener()
+		except Exception as e:
+			self._sink_error = e
+			return False
+		return True
+
+	def _write_to_sink(self, chunk) -> int:
+		'''
+			Write a chunk to the body sink, nothing is buffered.
+		'''
+		try:
+			view = memoryview(chunk)
+			while view:
+				written = self.body_sink.write(view)
+				view = view[written:]
+		except Exception as e:
+			# Abort the transfer, with this error instead of curl's write error
+			self._sink_error = e
+			return -1
+
+		self.saved_size += len(chunk)
+		return len(chunk)
+
+	def _write_to_spool(self, chunk) -> int:
+		'''
+			Append a chunk to the spool file, and queue its size in its place.
+		'''
+		try:
+			with self._spool_lock:
+				if self._spool is None:
+					if self.closed:
+						return -1
+					self._spool = tempfile.TemporaryFile()
+				self._spool.seek(self._spool_write_pos)
+				self._spool.write(chunk)
+				self._spool_write_pos += len(chunk)
+		except Exception as e:
+			self._sink_error = e
+			return -1
+
+		self.spooled_size += len(chunk)
+		self.chunk_queue.put(len(chunk))
+		return len(chunk)
+
+	def _read_spool(self, size: int) -> bytes:
+		'''
+			Read back the next spooled chunk.
+		'''
+		with self._spool_lock:
+			self._spool.seek(self._spool_read_pos)
+			chunk = self._spool.read(size)
+			self._spool_read_pos += len(chunk)
+
+			if self._spool_read_pos == self._spool_write_pos:
+				# Caught up, reuse the file from the start
+				self._spool_read_pos = self._spool_write_pos = 0
+
+		return chunk
+
+	def _close_spool(self):
+		with self._spool_lock:
+			if self._spool is not None:
+				self._spool.close()
+				self._spool = None
+
+	def _on_buffer_full(self) -> typing.Optional[int]:
+		'''
+			Called by the write callback at the high-water mark. Returns the value for curl (`CURL_WRITEFUNC_PAUSE`),
+			or None to take the chunk anyway.
+
+			A blocking perform can't be paused, nothing would read the buffer meanwhile.
+		'''
+		return None
+
+	def _pause_writes(self) -> typing.Optional[int]:
+		'''
+			Pause the transfer, unless the reader drained the buffer in the meantime. 
+			Handlers using it resume it in `_resume_transfer`.
+		'''
+		with self._buffer_lock:
+			if self._unbounded or self.buffered_size < self.max_buffer_size:
+				return None
+			self._paused = True
+		return CURL_WRITEFUNC_PAUSE
+
+	def _resume_transfer(self):
+		'''
+			Called once a paused transfer's buffer is drained below the low-water mark.
+		'''
+		pass
+
+	def _unpause_curl(self):
+		'''
+			Resume a paused transfer, from the context driving it.
+		'''
+		if self.perform_finished.is_set():
+			return
+		try:
+			self.curl.pause(CURLPAUSE_CONT)
+		except Exception:
+			if self.debug:
+				traceback.print_exc()
+
+	def _chunk_consumed(self, size: int):
+		with self._buffer_lock:
+			self.buffered_size -= size
+			resume = self._paused and (
+				self._unbounded or self.buffered_size <= (
+					self.resume_buffer_size if self.resume_buffer_size is not None else self.max_buffer_size // 2
+				)
+			)
+			if resume:
+				self._paused = False
+
+		if resume:
+			self._resume_transfer()
+
+	def _next_chunk(self):
+		'''
+			Dequeue the next chunk, keeping count of the buffered bytes.
+		'''
+		return self._take_chunk(self._dequeue_chunks())
+
+	def _take_chunk(self, chunk):
+		'''
+			A dequeued chunk, read back from the spool file if it was spooled.
+		'''
+		if type(chunk) is int:
+			return self._read_spool(chunk)
+		if chunk:
+			self._chunk_consumed(len(chunk))
+		return chunk
+
+	def _wait_for_complete_body(self):
+		'''
+			Wait until the whole body has been received. Nothing reads the buffer meanwhile, so lift its bound first.
+		'''
+		with self._buffer_lock:
+			self._unbounded = True
+			resume = self._paused
+			self._paused = False
+
+		if resume:
+			self._resume_transfer()
+
+		self._wait_for_body()
+
 	def _cleanup_after_perform(self, curl_error=None):
 
 		if curl_error:
 			self.error = curl_error
+		elif self.body_sink_opener is not None:
+			# No body
+			self._open_body_sink()
+
+		if self.body_sink is not None:
+			try:
+				self.body_sink.close()
+			except Exception as e:
+				self._sink_error = self._sink_error or e
+
+		if self._sink_error:
+			# Couldn't write the body to its file
+			self.error = self._sink_error
 
 		# signal end of stream
 		self.chunk_queue.put(None)
@@ -168,15 +430,109 @@ class CurlStreamHandlerBase():
 		# If amt is specified (and possibly 0 or > 0)
 		return self._read_amt(amt)
 
+	def readable(self) -> bool:
+		return True
+
+	def readall(self, size_hint: typing.Optional[int]=None) -> bytes:
+		"""
+			Read all the remaining data. With the expected size (e.g. from Content-Length), it's written 
+			into a single buffer of that size as it's dequeued, instead of keeping every chunk until the end.
+		"""
+		if self.closed:
+			return b""
+
+		if self.error:
+			raise self.error
+
+		if not size_hint or size_hint <= 0:
+			return self._read_all()
+
+		return self._read_all_presized(size_hint)
+
+	def readinto(self, buffer) -> int:
+		"""
+			Read into a preallocated, writable buffer (bytearray, memoryview, mmap, ...), until it's full
+			or the body ends. Returns the number of bytes written, 0 at the end of the body.
+		"""
+		if self.closed:
+			return 0
+
+		if self.error:
+			raise self.error
+
+		view = memoryview(buffer).cast("B")
+		size = len(view)
+
+		filled = 0
+		for part in self._pop_leftover(size):
+			view[filled:filled + len(part)] = part
+			filled += len(part)
+
+		while filled < size and not self.closed and not self.quit_event.is_set():
+			if self.error:
+				raise self.error
+
+			try:
+				chunk = self._next_chunk()
+			except QueueBreakRead:
+				break
+			except QueueContinueRead:
+				continue
+
+			if chunk is None:
+				if self.perform_finished.is_set():
+					self.close()
+				break
+
+			take = min(len(chunk), size - filled)
+			view[filled:filled + take] = memoryview(chunk)[:take]
+			filled += take
+
+			if take < len(chunk):
+				# Keep the rest (the leftover is empty here)
+				self._leftover.append(chunk)
+				self._leftover_offset = take
+
+		return filled
+
+	def _pop_leftover(self, amt: typing.Optional[int]=None) -> typing.List[typing.Union[bytes, memoryview]]:
+		"""
+			Take up to `amt` bytes (all if None) of leftover data, as chunks and memoryview slices of them.
+		"""
+		parts = []
+		while self._leftover and (amt is None or amt > 0):
+			chunk = self._leftover[0]
+			offset = self._leftover_offset
+			available = len(chunk) - offset
+
+			if amt is not None and available > amt:
+				parts.append(memoryview(chunk)[offset:offset + amt])
+				self._leftover_offset += amt
+				return parts
+
+			parts.append(memoryview(chunk)[offset:] if offset else chunk)
+			self._leftover.popleft()
+			self._leftover_offset = 0
+			if amt is not None:
+				amt -= available
+
+		return parts
+
+	@staticmethod
+	def _join(parts: typing.List[typing.Union[bytes, memoryview]]) -> bytes:
+		"""
+			A single copy, or none for a single whole chunk.
+		"""
+		if len(parts) == 1 and isinstance(parts[0], bytes):
+			return parts[0]
+		return b"".join(parts)
+
 	def _read_all(self):
 		"""
 			Read *all* remaining data from leftover + queue
 		"""
-		out = bytearray()
-
 		# If there's leftover data, use it first
-		out.extend(self._leftover)
-		self._leftover.clear()
+		parts = self._pop_leftover()
 
 		# Then read new chunks until we hit None or are closed
 		while not self.closed and not self.quit_event.is_set():
@@ -184,7 +540,7 @@ class CurlStreamHandlerBase():
 				raise self.error
 			
 			try:
-				chunk = self._dequeue_chunks()
+				chunk = self._next_chunk()
 			except QueueBreakRead:
 				break
 			except QueueContinueRead:
@@ -196,31 +552,98 @@ class CurlStreamHandlerBase():
 					self.close()
 				break
 
-			out.extend(chunk)
-		return bytes(out)
+			parts.append(chunk)
+		return self._join(parts)
+
+	def _read_all_presized(self, size_hint: int):
+		"""
+			Read all into one buffer allocated upfront, and returned without another copy.
+		"""
+		body = io.BytesIO()
+		presized = False
+
+		def write(data):
+			nonlocal presized
+			if not presized:
+				# Only once some data came, and at most `max_presize`
+				presized = True
+				body.seek(min(size_hint, self.max_presize) - 1)
+				body.write(b"\0")
+				body.seek(0)
+			body.write(data)
+
+		for part in self._pop_leftover():
+			write(part)
+
+		while not self.closed and not self.quit_event.is_set():
+			if self.error:
+				raise self.error
+
+			try:
+				chunk = self._next_chunk()
+			except QueueBreakRead:
+				break
+			except QueueContinueRead:
+				continue
+
+			if chunk is None:
+				if self.perform_finished.is_set():
+					self.close()
+				break
+
+			# Grows past the presized buffer if needed
+			write(chunk)
+
+		# Shorter than expected
+		body.truncate(body.tell())
+		return body.getvalue()
+
+	def iter_chunks(self) -> typing.Iterator[bytes]:
+		"""
+			Iterate the raw body chunks as they're received, without joining them.
+		"""
+		for chunk in self._pop_leftover():
+			yield bytes(chunk) if isinstance(chunk, memoryview) else chunk
+
+		while not self.closed and not self.quit_event.is_set():
+			if self.error:
+				raise self.error
+
+			try:
+				chunk = self._next_chunk()
+			except QueueBreakRead:
+				if not self.perform_finished.is_set():
+					# Just idle (e.g. server-sent events), curl times out stalled transfers by itself
+					continue
+				break
+			except QueueContinueRead:
+				continue
+
+			if chunk is None:
+				if self.perform_finished.is_set():
+					self.close()
+				break
+
+			yield chunk
+
+		if self.error:
+			raise self.error
 
 	def _read_amt(self, amt):
 		"""
 			Read exactly `amt` bytes. Returns up to `amt`.
 		"""
-		out = bytearray()
-		needed = amt
-
 		# First, consume leftover if available
-		if self._leftover:
-			take = min(needed, len(self._leftover))
-			out.extend(self._leftover[:take])
-			del self._leftover[:take]
-			needed -= take
+		parts = self._pop_leftover(amt)
+		needed = amt - sum(len(part) for part in parts)
 
-		
 		# Read additional chunks from the queue if we still need data
 		while needed > 0 and not self.closed and not self.quit_event.is_set():
 			if self.error:
 				raise self.error
 
 			try:
-				chunk = self._dequeue_chunks()
+				chunk = self._next_chunk()
 			except QueueBreakRead:
 				break
 			except QueueContinueRead:
@@ -233,17 +656,18 @@ class CurlStreamHandlerBase():
 				break
 
 			# If the chunk is bigger than needed, take part of it
-			# and store the remainder in _leftover.
+			# and keep the rest (the leftover is empty here).
 			if len(chunk) > needed:
-				out.extend(chunk[:needed])
-				self._leftover.extend(chunk[needed:])
+				parts.append(memoryview(chunk)[:needed])
+				self._leftover.append(chunk)
+				self._leftover_offset = needed
 				needed = 0
 			else:
 				# Chunk fits entirely
-				out.extend(chunk)
+				parts.append(chunk)
 				needed -= len(chunk)
 		
-		return bytes(out)
+		return self._join(parts)
 
 	def flush(self):
 		pass
@@ -261,6 +685,7 @@ class CurlStreamHandlerBase():
 			raise Exception("Curl perform is not finished yet, cannot close.")
 		
 		self.closed = True
+		self._close_spool()
 
 	def __del__(self):
 		'''
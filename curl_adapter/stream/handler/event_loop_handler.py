@@ -0,0 +1,109 @@
+import typing
+
+import pycurl
+import curl_cffi.curl
+
+from curl_cffi.curl import CurlOpt
+
+from curl_adapter.stream.sockets.event_loop import EventLoopCurlCffi, EventLoopPyCurl
+
+from .base import (
+	CurlStreamHandlerBase,
+	QueueContinueRead,
+	QueueBreakRead,
+)
+
+from ._thread_env import (
+	_THREAD_ENV, _THREAD_CLASS, _THREAD_SLEEP, _THREAD_EVENT, _THREAD_QUEUE_MODULE
+)
+
+
+class CurlStreamHandlerEventLoop(CurlStreamHandlerBase):
+	'''
+		Curl Stream Handler (c) 2025 by Elis K.
+
+		For threaded apps. One background event loop thread drives every transfer on a single
+		curl multi handle (see `CurlEventLoopBase`), the calling threads only wait for their data.
+	'''
+
+	event_loop_curl_cffi = EventLoopCurlCffi()
+	event_loop_pycurl = EventLoopPyCurl()
+
+	cancel_timeout = 5
+	'''
+		How long `close()` waits for the loop to remove an unfinished transfer
+	'''
+
+	def _on_transfer_done(self, curl_error: typing.Optional[Exception]=None):
+		'''
+			Called from the loop thread once the handle has been removed from the multi.
+		'''
+		if self.debug:
+			print(f"[DEBUG] Closing curl. error: {bool(curl_error)}, quit_event: {self.quit_event.is_set()}")
+
+		self._cleanup_after_perform(curl_error)
+
+	def _on_buffer_full(self):
+		return self._pause_writes()
+
+	def _resume_transfer(self):
+		# Curl is only called from the loop thread
+		self.event_loop.call_soon(self._unpause_curl)
+
+	def _wait_for_headers(self):
+		if self.debug:
+			print("[DEBUG] Waiting for headers")
+		_done = self.initialized.wait(timeout=self.event_timeout)
+
+		if not _done:
+			raise self.read_timeout_error
+
+	def _wait_for_body(self):
+		if self.debug:
+			print("[DEBUG] Waiting for body")
+		self.perform_finished.wait()
+
+	def _dequeue_chunks(self):
+		try:
+			return self.chunk_queue.get(timeout=1)
+		except _THREAD_QUEUE_MODULE.Empty:
+			# The end of stream is queued too, keep waiting until it arrives
+			if self.perform_finished.is_set() and self.chunk_queue.empty():
+				raise QueueBreakRead()
+			raise QueueContinueRead()
+
+	def _perform(self):
+		if self.debug:
+			print("[DEBUG] Using Curl Event Loop Stream Handler.")
+
+		if isinstance(self.curl, curl_cffi.Curl):
+			self.curl.setopt(CurlOpt.WRITEFUNCTION, self._write_callback)
+			self.curl._ensure_cacert()
+
+			self.event_loop = self.event_loop_curl_cffi
+
+		elif isinstance(self.curl, pycurl.Curl):
+			self.curl.setopt(pycurl.WRITEFUNCTION, self._write_callback)
+
+			self.event_loop = self.event_loop_pycurl
+		else:
+			raise TypeError("Cannot perform on invalid Curl object.")
+
+		self.event_loop.add_handle(self.curl, self._on_transfer_done)
+
+	def close(self):
+		if self.closed:
+			return
+
+		if not self.perform_finished.is_set() and getattr(self, "event_loop", None):
+			self.quit_event.set()
+			self.event_loop.cancel_handle(self.curl)
+
+			if not self.event_loop.in_loop_thread():
+				self.perform_finished.wait(timeout=self.cancel_timeout)
+
+			self.closed = True
+			self._close_spool()
+			return
+
+		return super().close()
@@ -1,3 +1,5 @@
+import typing
+
 import gevent.event
 import gevent.queue
 from gevent.event import AsyncResult
@@ -19,13 +21,36 @@ class CurlStreamHandlerGevent(CurlStreamHandlerBase):
 		Curl Stream Handler (c) 2025 by Elis K.
 
 		Gevent only. Uses low-level curl socket handlers & multi interface.
+
+		All the transfers run on one long-lived multi handle per curl type, so its connection cache is
+		kept between requests. Subclass to configure it:
+
+		class StreamHandler(CurlStreamHandlerGevent):
+			rotate_every = 100_000
+			max_connects = 200
+	'''
+
+	gevent_curl_cffi: typing.Optional[GeventCurlCffi] = None
+	gevent_pycurl: typing.Optional[GeventPyCurl] = None
+
+	rotate_every: typing.Optional[int] = None
+	'''
+		Replace the multi handles every N requests, disabled by default. The old ones are closed once their
+		running transfers are done, and their cached connections with them (unless the adapter has a
+		`curl_share` sharing "connect", then the connections are kept in the share).
+	'''
+
+	max_connects: typing.Optional[int] = None
+	'''
+		Max connections kept in the connection cache of a multi handle, curl's default if None.
+	'''
+
+	sweep_interval: typing.Optional[float] = 30.0
+	'''
+		Seconds between the health sweeps of the multi handles, see `GeventCurlBase.health_sweep`.
 	'''
-	
-	gevent_curl_cffi = GeventCurlCffi()
-	gevent_pycurl = GeventPyCurl()
 
 	_requests = 0 # track the number of requests handled
-	_rotate_every = 1000 # create a new multi handle every 1000 requests
 	_lock = Semaphore()
 
 	def __init__(self, curl_instance, callback_after_perform=None, timeout=None, debug=False):
@@ -38,6 +63,7 @@ class CurlStreamHandlerGevent(CurlStreamHandlerBase):
 		self.perform_finished = gevent.event.Event() # Body has finished reading
 
 		self._future = None
+		self._driver: typing.Union[GeventCurlCffi, GeventPyCurl, None] = None
 
 		self.chunk_queue = gevent.queue.Queue()
 
@@ -53,6 +79,13 @@ class CurlStreamHandlerGevent(CurlStreamHandlerBase):
 	def _wait_for_body(self):
 		self.perform_finished.wait()
 
+	def _on_buffer_full(self):
+		return self._pause_writes()
+
+	def _resume_transfer(self):
+		# Same thread as the hub, curl isn't running right now
+		self._unpause_curl()
+
 	def _dequeue_chunks(self):
 		
 		try:
@@ -70,7 +103,8 @@ class CurlStreamHandlerGevent(CurlStreamHandlerBase):
 			self.curl.setopt(CurlOpt.WRITEFUNCTION, self._write_callback)
 			self.curl._ensure_cacert()
 
-			self._future: AsyncResult = self.gevent_curl_cffi.add_handle(
+			self._driver = self.get_driver(self.curl_type)
+			self._future: AsyncResult = self._driver.add_handle(
 				self.curl,
 				cleanup_after_perform=self._cleanup_after_perform
 			)
@@ -78,32 +112,57 @@ class CurlStreamHandlerGevent(CurlStreamHandlerBase):
 		elif self.curl_type == "pycurl":
 			self.curl.setopt(CurlOpt.WRITEFUNCTION, self._write_callback)
 
-			self._future = self.gevent_pycurl.add_handle(
+			self._driver = self.get_driver(self.curl_type)
+			self._future = self._driver.add_handle(
 				self.curl,
 				cleanup_after_perform=self._cleanup_after_perform
 			)
 	
+	@classmethod
+	def create_driver(cls, curl_type: typing.Literal["curl_cffi", "pycurl"]) -> typing.Union[GeventCurlCffi, GeventPyCurl]:
+		driver_class = GeventCurlCffi if curl_type == "curl_cffi" else GeventPyCurl
+		return driver_class(max_connects=cls.max_connects, sweep_interval=cls.sweep_interval)
+
+	@classmethod
+	def get_driver(cls, curl_type: typing.Literal["curl_cffi", "pycurl"]) -> typing.Union[GeventCurlCffi, GeventPyCurl]:
+		'''
+			The multi handle of this handler class for `curl_type`, created on first use.
+		'''
+		attribute = "gevent_curl_cffi" if curl_type == "curl_cffi" else "gevent_pycurl"
+
+		with cls._lock:
+			# Each subclass has its own, with its own options
+			driver = cls.__dict__.get(attribute)
+			if driver is None or driver.closed:
+				driver = cls.create_driver(curl_type)
+				setattr(cls, attribute, driver)
+			return driver
+
 	@classmethod
 	def check_rotate(cls):
 		'''
-			Re-initialize the `curl_multi` instances every once in a while
+			Replace the `curl_multi` instances every `rotate_every` requests, if enabled
 		'''
+		if not cls.rotate_every:
+			return False
+
 		with cls._lock:
 			cls._requests += 1
-			if cls._requests >= cls._rotate_every:
-				old_gevent_curl_cffi = cls.gevent_curl_cffi
-				old_gevent_pycurl = cls.gevent_pycurl
+			if cls._requests < cls.rotate_every:
+				return False
+			cls._requests = 0
 
-				cls.gevent_curl_cffi = GeventCurlCffi()
-				cls.gevent_pycurl = GeventPyCurl()
+			old_drivers = [cls.__dict__.get("gevent_curl_cffi"), cls.__dict__.get("gevent_pycurl")]
+			cls.gevent_curl_cffi = None
+			cls.gevent_pycurl = None
 
-				old_gevent_curl_cffi.graceful_close()
-				old_gevent_pycurl.graceful_close()
+		# Let the running transfers finish on the old ones, new requests go to new ones
+		for driver in old_drivers:
+			if driver is not None:
+				driver.graceful_close()
+
+		return True
 
-				cls._requests = 0
-				return True
-			return False
-		
 	def close(self):
 		if self.closed:
 			return
@@ -111,10 +170,8 @@ class CurlStreamHandlerGevent(CurlStreamHandlerBase):
 			print("[DEBUG] Starting to close...")
 		
 		if self._future and not self._future.ready():
-			if self.curl_type == "curl_cffi":
-				self.gevent_curl_cffi.cancel_handle(self.curl)
-			elif self.curl_type == "pycurl":
-				self.gevent_pycurl.cancel_handle(self.curl)
+			# The multi running it, even if it has been rotated since
+			self._driver.cancel_handle(self.curl)
 			self._future.result()
 
 		rotate_multi = self.__class__.check_rotate()
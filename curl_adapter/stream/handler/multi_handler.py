@@ -1,10 +1,11 @@
-import traceback
+import os
+import threading
+import typing
 
 import pycurl
 import curl_cffi.curl
 
 from curl_cffi.curl import CurlOpt
-from curl_cffi._wrapper import ffi, lib
 
 from .base import (
 	CurlStreamHandlerBase, 
@@ -15,6 +16,7 @@ from .base import (
 from ._thread_env import (
 	_THREAD_ENV, _THREAD_CLASS, _THREAD_SLEEP, _THREAD_EVENT, _THREAD_QUEUE_MODULE
 )
+from .shared_multi import SharedCurlCffiMulti, SharedPyCurlMulti
 
 
 class CurlStreamHandlerMulti(CurlStreamHandlerBase):
@@ -22,162 +24,86 @@ class CurlStreamHandlerMulti(CurlStreamHandlerBase):
 		Curl Stream Handler (c) 2025 by Elis K.
 
 		Using curl's multi interface and Python's coroutines.
-	'''
-	CURLMSG_DONE = 1
 
-	def _perform_multi_curl_cffi(self):
-		'''
-			CurlCffi multi perform
-		'''
+		All transfers share one long-lived multi handle (and its connection cache) per curl type and process,
+		driven by the threads reading from it, see `SharedCurlMultiBase`. Subclass to configure it:
 
-		#  This functions reads & saves data to our queue, one chunk at a time. Non‐blocking pass over sockets.
-		err_code = lib.curl_multi_perform(self.curl_multi, self.curl_multi_running_pointer)
+		class StreamHandler(CurlStreamHandlerMulti):
+			max_connects = 100
+	'''
 
-		transfer_complete = False
+	shared_curl_cffi_multi: typing.Optional[SharedCurlCffiMulti] = None
+	shared_pycurl_multi: typing.Optional[SharedPyCurlMulti] = None
 
-		# Get any messages for curl handle
-		if (not err_code or err_code == -1):
-			
-			# ask for the next timeout
-			if self.curl_multi_running_pointer[0]:
-				try:
-					tptr = ffi.new("long *")
-					lib.curl_multi_timeout(self.curl_multi, tptr)
-					ms = tptr[0]
-					if ms < 0:
-						ms = 1000   # or whatever “default” poll interval you like
-   					# block here until either a socket event *or* the timeout elapses
-					nfds = ffi.new("int *", 0)
-					lib.curl_multi_wait(self.curl_multi, ffi.NULL, 0, int(ms), nfds)
-				except Exception as e:
-					if self.debug:
-						traceback.print_exc()
-
-			# drain messages
-			try:
-				msgq = ffi.new("int *", 0)
-				while True:
-					msg = lib.curl_multi_info_read(self.curl_multi, msgq)
-					if msg == ffi.NULL:
-						break	
-					# CURLMSG_DONE == transfer complete
-					if msg.msg == self.CURLMSG_DONE:
-						# translate the numeric code into a CurlError
-						transfer_complete = True
-						if msg.data.result != 0:
-							self.error = self.curl._get_error(msg.data.result, "perform")
-			except:
-				if self.debug:
-					traceback.print_exc()
-		else:
-			self.error = self.curl._get_error(err_code, "perform")
-						
-		if (
-			transfer_complete
-			or self.error
-			or not self.curl_multi_running_pointer[0] 
-			or self.quit_event.is_set()
-		):
-
-			if self.debug:
-				print(f"[DEBUG] Closing curl. transfer_complete: {transfer_complete}, error: {bool(self.error)}, running: {bool(self.curl_multi_running_pointer[0])}, quit_event: {self.quit_event.is_set()}")
-			
-			self._cleanup_after_perform()
-			
-	def _perform_multi_pycurl(self):
-		'''
-			Pycurl multi perform
-		'''
-		err_code, running = self.curl_multi.perform()
+	max_connects: typing.Optional[int] = 32
+	'''
+		Max connections kept in the connection cache of a multi handle, curl's default if None (which shrinks
+		the cache as handles leave the multi).
+	'''
 
-		transfer_complete = False
-		
-		if running and (not err_code or err_code == pycurl.E_CALL_MULTI_PERFORM):
-			
-			# Blocking poll sleep before next call
-			ms = self.curl_multi.timeout()
-			if ms < 0:
-				ms = 1000
-			self.curl_multi.select(ms / 1000.0)
+	_lock = threading.Lock()
 
-			# I don't know why we need to run perform again straight away after socket select, but it works for reading the error messages, so let's leave it like that
-			err_code, running = self.curl_multi.perform()
+	_inherited_multis: typing.List[typing.Union[SharedCurlCffiMulti, SharedPyCurlMulti]] = []
+	'''
+		The multis of the parent process, replaced after a fork. Never cleaned up: closing their connections
+		would disturb the parent's.
+	'''
 
-		
-		if (not err_code or err_code == pycurl.E_CALL_MULTI_PERFORM):
-			try:
-				# Check curl handle messages
-				while True:
-					num_q, ok_list, err_list = self.curl_multi.info_read()
-					
-					if len(ok_list):
-						transfer_complete = True
-
-					if len(err_list):
-						# err_list is a list of (handle, errno, errmsg)
-						_, errno, errmsg = err_list[0]
-						self.error = pycurl.error(errno, errmsg)
-					
-					if num_q == 0:
-						break
-				
-			except:
-				if self.debug:
-					traceback.print_exc()
-		else:
-			self.error = pycurl.error(err_code, "perform")
-			
+	@classmethod
+	def create_shared_multi(cls, curl_type: typing.Literal["curl_cffi", "pycurl"]) -> typing.Union[SharedCurlCffiMulti, SharedPyCurlMulti]:
+		multi_class = SharedCurlCffiMulti if curl_type == "curl_cffi" else SharedPyCurlMulti
+		return multi_class(max_connects=cls.max_connects)
 
-		if (
-			transfer_complete
-			or not running 
-			or self.error
-			or self.quit_event.is_set()
-		):
+	@classmethod
+	def get_shared_multi(cls, curl_type: typing.Literal["curl_cffi", "pycurl"]) -> typing.Union[SharedCurlCffiMulti, SharedPyCurlMulti]:
+		'''
+			The multi handle of this handler class for `curl_type`, created on first use, and again in a forked child.
+		'''
+		attribute = "shared_curl_cffi_multi" if curl_type == "curl_cffi" else "shared_pycurl_multi"
+
+		with cls._lock:
+			# Each subclass has its own, with its own options
+			multi = cls.__dict__.get(attribute)
+			if multi is None or multi.pid != os.getpid():
+				if multi is not None:
+					cls._inherited_multis.append(multi)
+				multi = cls.create_shared_multi(curl_type)
+				setattr(cls, attribute, multi)
+			return multi
+
+	def _on_transfer_done(self, curl_error: typing.Optional[Exception]=None):
+		'''
+			Called by the shared multi once the handle has been removed from it.
+		'''
+		if self.debug:
+			print(f"[DEBUG] Closing curl. error: {bool(curl_error)}, quit_event: {self.quit_event.is_set()}")
 
-			if self.debug:
-				print(f"[DEBUG] Closing curl. transfer_complete: {transfer_complete}, error: {bool(self.error)}, running: {bool(running)}, quit_event: {self.quit_event.is_set()}")
-			
-			self._cleanup_after_perform()
-	
-	def _cleanup_after_perform(self):
-		try:
+		self._cleanup_after_perform(curl_error)
 
-			if self.curl_type == "pycurl":
-				self.curl_multi.remove_handle(self.curl)
-			
-			elif self.curl_type == "curl_cffi":
-				lib.curl_multi_remove_handle(self.curl_multi, self.curl._curl)
-
-		except Exception:
-			if self.debug:
-				traceback.print_exc()
-		finally:
-
-			if self.curl_type == "pycurl":
-				self.curl_multi.close()
-			elif self.curl_type == "curl_cffi":
-				lib.curl_multi_cleanup(self.curl_multi)
-			
-			self.curl_multi_running_pointer = None
-			self.curl_multi = None
-		
-		return super()._cleanup_after_perform()
+	def _on_buffer_full(self):
+		return self._pause_writes()
 
-	def _perform_multi_read(self):
-		if not self.curl_multi:
-			raise Exception("Curl perform is not running.")
+	def _resume_transfer(self):
+		# Curl is only called by the leader
+		self.curl_multi.resume_handle(self.curl)
 
-		if isinstance(self.curl, curl_cffi.Curl):
-			return self._perform_multi_curl_cffi()
+	def _perform_multi_read(self):
+		if self.perform_finished.is_set():
+			return
 
-		if isinstance(self.curl, pycurl.Curl):
-			return self._perform_multi_pycurl()
+		if not getattr(self, "curl_multi", None):
+			raise Exception("Curl perform is not running.")
 
-		raise TypeError("Cannot perform on invalid Curl object.")
+		self.curl_multi.drive()
 	
 	def _dequeue_chunks(self):
 
+		try:
+			# Already received, no need to drive the multi (it would wait on a paused transfer)
+			return self.chunk_queue.get_nowait()
+		except _THREAD_QUEUE_MODULE.Empty:
+			pass
+
 		if not hasattr(self, '_body_gen'):
 			# Body stream
 			self._body_gen = self._read_body()
@@ -225,24 +151,40 @@ class CurlStreamHandlerMulti(CurlStreamHandlerBase):
 		if self.debug:
 			print("[DEBUG] Using Curl Multi Stream Handler.")
 			
-		# Initialize curl multi
 		if isinstance(self.curl, curl_cffi.Curl):
-
 			self.curl.setopt(CurlOpt.WRITEFUNCTION, self._write_callback)
 			self.curl._ensure_cacert()
 
-			# Init Multi
-			self.curl_multi = lib.curl_multi_init()
-
-			lib.curl_multi_add_handle(self.curl_multi, self.curl._curl)
-			# running flag
-			self.curl_multi_running_pointer = ffi.new("int *", 0)
+			self.curl_multi = self.get_shared_multi("curl_cffi")
 
 		elif isinstance(self.curl, pycurl.Curl):
 			self.curl.setopt(pycurl.WRITEFUNCTION, self._write_callback)
 
-			# Init Multi
-			self.curl_multi = pycurl.CurlMulti()
-			self.curl_multi.add_handle(self.curl)
+			self.curl_multi = self.get_shared_multi("pycurl")
 		else:
 			raise TypeError("Cannot perform on invalid Curl object.")
+
+		self.curl_multi.add_handle(self.curl, self._on_transfer_done)
+
+	def close(self):
+		if self.closed:
+			return
+
+		if not self.perform_finished.is_set() and getattr(self, "curl_multi", None):
+			# Don't leave an abandoned transfer in the shared multi
+			self.quit_event.set()
+			self.curl_multi.cancel_handle(self.curl)
+			self.closed = True
+			self._close_spool()
+			return
+
+		return super().close()
+
+
+def _reset_after_fork():
+	# The lock may have been held by another thread of the parent
+	CurlStreamHandlerMulti._lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+	os.register_at_fork(after_in_child=_reset_after_fork)
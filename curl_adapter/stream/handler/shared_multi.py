@@ -0,0 +1,302 @@
+import os
+import threading
+import traceback
+import typing
+
+import pycurl
+import curl_cffi.curl
+from curl_cffi._wrapper import ffi, lib
+from curl_cffi.const import CurlMOpt
+
+CURLMSG_DONE = 1
+CURLPAUSE_CONT = 0
+
+TransferDoneCallback = typing.Callable[[typing.Optional[Exception]], None]
+
+
+class SharedCurlMultiBase():
+	'''
+		A long-lived curl multi handle, shared by the transfers of all threads.
+
+		Since the multi handle owns the connection cache, connections (and HTTP/2 multiplexing)
+		are reused across all requests, and there's no per-request multi setup.
+
+		There's no dedicated thread. Any thread waiting on a transfer tries to "lead": it drives
+		the multi for everyone (adds & removes handles, performs, polls, and routes finished transfers
+		to their callback), while the other threads wait for the round to finish, and get their data 
+		from their queues.
+
+		A multi belongs to the process that created it (`pid`): after a fork, the child must not use
+		the parent's connections.
+	'''
+
+	max_wait_ms = 1000
+	'''
+		Longest a leader blocks waiting for socket activity in a single round
+	'''
+
+	def __init__(self, debug=False):
+		self.debug = debug
+		self.pid = os.getpid()
+
+		self._lock = threading.Lock()
+		'''
+			Held by the leader
+		'''
+
+		self._round_finished = threading.Condition()
+		self._round_id = 0
+
+		self._transfers: typing.Dict[typing.Any, typing.Tuple[typing.Any, TransferDoneCallback]] = {}
+		self._pending_additions: typing.List[typing.Tuple[typing.Any, TransferDoneCallback]] = []
+		self._pending_removals: typing.List[typing.Any] = []
+		self._pending_resumes: typing.List[typing.Any] = []
+
+	def add_handle(self, curl, on_done: TransferDoneCallback):
+		'''
+			Start a transfer. `on_done` is called (from the leading thread) once the handle has been removed.
+		'''
+		self._pending_additions.append((curl, on_done))
+		self._process_pending_now()
+
+	def cancel_handle(self, curl):
+		'''
+			Remove a transfer before it's finished, `on_done` is called with an error.
+		'''
+		self._pending_removals.append(curl)
+		self._process_pending_now()
+
+	def resume_handle(self, curl):
+		'''
+			Unpause a transfer paused by its write callback.
+		'''
+		self._pending_resumes.append(curl)
+		self._process_pending_now()
+
+	def _process_pending_now(self):
+		'''
+			Additions, removals & resumes are done by the leader, between rounds. If there's no leader right now, do them here.
+
+			Safe to call from anywhere, including curl callbacks & destructors.
+		'''
+		self._wakeup()
+
+		if self._lock.acquire(blocking=False):
+			try:
+				self._process_pending()
+			finally:
+				self._lock.release()
+
+	def drive(self):
+		'''
+			Make progress on the transfers: lead a round, or wait for the current leader to finish its round.
+		'''
+		with self._round_finished:
+			round_id = self._round_id
+
+		if self._lock.acquire(blocking=False):
+			try:
+				self._process_pending()
+				self._perform_round()
+			except Exception:
+				if self.debug:
+					traceback.print_exc()
+			finally:
+				self._lock.release()
+				with self._round_finished:
+					self._round_id += 1
+					self._round_finished.notify_all()
+		else:
+			with self._round_finished:
+				if self._round_id == round_id:
+					self._round_finished.wait(timeout=self.max_wait_ms / 1000.0)
+
+	@property
+	def transfers(self) -> int:
+		return len(self._transfers)
+
+	def _process_pending(self):
+		while self._pending_additions:
+			curl, on_done = self._pending_additions.pop(0)
+			try:
+				self._add_handle(curl)
+			except Exception as e:
+				self._done((curl, on_done), e)
+				continue
+			self._transfers[self._key(curl)] = (curl, on_done)
+
+		while self._pending_removals:
+			curl = self._pending_removals.pop()
+			transfer = self._transfers.pop(self._key(curl), None)
+			if transfer is None:
+				continue
+			self._remove_handle(curl)
+			self._done(transfer, RuntimeError("Cancelled"))
+
+		while self._pending_resumes:
+			curl = self._pending_resumes.pop()
+			if self._key(curl) not in self._transfers:
+				continue
+			try:
+				curl.pause(CURLPAUSE_CONT)
+			except Exception:
+				if self.debug:
+					traceback.print_exc()
+
+	def _finish_transfer(self, key, error: typing.Optional[Exception]):
+		transfer = self._transfers.pop(key, None)
+		if transfer is None:
+			return
+		curl, _ = transfer
+		self._remove_handle(curl)
+		self._done(transfer, error)
+
+	def _done(self, transfer, error: typing.Optional[Exception]):
+		_, on_done = transfer
+		try:
+			on_done(error)
+		except Exception:
+			if self.debug:
+				traceback.print_exc()
+
+	def _key(self, curl):
+		raise NotImplementedError()
+
+	def _set_max_connects(self, max_connects: int):
+		'''
+			Bound the connection cache of the multi handle (`CURLMOPT_MAXCONNECTS`).
+		'''
+		raise NotImplementedError()
+
+	def _add_handle(self, curl):
+		raise NotImplementedError()
+
+	def _remove_handle(self, curl):
+		raise NotImplementedError()
+
+	def _wakeup(self):
+		pass
+
+	def _perform_round(self):
+		raise NotImplementedError()
+
+
+class SharedCurlCffiMulti(SharedCurlMultiBase):
+	'''
+		Shared `curl_multi` for curl_cffi handles.
+	'''
+
+	def __init__(self, debug=False, max_connects: typing.Optional[int]=None):
+		super().__init__(debug)
+		self._curl_multi = lib.curl_multi_init()
+		self._running = ffi.new("int *", 0)
+		self._msg_in_queue = ffi.new("int *", 0)
+		self._timeout = ffi.new("long *", 0)
+
+		if max_connects is not None:
+			self._set_max_connects(max_connects)
+
+	def _key(self, curl: curl_cffi.Curl):
+		return curl._curl
+
+	def _set_max_connects(self, max_connects: int):
+		# curl_multi_setopt is variadic and reads a long, not a pointer to one
+		lib.curl_multi_setopt(self._curl_multi, CurlMOpt.MAXCONNECTS, ffi.cast("void *", max_connects))
+
+	def _add_handle(self, curl: curl_cffi.Curl):
+		code = lib.curl_multi_add_handle(self._curl_multi, curl._curl)
+		if code != 0:
+			raise curl._get_error(code, "perform")
+
+	def _remove_handle(self, curl: curl_cffi.Curl):
+		lib.curl_multi_remove_handle(self._curl_multi, curl._curl)
+
+	def _wakeup(self):
+		# Interrupt the leader's poll, so it releases the multi sooner
+		lib.curl_multi_wakeup(self._curl_multi)
+
+	def _perform_round(self):
+		# Wait first, then perform: a round returns right after delivering data, so waiting readers don't
+		# sit through another poll. A newly added handle has a zero timeout.
+		lib.curl_multi_timeout(self._curl_multi, self._timeout)
+		ms = self._timeout[0]
+		if ms < 0 or ms > self.max_wait_ms:
+			ms = self.max_wait_ms
+
+		if ms > 0:
+			# block here until either a socket event *or* the timeout elapses
+			lib.curl_multi_poll(self._curl_multi, ffi.NULL, 0, int(ms), ffi.NULL)
+
+		lib.curl_multi_perform(self._curl_multi, self._running)
+
+		# Collect the finished transfers first, the messages are freed once a handle is removed
+		finished = []
+		while True:
+			msg = lib.curl_multi_info_read(self._curl_multi, self._msg_in_queue)
+			if msg == ffi.NULL:
+				break
+			if msg.msg == CURLMSG_DONE:
+				finished.append((msg.easy_handle, msg.data.result))
+
+		for easy_handle, result in finished:
+			transfer = self._transfers.get(easy_handle)
+			if transfer is None:
+				continue
+			curl, _ = transfer
+			error = curl._get_error(result, "perform") if result != 0 else None
+			self._finish_transfer(easy_handle, error)
+
+
+class SharedPyCurlMulti(SharedCurlMultiBase):
+	'''
+		Shared `pycurl.CurlMulti`. There's no way to interrupt `select`, so rounds are kept shorter.
+	'''
+
+	max_wait_ms = 100
+
+	def __init__(self, debug=False, max_connects: typing.Optional[int]=None):
+		super().__init__(debug)
+		self._curl_multi = pycurl.CurlMulti()
+
+		if max_connects is not None:
+			self._set_max_connects(max_connects)
+
+	def _key(self, curl: pycurl.Curl):
+		return curl
+
+	def _set_max_connects(self, max_connects: int):
+		self._curl_multi.setopt(pycurl.M_MAXCONNECTS, max_connects)
+
+	def _add_handle(self, curl: pycurl.Curl):
+		self._curl_multi.add_handle(curl)
+
+	def _remove_handle(self, curl: pycurl.Curl):
+		self._curl_multi.remove_handle(curl)
+
+	def _perform(self) -> int:
+		while True:
+			err_code, running = self._curl_multi.perform()
+			if err_code != pycurl.E_CALL_MULTI_PERFORM:
+				return running
+
+	def _perform_round(self):
+		ms = self._curl_multi.timeout()
+		if ms < 0 or ms > self.max_wait_ms:
+			ms = self.max_wait_ms
+
+		if ms > 0:
+			self._curl_multi.select(ms / 1000.0)
+
+		self._perform()
+
+		while True:
+			num_q, ok_list, err_list = self._curl_multi.info_read()
+
+			for curl in ok_list:
+				self._finish_transfer(curl, None)
+
+			for curl, errno, errmsg in err_list:
+				self._finish_transfer(curl, pycurl.error(errno, errmsg))
+
+			if num_q == 0:
+				break
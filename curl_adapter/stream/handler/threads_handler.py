@@ -1,3 +1,5 @@
+import threading
+
 from .base import (
 	CurlStreamHandlerBase, 
 	QueueContinueRead, 
@@ -16,6 +18,31 @@ class CurlStreamHandlerThreads(CurlStreamHandlerBase):
 		Uses threads (either native, or gevent/eventlet) to spawn curl perform in a non-blocking way.
 	'''
 
+	def __init__(self, curl_instance, callback_after_perform=None, timeout=None, debug=False):
+		super().__init__(curl_instance, callback_after_perform, timeout, debug)
+
+		self._buffer_drained = threading.Condition(self._buffer_lock)
+
+	def _on_buffer_full(self):
+		if _THREAD_ENV != "default":
+			# The perform is waited for before reading, see `_perform`
+			return None
+
+		# curl_easy_perform runs in its own thread (and can't be unpaused from another one), so just 
+		# hold it in the write callback until the reader catches up
+		resume_size = self.resume_buffer_size if self.resume_buffer_size is not None else self.max_buffer_size // 2
+		with self._buffer_drained:
+			self._paused = True
+			while not self._unbounded and not self.quit_event.is_set() and self.buffered_size > resume_size:
+				self._buffer_drained.wait(timeout=1)
+			self._paused = False
+
+		return None
+
+	def _resume_transfer(self):
+		with self._buffer_drained:
+			self._buffer_drained.notify_all()
+
 	def _wait_for_headers(self):
 		if self.debug:
 			print("[DEBUG] Waiting for headers")
@@ -52,6 +79,10 @@ class CurlStreamHandlerThreads(CurlStreamHandlerBase):
 			return
 		
 		if self._future:
+			if not self.perform_finished.is_set():
+				# Don't wait for a writer held by a full buffer
+				self.quit_event.set()
+				self._resume_transfer()
 			self._future.result() 
 
 		return super().close()
@@ -1,9 +1,9 @@
 import collections
 from contextlib import contextmanager
-import io
 
 from urllib3.util import parse_url
 from urllib3.response import HTTPResponse
+from urllib3.exceptions import IncompleteRead
 from urllib3._collections import HTTPHeaderDict
 
 import requests
@@ -38,6 +38,8 @@ class BytesQueueBuffer:
     def __init__(self) -> None:
         self.buffer: typing.Deque[bytes] = collections.deque()
         self._size: int = 0
+        self._offset: int = 0
+        """Bytes of the first chunk already returned, instead of re-slicing it"""
 
     def __len__(self) -> int:
         return self._size
@@ -54,39 +56,45 @@ class BytesQueueBuffer:
         elif n < 0:
             raise ValueError("n should be > 0")
 
-        fetched = 0
-        ret = io.BytesIO()
-        while fetched < n:
-            remaining = n - fetched
-            chunk = self.buffer.popleft()
-            chunk_length = len(chunk)
-            if remaining < chunk_length:
-                left_chunk, right_chunk = chunk[:remaining], chunk[remaining:]
-                ret.write(left_chunk)
-                self.buffer.appendleft(right_chunk)
+        # A whole chunk is returned as is
+        chunk = self.buffer[0]
+        if self._offset == 0 and len(chunk) == n:
+            self.buffer.popleft()
+            self._size -= n
+            return chunk
+
+        parts = []
+        remaining = n
+        while remaining > 0 and self.buffer:
+            chunk = self.buffer[0]
+            available = len(chunk) - self._offset
+            if remaining < available:
+                parts.append(memoryview(chunk)[self._offset:self._offset + remaining])
+                self._offset += remaining
                 self._size -= remaining
                 break
-            else:
-                ret.write(chunk)
-                self._size -= chunk_length
-            fetched += chunk_length
 
-            if not self.buffer:
-                break
+            parts.append(memoryview(chunk)[self._offset:] if self._offset else chunk)
+            self.buffer.popleft()
+            self._offset = 0
+            self._size -= available
+            remaining -= available
 
-        return ret.getvalue()
+        return b"".join(parts)
 
     def get_all(self) -> bytes:
         buffer = self.buffer
         if not buffer:
             assert self._size == 0
             return b""
-        if len(buffer) == 1:
+        if len(buffer) == 1 and self._offset == 0:
             result = buffer.pop()
         else:
-            ret = io.BytesIO()
-            ret.writelines(buffer.popleft() for _ in range(len(buffer)))
-            result = ret.getvalue()
+            parts = [memoryview(buffer.popleft())[self._offset:]]
+            parts.extend(buffer)
+            buffer.clear()
+            result = b"".join(parts)
+        self._offset = 0
         self._size = 0
         return result
 		
@@ -186,6 +194,10 @@ class CurlStreamResponse(HTTPResponse):
 		# Determine length of response
 		self.length_remaining = self._init_length(method)
 
+		if curl_stream_handler.body_sink is not None:
+			# The body is saved to a file, there's nothing to read here
+			self.length_remaining = 0
+
 		self._decoded_buffer = BytesQueueBuffer()
 
 		# If requested, preload the body.
@@ -216,6 +228,77 @@ class CurlStreamResponse(HTTPResponse):
 		return super()._decode(data, decode_content, flush_decoder)
 
 
+	def _fp_read(self, amt=None, **kwargs):
+		if amt is None and not kwargs.get("read1") and self._fp is not None:
+			# The raw body size is only known if curl doesn't decode it
+			size_hint = self.length_remaining if (
+				self._handle_content_decoding or not self.headers.get("content-encoding")
+			) else None
+			return self._fp.readall(size_hint)
+
+		return super()._fp_read(amt, **kwargs)
+
+	def stream(self, amt=2**16, decode_content=None):
+		'''
+			With `amt=None` (`iter_content(chunk_size=None)`), yield the chunks as curl delivers them,
+			instead of waiting for the whole body.
+		'''
+		if amt is not None:
+			yield from super().stream(amt, decode_content=decode_content)
+			return
+
+		yield from self._stream_chunks(decode_content)
+
+	def _stream_chunks(self, decode_content=None):
+		if decode_content is None:
+			decode_content = self.decode_content
+
+		self._init_decoder()
+
+		if len(self._decoded_buffer):
+			yield self._decoded_buffer.get_all()
+
+		if self._fp is None:
+			return
+
+		for chunk in self._fp.iter_chunks():
+			self._fp_bytes_read += len(chunk)
+			if self.length_remaining is not None:
+				self.length_remaining -= len(chunk)
+
+			data = self._decode(chunk, decode_content, flush_decoder=False)
+			if data:
+				yield data
+
+		data = self._decode(b"", decode_content, flush_decoder=True)
+		if data:
+			yield data
+
+		if self.enforce_content_length and (self.length_remaining or 0) > 0:
+			raise IncompleteRead(self._fp_bytes_read, self.length_remaining)
+
+	def readinto(self, b) -> int:
+		'''
+			Read straight into a preallocated buffer (e.g. wrapped in `io.BufferedReader`), when there's nothing to decode here.
+		'''
+		self._init_decoder()
+		if (self._handle_content_decoding and self.decode_content and self._decoder) or len(self._decoded_buffer):
+			return super().readinto(b)
+
+		if self._fp is None or self._fp.closed:
+			return 0
+
+		amt = self._fp.readinto(b)
+
+		if amt:
+			self._fp_bytes_read += amt
+			if self.length_remaining is not None:
+				self.length_remaining -= amt
+		elif len(memoryview(b)) and self.enforce_content_length and self.length_remaining:
+			raise IncompleteRead(self._fp_bytes_read, self.length_remaining)
+
+		return amt
+
 	def shutdown(self, *args, **kwargs):
 		self._fp.close()
 		pass
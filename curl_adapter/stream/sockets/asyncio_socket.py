@@ -0,0 +1,146 @@
+import asyncio
+import typing
+import weakref
+
+from .multi_socket import (
+	CurlMultiSocketBase,
+	CurlCffiMultiSocket,
+	PyCurlMultiSocket,
+	TransferDoneCallback,
+	CURL_POLL_IN,
+	CURL_POLL_OUT,
+	CURL_POLL_INOUT,
+	CURL_POLL_REMOVE,
+	CURL_SOCKET_TIMEOUT,
+	CURL_CSELECT_IN,
+	CURL_CSELECT_OUT,
+)
+
+
+class AsyncioCurlBase(CurlMultiSocketBase):
+	'''
+		Drives a curl multi handle from an asyncio event loop: `loop.add_reader`/`loop.add_writer`
+		for curl's sockets, and `loop.call_later` for its timer.
+
+		Only use it from the thread of its loop. Needs a selector based loop (the default one, uvloop),
+		the Windows proactor loop doesn't support `add_reader`.
+
+		Usage:
+
+		asyncio_curl = AsyncioCurlCffi(asyncio.get_running_loop())
+		asyncio_curl.add_handle(curl_handle, on_done)
+	'''
+
+	def __init__(self, loop: asyncio.AbstractEventLoop, debug=False):
+		super().__init__(debug)
+
+		# Don't keep the loop alive, the multi is cleaned up along with it
+		self._loop_ref = weakref.ref(loop)
+
+		self._timer: typing.Optional[asyncio.Handle] = None
+		self._watched: typing.Dict[int, int] = {}
+		'''
+			Watched socket fds with their `CURL_POLL_*` mask
+		'''
+
+		self.closed = False
+
+	@property
+	def loop(self) -> typing.Optional[asyncio.AbstractEventLoop]:
+		return self._loop_ref()
+
+	def add_handle(self, curl, on_done: TransferDoneCallback):
+		'''
+			Start a transfer. `on_done` is called once the handle has been removed.
+		'''
+		if self.closed:
+			raise RuntimeError("This curl_multi instance is closed.")
+
+		self._add_transfer(curl, on_done)
+
+	def cancel_handle(self, curl):
+		'''
+			Remove a transfer before it's finished, `on_done` is called with an error.
+		'''
+		self._cancel_transfer(curl)
+
+	def close(self):
+		'''
+			Cancel the running transfers, remove the readers, writers & timer, and cleanup the multi handle.
+		'''
+		if self.closed:
+			return
+		self.closed = True
+
+		self._cancel_all_transfers()
+
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+
+		loop = self.loop
+		for sockfd in list(self._watched.keys()):
+			self._unwatch(loop, sockfd)
+
+		self._cleanup_multi()
+
+	def _on_timer(self, timeout_ms: int):
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+
+		loop = self.loop
+		if self.closed or loop is None or timeout_ms < 0:
+			# -1 means delete the timer, we already did
+			return
+
+		if timeout_ms == 0:
+			self._timer = loop.call_soon(self._process_data, CURL_SOCKET_TIMEOUT, 0)
+		else:
+			self._timer = loop.call_later(timeout_ms / 1000.0, self._process_data, CURL_SOCKET_TIMEOUT, 0)
+
+	def _on_socket(self, sockfd: int, what: int):
+		loop = self.loop
+		if loop is None:
+			return
+
+		mask = 0 if what & CURL_POLL_REMOVE else what & CURL_POLL_INOUT
+		if self._watched.get(sockfd, 0) == mask:
+			return
+
+		self._unwatch(loop, sockfd)
+
+		if mask & CURL_POLL_IN:
+			loop.add_reader(sockfd, self._process_data, sockfd, CURL_CSELECT_IN)
+		if mask & CURL_POLL_OUT:
+			loop.add_writer(sockfd, self._process_data, sockfd, CURL_CSELECT_OUT)
+		if mask:
+			self._watched[sockfd] = mask
+
+	def _unwatch(self, loop: typing.Optional[asyncio.AbstractEventLoop], sockfd: int):
+		mask = self._watched.pop(sockfd, 0)
+		if loop is None or loop.is_closed():
+			return
+		if mask & CURL_POLL_IN:
+			loop.remove_reader(sockfd)
+		if mask & CURL_POLL_OUT:
+			loop.remove_writer(sockfd)
+
+	def _process_data(self, sockfd: int, ev_bitmask: int):
+		if self.closed:
+			return
+
+		self._socket_action(sockfd, ev_bitmask)
+		self._check_finished()
+
+
+class AsyncioCurlCffi(AsyncioCurlBase, CurlCffiMultiSocket):
+	'''
+		Asyncio driver for curl_cffi handles.
+	'''
+
+
+class AsyncioPyCurl(AsyncioCurlBase, PyCurlMultiSocket):
+	'''
+		Asyncio driver for pycurl handles.
+	'''
@@ -0,0 +1,280 @@
+import collections
+import os
+import selectors
+import socket
+import threading
+import time
+import traceback
+import typing
+import weakref
+
+from .multi_socket import (
+	CurlMultiSocketBase,
+	CurlCffiMultiSocket,
+	PyCurlMultiSocket,
+	TransferDoneCallback,
+	CURL_POLL_IN,
+	CURL_POLL_OUT,
+	CURL_POLL_REMOVE,
+	CURL_SOCKET_TIMEOUT,
+	CURL_CSELECT_IN,
+	CURL_CSELECT_OUT,
+)
+
+
+class CurlEventLoopBase(CurlMultiSocketBase):
+	'''
+		A dedicated event loop thread owning a single curl multi handle.
+
+		Curl tells us which sockets to watch (socket callback) and when to wake up (timer callback),
+		the loop waits on all of them at once with `selectors` (epoll/kqueue), and calls `socket_action`
+		for the ready ones. Other threads never touch the multi: they submit commands, and wait on
+		their own events & chunk queues.
+
+		In a forked child, the loop starts over with its own thread, selector & multi (see `_after_fork_in_child`).
+
+		Usage:
+
+		event_loop = EventLoopCurlCffi()
+		event_loop.add_handle(curl_handle, on_done)
+	'''
+
+	thread_name = "curl-adapter-event-loop"
+
+	def __init__(self, debug=False):
+		super().__init__(debug)
+
+		self.closed = False
+		self._init_loop()
+
+		_event_loops.add(self)
+
+	def _init_loop(self):
+		self._selector = selectors.DefaultSelector()
+		self._watched: typing.Dict[int, int] = {}
+		'''
+			Watched socket fds with their selector events
+		'''
+
+		self._timer_deadline: typing.Optional[float] = None
+
+		self._wakeup_reader, self._wakeup_writer = socket.socketpair()
+		self._wakeup_reader.setblocking(False)
+		self._wakeup_writer.setblocking(False)
+		self._selector.register(self._wakeup_reader, selectors.EVENT_READ)
+
+		self._commands: typing.Deque[typing.Tuple[typing.Callable, tuple]] = collections.deque()
+
+		self._thread: typing.Optional[threading.Thread] = None
+		self._lock = threading.Lock()
+
+	def _after_fork_in_child(self):
+		'''
+			The loop thread of the parent isn't running in a forked child, and the selector, wakeup sockets & multi
+			(with its connections) are shared with the parent. Start over with new ones, without the parent's transfers.
+		'''
+		if self.closed:
+			return
+
+		# Never cleaned up, closing its connections would disturb the parent's
+		_inherited_multis.append(self._curl_multi)
+
+		self._transfers = {}
+		self._init_loop()
+		self._create_multi()
+
+	def add_handle(self, curl, on_done: TransferDoneCallback):
+		'''
+			Start a transfer. `on_done` is called (from the loop thread) once the handle has been removed.
+		'''
+		self._submit(self._add_transfer, curl, on_done)
+
+	def cancel_handle(self, curl):
+		'''
+			Remove a transfer before it's finished, `on_done` is called with an error.
+		'''
+		self._submit(self._cancel_transfer, curl)
+
+	def call_soon(self, function: typing.Callable, *args):
+		'''
+			Run a function on the loop thread.
+		'''
+		self._submit(function, *args)
+
+	def in_loop_thread(self) -> bool:
+		return self._thread is threading.current_thread()
+
+	def close(self):
+		'''
+			Stop the loop thread, cancel the running transfers & cleanup the multi handle.
+		'''
+		with self._lock:
+			if self.closed:
+				return
+			self.closed = True
+			thread = self._thread
+
+		if thread is not None:
+			self._wakeup()
+			if not self.in_loop_thread():
+				thread.join()
+		else:
+			self._shutdown()
+
+	def _submit(self, function: typing.Callable, *args):
+		with self._lock:
+			if self.closed:
+				raise RuntimeError("This curl event loop is closed.")
+
+			self._commands.append((function, args))
+
+			if self._thread is None or not self._thread.is_alive():
+				self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+				self._thread.start()
+				return
+
+		self._wakeup()
+
+	def _wakeup(self):
+		try:
+			self._wakeup_writer.send(b"\0")
+		except (BlockingIOError, OSError):
+			# The socket buffer is full, the loop will wake up anyway
+			pass
+
+	def _drain_wakeup(self):
+		try:
+			while self._wakeup_reader.recv(4096):
+				pass
+		except (BlockingIOError, OSError):
+			pass
+
+	def _run(self):
+		while not self.closed:
+			try:
+				self._run_once()
+			except Exception:
+				if self.debug:
+					traceback.print_exc()
+
+		self._shutdown()
+
+	def _run_once(self):
+		if self._commands:
+			timeout = 0
+		elif self._timer_deadline is not None:
+			timeout = max(0, self._timer_deadline - time.monotonic())
+		else:
+			timeout = None
+
+		for key, events in self._selector.select(timeout):
+			if key.fileobj is self._wakeup_reader:
+				self._drain_wakeup()
+				continue
+
+			ev_bitmask = 0
+			if events & selectors.EVENT_READ:
+				ev_bitmask |= CURL_CSELECT_IN
+			if events & selectors.EVENT_WRITE:
+				ev_bitmask |= CURL_CSELECT_OUT
+
+			self._socket_action(key.fd, ev_bitmask)
+
+		while self._commands:
+			function, args = self._commands.popleft()
+			try:
+				function(*args)
+			except Exception:
+				if self.debug:
+					traceback.print_exc()
+
+		if self._timer_deadline is not None and time.monotonic() >= self._timer_deadline:
+			self._timer_deadline = None
+			self._socket_action(CURL_SOCKET_TIMEOUT, 0)
+
+		self._check_finished()
+
+	def _shutdown(self):
+		self._cancel_all_transfers()
+
+		self._commands.clear()
+
+		self._selector.close()
+		self._watched.clear()
+		self._wakeup_reader.close()
+		self._wakeup_writer.close()
+
+		self._cleanup_multi()
+
+	def _on_timer(self, timeout_ms: int):
+		if timeout_ms < 0:
+			self._timer_deadline = None
+		else:
+			self._timer_deadline = time.monotonic() + timeout_ms / 1000.0
+
+	def _on_socket(self, sockfd: int, what: int):
+		if what & CURL_POLL_REMOVE:
+			self._unwatch(sockfd)
+			return
+
+		events = 0
+		if what & CURL_POLL_IN:
+			events |= selectors.EVENT_READ
+		if what & CURL_POLL_OUT:
+			events |= selectors.EVENT_WRITE
+
+		if not events:
+			self._unwatch(sockfd)
+			return
+
+		current_events = self._watched.get(sockfd)
+		if current_events == events:
+			return
+
+		try:
+			if current_events is None:
+				self._selector.register(sockfd, events)
+			else:
+				self._selector.modify(sockfd, events)
+		except (KeyError, ValueError, OSError):
+			# The fd was closed & reused behind our back, start over
+			self._unwatch(sockfd)
+			self._selector.register(sockfd, events)
+
+		self._watched[sockfd] = events
+
+	def _unwatch(self, sockfd: int):
+		self._watched.pop(sockfd, None)
+		try:
+			self._selector.unregister(sockfd)
+		except (KeyError, ValueError, OSError):
+			pass
+
+
+_event_loops: "weakref.WeakSet[CurlEventLoopBase]" = weakref.WeakSet()
+
+_inherited_multis: typing.List[typing.Any] = []
+'''
+	The multi handles of the parent process, in a forked child
+'''
+
+
+def _reset_event_loops_after_fork():
+	for event_loop in list(_event_loops):
+		event_loop._after_fork_in_child()
+
+
+if hasattr(os, "register_at_fork"):
+	os.register_at_fork(after_in_child=_reset_event_loops_after_fork)
+
+
+class EventLoopCurlCffi(CurlEventLoopBase, CurlCffiMultiSocket):
+	'''
+		Event loop thread for curl_cffi handles.
+	'''
+
+
+class EventLoopPyCurl(CurlEventLoopBase, PyCurlMultiSocket):
+	'''
+		Event loop thread for pycurl handles.
+	'''
@@ -0,0 +1,271 @@
+import functools
+import os
+import typing
+from typing import TYPE_CHECKING
+
+import gevent
+from gevent.event import AsyncResult
+
+from .multi_socket import (
+	CurlMultiSocketBase,
+	CURL_POLL_IN,
+	CURL_POLL_OUT,
+	CURL_POLL_REMOVE,
+	CURL_SOCKET_TIMEOUT,
+	CURL_CSELECT_IN,
+	CURL_CSELECT_OUT,
+)
+
+if TYPE_CHECKING:
+	from gevent._types import _IoWatcher, _TimerWatcher # type: ignore
+
+GEVENT_READ = 1
+GEVENT_WRITE = 2
+
+
+class GeventCurlBase(CurlMultiSocketBase):
+	'''
+		Drives a curl multi handle from the gevent hub, with native loop watchers only: an io watcher
+		per curl socket, and one timer watcher for curl's timer. No greenlets are spawned, and there's
+		no polling, curl is only called when one of its sockets or its timer is ready.
+
+		The bookkeeping is bounded by the running transfers & open sockets, `max_connects` bounds the
+		connection cache, and a health sweep runs every `sweep_interval` seconds (see `health_sweep`).
+
+		Usage:
+
+		multi_curl = GeventCurlCffi()
+		result = multi_curl.add_handle(curl_handle)
+
+		result.wait()
+	'''
+
+	def __init__(self, debug=False, max_connects: typing.Optional[int]=None, sweep_interval: typing.Optional[float]=30.0):
+		super().__init__(debug)
+
+		self.loop = gevent.get_hub().loop
+
+		if max_connects is not None:
+			self._set_max_connects(max_connects)
+
+		self._timer: typing.Optional["_TimerWatcher"] = None
+		self._timer_after: typing.Optional[float] = None
+		self._timeout_callback = None
+		'''
+			Pending loop callback for an immediate (0ms) timeout
+		'''
+
+		self._watchers: typing.Dict[int, typing.Dict[str, typing.Any]] = {}
+
+		self._results: typing.Dict[typing.Any, AsyncResult] = {}
+
+		self._swept_watchers = 0
+		self._swept_results = 0
+		self._stall_kicks = 0
+
+		self._sweep_timer: typing.Optional["_TimerWatcher"] = None
+		if sweep_interval:
+			# Not referenced, the sweep alone doesn't keep the hub running
+			self._sweep_timer = self.loop.timer(sweep_interval, sweep_interval, ref=False)
+			self._sweep_timer.start(self.health_sweep)
+
+		self._start_closing = False
+		self.closed = False
+
+	def add_handle(self, curl, cleanup_after_perform: typing.Callable[[typing.Optional[Exception]], None]=None) -> AsyncResult:
+		"""Add a curl handle to be managed by curl_multi. This is the equivalent of
+		`perform` in the async world."""
+
+		if self._start_closing or self.closed:
+			raise RuntimeError("This curl_multi instance is closed.")
+
+		result = AsyncResult()
+		key = self._key(curl)
+		self._results[key] = result
+
+		self._add_transfer(curl, functools.partial(self._on_done, key, cleanup_after_perform))
+
+		return result
+
+	def cancel_handle(self, curl):
+		"""Cancel is not natively supported in gevent.AsyncResult."""
+		self._cancel_transfer(curl)
+
+	def health_sweep(self):
+		'''
+			Drop the watchers of sockets that were closed without curl telling us, and the results of
+			transfers that are gone. Then, if there are running transfers but nothing will wake curl up
+			(a missed event), kick it with a timeout action.
+		'''
+		if self.closed:
+			return
+
+		for fd in list(self._watchers.keys()):
+			try:
+				os.fstat(fd)
+			except OSError:
+				self._update_watcher(fd, 0)
+				self._swept_watchers += 1
+
+		for key in list(self._results.keys()):
+			if key not in self._transfers:
+				result = self._results.pop(key)
+				if not result.ready():
+					result.set_exception(RuntimeError("Transfer lost by the curl multi."))
+				self._swept_results += 1
+
+		timer_pending = (self._timer is not None and self._timer.active) or self._timeout_callback is not None
+		if self._transfers and not timer_pending:
+			self._stall_kicks += 1
+			self._process_data(CURL_SOCKET_TIMEOUT, 0)
+
+	def stats(self) -> typing.Dict[str, int]:
+		return {
+			"transfers": len(self._transfers),
+			"results": len(self._results),
+			"watchers": len(self._watchers),
+			"swept_watchers": self._swept_watchers,
+			"swept_results": self._swept_results,
+			"stall_kicks": self._stall_kicks,
+		}
+
+	def graceful_close(self):
+		'''
+			Close once the running transfers are finished.
+		'''
+		self._start_closing = True
+		if not self._transfers:
+			self.close()
+
+	def close(self):
+		"""Close and cleanup running timers, watchers and handles."""
+		if self.closed:
+			return
+		self.closed = True
+
+		# Close all pending futures
+		self._cancel_all_transfers()
+
+		self._cleanup_multi()
+
+		for sockfd in list(self._watchers.keys()):
+			self._update_watcher(sockfd, 0)
+
+		self._stop_timer()
+		if self._timer is not None:
+			self._timer.close()
+			self._timer = None
+
+		if self._sweep_timer is not None:
+			self._sweep_timer.stop()
+			self._sweep_timer.close()
+			self._sweep_timer = None
+
+	def _on_done(self, key, cleanup_after_perform, error: typing.Optional[Exception]=None):
+		result = self._results.pop(key, None)
+
+		try:
+			if callable(cleanup_after_perform):
+				cleanup_after_perform(error)
+		finally:
+			if result is not None and not result.ready():
+				if error is None:
+					result.set(None)
+				else:
+					result.set_exception(error)
+
+			if self._start_closing and not self._transfers:
+				self.close()
+
+	def _stop_timer(self):
+		if self._timer is not None:
+			self._timer.stop()
+
+		if self._timeout_callback is not None:
+			self._timeout_callback.stop()
+			self._timeout_callback = None
+
+	def _on_timer(self, timeout_ms: int):
+		self._stop_timer()
+
+		if self.closed or timeout_ms < 0:
+			# A timeout_ms value of -1 means you should delete the timer, we already did.
+			return
+
+		if timeout_ms == 0:
+			# Immediate timeout, run it on the next loop iteration
+			self._timeout_callback = self.loop.run_callback(self._on_timeout)
+			return
+
+		after = timeout_ms / 1000.0
+		if self._timer is None or self._timer_after != after:
+			# The delay of a timer watcher is fixed when it's created
+			if self._timer is not None:
+				self._timer.close()
+			self._timer = self.loop.timer(after)
+			self._timer_after = after
+
+		self._timer.start(self._on_timeout)
+
+	def _on_timeout(self):
+		self._timeout_callback = None
+		self._process_data(CURL_SOCKET_TIMEOUT, 0)
+
+	def _on_socket(self, sockfd: int, what: int):
+		if what & CURL_POLL_REMOVE:
+			self._update_watcher(sockfd, 0)
+			return
+
+		mask = 0
+		if what & CURL_POLL_IN:
+			mask |= GEVENT_READ
+		if what & CURL_POLL_OUT:
+			mask |= GEVENT_WRITE
+
+		self._update_watcher(sockfd, mask)
+
+	def _update_watcher(self, fd: int, mask: int):
+		"""
+		Ensure there's exactly one I/O watcher for `fd` with the given mask.
+		If mask==0, we stop+remove it. If mask changes, we stop+recreate.
+		"""
+		entry = self._watchers.get(fd)
+
+		# nothing to do if mask didn’t change
+		if entry and entry["mask"] == mask:
+			return
+
+		# stop old watcher if any
+		if entry:
+			entry["watcher"].stop()
+			entry["watcher"].close()
+			del self._watchers[fd]
+
+		# if new mask is zero, we’re done
+		if mask == 0:
+			return
+
+		watcher: "_IoWatcher" = self.loop.io(fd, mask, ref=True, priority=None)
+		watcher.start(self._on_watcher_event, fd, pass_events=True)
+
+		self._watchers[fd] = {"watcher": watcher, "mask": mask}
+
+	def _on_watcher_event(self, events: int, fd: int):
+		"""
+		A watcher fired on `fd`, tell curl which of the events are ready.
+		"""
+		ev_bitmask = 0
+		if events & GEVENT_READ:
+			ev_bitmask |= CURL_CSELECT_IN
+		if events & GEVENT_WRITE:
+			ev_bitmask |= CURL_CSELECT_OUT
+
+		self._process_data(fd, ev_bitmask)
+
+	def _process_data(self, sockfd: int, ev_bitmask: int):
+		"""Call socket_action, then read the finished transfers."""
+		if self.closed:
+			return
+
+		self._socket_action(sockfd, ev_bitmask)
+		self._check_finished()
@@ -0,0 +1,271 @@
+import traceback
+import typing
+
+import pycurl
+import curl_cffi.curl
+from curl_cffi._wrapper import ffi, lib
+from curl_cffi.const import CurlMOpt
+
+from curl_adapter._curl_cffi_ext import ext_ffi, to_curl_cffi_pointer
+
+CURL_POLL_NONE = 0
+CURL_POLL_IN = 1
+CURL_POLL_OUT = 2
+CURL_POLL_INOUT = 3
+CURL_POLL_REMOVE = 4
+
+CURL_SOCKET_TIMEOUT = -1
+
+CURL_CSELECT_IN = 0x01
+CURL_CSELECT_OUT = 0x02
+
+CURLMSG_DONE = 1
+
+TransferDoneCallback = typing.Callable[[typing.Optional[Exception]], None]
+
+
+class CurlMultiSocketBase():
+	'''
+		A curl multi handle driven with the socket interface (`curl_multi_socket_action`),
+		by an event loop of some kind.
+
+		Curl tells the driver which sockets to watch (`_on_socket`) and when to wake up (`_on_timer`),
+		the driver calls `_socket_action` when one of them is ready, then `_check_finished` to route the
+		finished transfers to their `on_done` callback.
+	'''
+
+	def __init__(self, debug=False):
+		self.debug = debug
+		self._transfers: typing.Dict[typing.Any, typing.Tuple[typing.Any, TransferDoneCallback]] = {}
+
+	@property
+	def transfers(self) -> int:
+		return len(self._transfers)
+
+	def _on_timer(self, timeout_ms: int):
+		'''
+			Curl's timer callback. Never call `socket_action` from in here, just schedule it.
+		'''
+		raise NotImplementedError()
+
+	def _on_socket(self, sockfd: int, what: int):
+		'''
+			Curl's socket callback, `what` is one of the `CURL_POLL_*` values.
+		'''
+		raise NotImplementedError()
+
+	def _add_transfer(self, curl, on_done: TransferDoneCallback):
+		try:
+			self._add_handle(curl)
+		except Exception as e:
+			self._done((curl, on_done), e)
+			return
+		self._transfers[self._key(curl)] = (curl, on_done)
+
+	def _cancel_transfer(self, curl):
+		transfer = self._transfers.pop(self._key(curl), None)
+		if transfer is None:
+			return
+		self._remove_handle(curl)
+		self._done(transfer, RuntimeError("Cancelled"))
+
+	def _cancel_all_transfers(self):
+		for curl, _ in list(self._transfers.values()):
+			self._cancel_transfer(curl)
+
+	def _finish_transfer(self, key, error: typing.Optional[Exception]):
+		transfer = self._transfers.pop(key, None)
+		if transfer is None:
+			return
+		curl, _ = transfer
+		self._remove_handle(curl)
+		self._done(transfer, error)
+
+	def _done(self, transfer, error: typing.Optional[Exception]):
+		_, on_done = transfer
+		try:
+			on_done(error)
+		except Exception:
+			if self.debug:
+				traceback.print_exc()
+
+	def _key(self, curl):
+		raise NotImplementedError()
+
+	def _create_multi(self):
+		'''
+			Create the multi handle, with the socket & timer callbacks set.
+		'''
+		raise NotImplementedError()
+
+	def _set_max_connects(self, max_connects: int):
+		'''
+			Bound the connection cache of the multi handle (`CURLMOPT_MAXCONNECTS`).
+		'''
+		raise NotImplementedError()
+
+	def _add_handle(self, curl):
+		raise NotImplementedError()
+
+	def _remove_handle(self, curl):
+		raise NotImplementedError()
+
+	def _socket_action(self, sockfd: int, ev_bitmask: int):
+		raise NotImplementedError()
+
+	def _check_finished(self):
+		raise NotImplementedError()
+
+	def _cleanup_multi(self):
+		raise NotImplementedError()
+
+
+class CurlCffiMultiSocket(CurlMultiSocketBase):
+	'''
+		Socket interface multi handle for curl_cffi handles.
+
+		The socket & timer callbacks are plain cffi callbacks, so they don't clash with the
+		`def_extern` ones of curl_cffi's asyncio and our gevent drivers.
+	'''
+
+	def __init__(self, debug=False):
+		super().__init__(debug)
+
+		self._running = ffi.new("int *", 0)
+		self._msg_in_queue = ffi.new("int *", 0)
+
+		# Keep references to the callbacks, they must live as long as the multi handle
+		self._timer_function = ext_ffi.callback("int(void *, long, void *)", self._timer_callback)
+		self._socket_function = ext_ffi.callback("int(void *, int, int, void *, void *)", self._socket_callback)
+
+		self._create_multi()
+
+	def _create_multi(self):
+		self._curl_multi = lib.curl_multi_init()
+		lib.curl_multi_setopt(self._curl_multi, CurlMOpt.TIMERFUNCTION, to_curl_cffi_pointer(self._timer_function))
+		lib.curl_multi_setopt(self._curl_multi, CurlMOpt.SOCKETFUNCTION, to_curl_cffi_pointer(self._socket_function))
+
+	def _timer_callback(self, curlm, timeout_ms: int, clientp) -> int:
+		try:
+			self._on_timer(timeout_ms)
+		except Exception:
+			# Never raise from CFFI callbacks
+			if self.debug:
+				traceback.print_exc()
+		return 0
+
+	def _socket_callback(self, curl, sockfd: int, what: int, clientp, socketp) -> int:
+		try:
+			self._on_socket(sockfd, what)
+		except Exception:
+			# Never raise from CFFI callbacks
+			if self.debug:
+				traceback.print_exc()
+		return 0
+
+	def _key(self, curl: curl_cffi.Curl):
+		return curl._curl
+
+	def _set_max_connects(self, max_connects: int):
+		# curl_multi_setopt is variadic and reads a long, not a pointer to one
+		lib.curl_multi_setopt(self._curl_multi, CurlMOpt.MAXCONNECTS, ffi.cast("void *", max_connects))
+
+	def _add_handle(self, curl: curl_cffi.Curl):
+		code = lib.curl_multi_add_handle(self._curl_multi, curl._curl)
+		if code != 0:
+			raise curl._get_error(code, "perform")
+
+	def _remove_handle(self, curl: curl_cffi.Curl):
+		lib.curl_multi_remove_handle(self._curl_multi, curl._curl)
+
+	def _socket_action(self, sockfd: int, ev_bitmask: int):
+		lib.curl_multi_socket_action(self._curl_multi, sockfd, ev_bitmask, self._running)
+
+	def _check_finished(self):
+		# Collect the finished transfers first, the messages are freed once a handle is removed
+		finished = []
+		while True:
+			msg = lib.curl_multi_info_read(self._curl_multi, self._msg_in_queue)
+			if msg == ffi.NULL:
+				break
+			if msg.msg == CURLMSG_DONE:
+				finished.append((msg.easy_handle, msg.data.result))
+
+		for easy_handle, result in finished:
+			transfer = self._transfers.get(easy_handle)
+			if transfer is None:
+				continue
+			curl, _ = transfer
+			error = curl._get_error(result, "perform") if result != 0 else None
+			self._finish_transfer(easy_handle, error)
+
+	def _cleanup_multi(self):
+		if self._curl_multi:
+			curl_multi = self._curl_multi
+			self._curl_multi = None
+			lib.curl_multi_cleanup(curl_multi)
+
+
+class PyCurlMultiSocket(CurlMultiSocketBase):
+	'''
+		Socket interface multi handle for pycurl handles.
+	'''
+
+	def __init__(self, debug=False):
+		super().__init__(debug)
+		self._create_multi()
+
+	def _create_multi(self):
+		self._curl_multi = pycurl.CurlMulti()
+		self._curl_multi.setopt(pycurl.M_TIMERFUNCTION, self._timer_callback)
+		self._curl_multi.setopt(pycurl.M_SOCKETFUNCTION, self._socket_callback)
+
+	def _timer_callback(self, timeout_ms: int):
+		try:
+			self._on_timer(timeout_ms)
+		except Exception:
+			if self.debug:
+				traceback.print_exc()
+
+	def _socket_callback(self, what: int, sockfd: int, multi, socketp):
+		try:
+			self._on_socket(sockfd, what)
+		except Exception:
+			if self.debug:
+				traceback.print_exc()
+
+	def _key(self, curl: pycurl.Curl):
+		return curl
+
+	def _set_max_connects(self, max_connects: int):
+		self._curl_multi.setopt(pycurl.M_MAXCONNECTS, max_connects)
+
+	def _add_handle(self, curl: pycurl.Curl):
+		self._curl_multi.add_handle(curl)
+
+	def _remove_handle(self, curl: pycurl.Curl):
+		self._curl_multi.remove_handle(curl)
+
+	def _socket_action(self, sockfd: int, ev_bitmask: int):
+		while True:
+			err_code, _ = self._curl_multi.socket_action(sockfd, ev_bitmask)
+			if err_code != pycurl.E_CALL_MULTI_PERFORM:
+				return
+
+	def _check_finished(self):
+		while True:
+			num_q, ok_list, err_list = self._curl_multi.info_read()
+
+			for curl in ok_list:
+				self._finish_transfer(curl, None)
+
+			for curl, errno, errmsg in err_list:
+				self._finish_transfer(curl, pycurl.error(errno, errmsg))
+
+			if num_q == 0:
+				break
+
+	def _cleanup_multi(self):
+		if self._curl_multi is not None:
+			self._curl_multi.close()
+			self._curl_multi = None
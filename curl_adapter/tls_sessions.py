@@ -0,0 +1,199 @@
+import base64
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+import typing
+
+import curl_cffi.curl
+
+from ._curl_cffi_ext import ext_ffi, ext_lib, from_curl_cffi_pointer
+
+CURLE_OK = 0
+
+STORE_VERSION = 1
+
+
+class CurlTLSSession(typing.NamedTuple):
+	key: typing.Optional[str]
+	'''
+		curl's peer key: host, port & the TLS configuration. None when curl only gives its salted hash (`shmac`)
+	'''
+	shmac: bytes
+	data: bytes
+	valid_until: int
+	alpn: typing.Optional[str]
+	early_data_max: int
+
+	def to_json(self) -> dict:
+		return {
+			"key": self.key,
+			"shmac": base64.b64encode(self.shmac).decode(),
+			"data": base64.b64encode(self.data).decode(),
+			"valid_until": self.valid_until,
+			"alpn": self.alpn,
+			"early_data_max": self.early_data_max,
+		}
+
+	@classmethod
+	def from_json(cls, session: dict) -> "CurlTLSSession":
+		return cls(
+			key=session["key"],
+			shmac=base64.b64decode(session["shmac"]),
+			data=base64.b64decode(session["data"]),
+			valid_until=session["valid_until"],
+			alpn=session.get("alpn"),
+			early_data_max=session.get("early_data_max", 0),
+		)
+
+
+class CurlTLSSessionStore():
+	'''
+		TLS sessions (tickets) saved to a file, so they can be resumed after a restart, instead of starting
+		with a full handshake to every origin.
+
+		Sessions are exported from a curl share handle's TLS session cache (`curl_easy_ssls_export`), and imported
+		into another one (`curl_easy_ssls_import`), per impersonation profile. curl only resumes a session with the same
+		host, port & TLS configuration it was made with. Requires libcurl 8.12 or newer.
+
+		The file holds the keys of the sessions, it's only readable by its owner.
+	'''
+
+	def __init__(self, path: str, max_sessions: int=1000):
+		self.path = path
+		self.max_sessions = max_sessions
+		'''
+			Most sessions kept per profile, the ones expiring last are kept.
+		'''
+
+		self._profiles: typing.Dict[str, typing.List[CurlTLSSession]] = {}
+		'''
+			Profile -> its sessions
+		'''
+		self._lock = threading.RLock()
+
+		self._exported: typing.List[CurlTLSSession] = []
+		# Keep a reference to the callback, it must live as long as the store
+		self._export_function = ext_ffi.callback("curl_ssls_export_cb", self._export_session)
+
+		self.load()
+
+	@classmethod
+	@functools.lru_cache(maxsize=None)
+	def open(cls, path: str) -> "CurlTLSSessionStore":
+		'''
+			The store of a file, shared by all the adapters of the process (so they don't overwrite each other's sessions).
+		'''
+		return cls(path)
+
+	def load(self):
+		'''
+			Read the sessions of the file, if it exists.
+		'''
+		try:
+			with open(self.path, "r") as f:
+				content = json.load(f)
+		except FileNotFoundError:
+			return
+
+		if content.get("version") != STORE_VERSION:
+			return
+
+		with self._lock:
+			self._profiles = {
+				profile: [CurlTLSSession.from_json(session) for session in sessions]
+				for profile, sessions in content["profiles"].items()
+			}
+
+	def save(self):
+		'''
+			Write the sessions to the file, atomically.
+		'''
+		now = time.time()
+		with self._lock:
+			content = {
+				"version": STORE_VERSION,
+				"profiles": {
+					profile: [session.to_json() for session in sessions if session.valid_until > now]
+					for profile, sessions in self._profiles.items()
+				}
+			}
+
+			directory = os.path.dirname(os.path.abspath(self.path))
+			fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".tls-sessions-") # mode 0600
+			try:
+				with os.fdopen(fd, "w") as f:
+					json.dump(content, f)
+				os.replace(temp_path, self.path)
+			except BaseException:
+				os.unlink(temp_path)
+				raise
+
+	def sessions(self, profile: str) -> typing.List[CurlTLSSession]:
+		with self._lock:
+			return list(self._profiles.get(profile, ()))
+
+	def import_sessions(self, curl: curl_cffi.Curl, profile: str) -> int:
+		'''
+			Import the sessions of a profile into the TLS session cache of a handle (the one of its share handle, if any).
+			Returns the number of sessions imported.
+		'''
+		now = time.time()
+		handle = from_curl_cffi_pointer(curl._curl)
+
+		count = 0
+		for session in self.sessions(profile):
+			if session.valid_until <= now:
+				continue
+
+			code = ext_lib.curl_easy_ssls_import(
+				handle,
+				session.key.encode() if session.key is not None else ext_ffi.NULL,
+				session.shmac,
+				len(session.shmac),
+				session.data,
+				len(session.data)
+			)
+			if code == CURLE_OK:
+				count += 1
+		return count
+
+	def export_sessions(self, curl: curl_cffi.Curl, profile: str) -> int:
+		'''
+			Export the sessions of a handle's TLS session cache, replacing the profile's sessions with the same keys.
+			Returns the number of sessions exported.
+		'''
+		with self._lock:
+			self._exported = []
+			code = ext_lib.curl_easy_ssls_export(from_curl_cffi_pointer(curl._curl), self._export_function, ext_ffi.NULL)
+			exported, self._exported = self._exported, []
+
+			if code != CURLE_OK:
+				raise RuntimeError(f"curl_easy_ssls_export failed with code: {code}")
+
+			exported_peers = {session.key or session.shmac for session in exported}
+			now = time.time()
+
+			sessions = exported + [
+				session for session in self._profiles.get(profile, ())
+				if (session.key or session.shmac) not in exported_peers and session.valid_until > now
+			]
+			sessions.sort(key=lambda session: session.valid_until, reverse=True)
+			self._profiles[profile] = sessions[:self.max_sessions]
+
+			return len(exported)
+
+	def _export_session(
+		self, handle, userptr, session_key, shmac, shmac_len, sdata, sdata_len, valid_until, ietf_tls_id, alpn, earlydata_max
+	) -> int:
+		self._exported.append(CurlTLSSession(
+			key=ext_ffi.string(session_key).decode() if session_key != ext_ffi.NULL else None,
+			shmac=bytes(ext_ffi.buffer(shmac, shmac_len)) if shmac != ext_ffi.NULL else b"",
+			data=bytes(ext_ffi.buffer(sdata, sdata_len)),
+			valid_until=valid_until,
+			alpn=ext_ffi.string(alpn).decode() if alpn != ext_ffi.NULL else None,
+			early_data_max=earlydata_max,
+		))
+		return CURLE_OK
@@ -0,0 +1,118 @@
+import io
+import os
+import traceback
+import typing
+
+import pycurl
+import curl_cffi.curl
+from curl_cffi.curl import CurlOpt
+
+CURL_READFUNC_ABORT = 0x10000000
+
+CURL_SEEKFUNC_OK = 0
+CURL_SEEKFUNC_FAIL = 1
+CURL_SEEKFUNC_CANTSEEK = 2
+
+
+def is_streamed_body(body) -> bool:
+	'''
+		Whether a request body is read while it's sent (a file-like object or an iterator), instead of being passed as a whole.
+	'''
+	if body is None or isinstance(body, (bytes, bytearray, memoryview, str)):
+		return False
+	return hasattr(body, "read") or hasattr(body, "__iter__")
+
+
+class RequestBodyReader():
+	'''
+		Curl read callback of a streamed request body, reading a file-like object or an iterator
+		of chunks as curl asks for data. Only one chunk is held at once.
+
+		File-like objects that can seek are rewound by curl when it has to send the body again
+		(e.g. on a connection that turned out to be dead).
+	'''
+
+	def __init__(self, body, debug=False):
+		self.debug = debug
+		self.error: typing.Optional[Exception] = None
+		'''
+			Raised by the body while reading it, the transfer is aborted
+		'''
+
+		self._file = body if hasattr(body, "read") else None
+		self._iterator = iter(body) if self._file is None else None
+
+		self._chunk: memoryview = memoryview(b"")
+
+		self._start_position = None
+		if self._file is not None:
+			try:
+				self._start_position = self._file.tell()
+			except (AttributeError, OSError, io.UnsupportedOperation):
+				pass
+
+	def read(self, size: int):
+		'''
+			The read callback: up to `size` bytes, empty at the end of the body.
+		'''
+		try:
+			if self._file is not None:
+				data = self._file.read(size)
+			else:
+				data = self._next(size)
+		except Exception as e:
+			self.error = e
+			if self.debug:
+				traceback.print_exc()
+			return CURL_READFUNC_ABORT
+
+		if isinstance(data, str):
+			data = data.encode("utf-8")
+		return data or b""
+
+	def _next(self, size: int) -> bytes:
+		while not self._chunk:
+			chunk = next(self._iterator, None)
+			if chunk is None:
+				return b""
+			if isinstance(chunk, str):
+				chunk = chunk.encode("utf-8")
+			if isinstance(chunk, bytes) and 0 < len(chunk) <= size:
+				# Fits, as is
+				return chunk
+			self._chunk = memoryview(chunk).cast("B")
+
+		data = self._chunk[:size]
+		self._chunk = self._chunk[size:]
+		return bytes(data)
+
+	def seek(self, offset: int, origin: int=os.SEEK_SET):
+		'''
+			Rewind, for curl_cffi's seek callback (`SEEKDATA`). Raises OSError if it can't.
+		'''
+		if self._start_position is None or origin != os.SEEK_SET:
+			raise OSError("The request body can't be rewound.")
+		self._file.seek(self._start_position + offset)
+
+	def seek_callback(self, offset: int, origin: int) -> int:
+		'''
+			pycurl's seek callback.
+		'''
+		try:
+			self.seek(offset, origin)
+		except OSError:
+			return CURL_SEEKFUNC_CANTSEEK
+		except Exception:
+			return CURL_SEEKFUNC_FAIL
+		return CURL_SEEKFUNC_OK
+
+	def attach(self, curl: typing.Union[curl_cffi.Curl, pycurl.Curl]):
+		curl.setopt(CurlOpt.READFUNCTION, self.read)
+
+		if self._start_position is None:
+			return
+
+		if isinstance(curl, pycurl.Curl):
+			curl.setopt(pycurl.SEEKFUNCTION, self.seek_callback)
+		else:
+			curl.setopt(CurlOpt.SEEKDATA, self)
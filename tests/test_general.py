@@ -1,8 +1,14 @@
 '''
 	Just run: pytest
 '''
+import asyncio
+import io
+import os
 from contextlib import contextmanager
 from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+import time
 
 import gevent
 from gevent.pywsgi import WSGIServer
@@ -10,10 +16,17 @@ import pytest
 import requests
 import requests.adapters
 from curl_cffi.const import CurlHttpVersion
+from urllib3._collections import HTTPHeaderDict
+import pycurl
 from curl_adapter import CurlCffiAdapter, PyCurlAdapter, CurlInfo
+from curl_adapter.pool import CurlHandlePool
 from curl_adapter.stream.handler.gevent_handler import CurlStreamHandlerGevent
 from curl_adapter.stream.handler.threads_handler import CurlStreamHandlerThreads
 from curl_adapter.stream.handler.base import CurlStreamHandlerBase
+from curl_adapter.stream.handler.multi_handler import CurlStreamHandlerMulti
+from curl_adapter.stream.handler.event_loop_handler import CurlStreamHandlerEventLoop
+from curl_adapter.stream.handler.asyncio_handler import CurlStreamHandlerAsyncio
+from curl_adapter.stream.response import CurlStreamResponse
 
 test_server = "https://httpbingo.org" #httpbin.org, httpbingo.org, postman-echo.com
 
@@ -39,6 +52,72 @@ def run_stall_stream_server():
 	finally:
 		server.stop(timeout=1)
 
+class LocalRequestHandler(BaseHTTPRequestHandler):
+	protocol_version = "HTTP/1.1"
+	disable_nagle_algorithm = True
+
+	def log_message(self, *args):
+		pass
+
+	def _send_body(self, body: bytes, status=200, content_type="text/plain"):
+		self.send_response(status)
+		self.send_header("Content-Type", content_type)
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	def do_GET(self):
+		if self.path.startswith("/bytes/"):
+			return self._send_body(b"x" * int(self.path.rsplit("/", 1)[-1]))
+		if self.path == "/slow":
+			# First half of the body, then a short stall
+			self.send_response(200)
+			self.send_header("Content-Length", "10")
+			self.end_headers()
+			self.wfile.write(b"x" * 5)
+			self.wfile.flush()
+			time.sleep(0.5)
+			self.wfile.write(b"x" * 5)
+			return
+		return self._send_body(b"ok")
+
+	def _read_request_body(self) -> bytes:
+		if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+			body = bytearray()
+			while True:
+				size = int(self.rfile.readline().split(b";")[0], 16)
+				if size == 0:
+					self.rfile.readline()
+					return bytes(body)
+				body.extend(self.rfile.read(size))
+				self.rfile.readline()
+		return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+	def do_POST(self):
+		# Echo the request body
+		return self._send_body(self._read_request_body())
+
+	do_PUT = do_POST
+
+class LocalHTTPServer(ThreadingHTTPServer):
+	daemon_threads = True
+	request_queue_size = 128 # concurrent connects shouldn't overflow the listen backlog
+
+@contextmanager
+def run_local_server(request_handler=LocalRequestHandler):
+	'''
+		Keep-alive HTTP/1.1 server running in a real thread, usable with every stream handler.
+	'''
+	server = LocalHTTPServer(("127.0.0.1", 0), request_handler)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+
+	try:
+		yield f"http://127.0.0.1:{server.server_port}"
+	finally:
+		server.shutdown()
+		server.server_close()
+
 def bind_handler(adapter, stream_handler):
 	def binded(*args, **kwargs):
 		return adapter(*args, **kwargs, stream_handler=stream_handler)
@@ -284,3 +363,1477 @@ def test_curl_cffi_http_version_initializer_affects_response_http_version(http_v
 		assert int(r.raw.version) == int(expected_version)
 
 
+
+
+local_stream_handlers = [CurlStreamHandlerMulti, CurlStreamHandlerEventLoop, CurlStreamHandlerThreads, CurlStreamHandlerBase, CurlStreamHandlerGevent]
+
+@pytest.mark.parametrize("stream_handler", local_stream_handlers)
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_reuse_curl_handle_reuses_connection(adapter_class, stream_handler):
+	with run_local_server() as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class(reuse_curl_handle=True, stream_handler=stream_handler))
+
+			first = s.get(f"{local_server}/get", timeout=10)
+			first.wait_for_body()
+			second = s.get(f"{local_server}/get", timeout=10)
+			second.wait_for_body()
+
+			assert first.text == second.text == "ok"
+			assert first.curl_info["num_connects"] == 1
+			assert second.curl_info["num_connects"] == 0
+			assert second.curl_info["connect_time"] == 0
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_reuse_curl_handle_busy_handle_not_reset(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class(reuse_curl_handle=True, stream_handler=CurlStreamHandlerMulti)
+		with requests.Session() as s:
+			s.mount("http://", adapter)
+
+			streamed = s.get(f"{local_server}/slow", timeout=10, stream=True)
+			streamed_curl = adapter.curl
+
+			other = s.get(f"{local_server}/get", timeout=10)
+
+			assert adapter.curl is not streamed_curl
+			assert other.text == "ok"
+			assert streamed.content == b"x" * 10
+
+
+@pytest.mark.parametrize("handle_options", [{"reuse_curl_handle": True}, {"handle_pool_size": 1}])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_diff_curl_options(adapter_class, handle_options):
+	calls = []
+
+	class Adapter(adapter_class):
+		def apply_curl_options(self, curl, options):
+			calls.append(super().apply_curl_options(curl, options))
+			return calls[-1]
+
+	with run_local_server() as local_server:
+		with requests.Session() as s:
+			s.mount("http://", Adapter(**handle_options))
+
+			assert s.get(f"{local_server}/get", timeout=10).text == "ok"
+			assert s.get(f"{local_server}/get?second", timeout=10).text == "ok"
+			# Only the URL (and curl_cffi's header list) set again
+			assert calls[1] <= 2 < calls[0]
+
+			# Added options are set on top, removed ones reset the handle
+			assert s.post(f"{local_server}/get", data=b"body", timeout=10).text == "body"
+			assert s.get(f"{local_server}/get", timeout=10).text == "ok"
+			assert calls[2] < calls[3] and calls[3] >= calls[0]
+
+			# A changed value is set
+			assert s.get(f"{local_server}/bytes/3", timeout=5).text == "xxx"
+			assert calls[4] <= 2 + 3
+
+			r = s.get(f"{local_server}/get", headers={"X-Test": "1"}, timeout=5)
+			assert r.text == "ok" and r.request.headers["X-Test"] == "1"
+
+
+class HeaderNamesRequestHandler(LocalRequestHandler):
+	def do_GET(self):
+		return self._send_body(",".join(sorted(self.headers.keys())).encode())
+
+
+def test_profile_cache():
+	from curl_adapter.profiles import CurlProfileCache
+
+	ja3 = "771,4865-4866-4867-49195-49199-49196-49200-52393-52392-49171-49172-156-157-47-53,0-23-65281-10-11-35-16-5-13-18-51-45-43-27-17513,29-23-24,0"
+	calls = []
+
+	class Adapter(CurlCffiAdapter):
+		profile_cache = CurlProfileCache(max_size=2)
+
+		def apply_curl_options(self, curl, options):
+			calls.append(super().apply_curl_options(curl, options))
+			return calls[-1]
+
+	class UncachedAdapter(Adapter):
+		profile_cache = None
+
+	with run_local_server(HeaderNamesRequestHandler) as local_server:
+		for adapter_class in (UncachedAdapter, Adapter):
+			with requests.Session() as s:
+				s.mount("http://", adapter_class(tls_configuration_options={"ja3_str": ja3}))
+				# Impersonated (HTTP/2 upgrade attempt)
+				assert "HTTP2-Settings" in s.get(local_server, timeout=10).text.split(",")
+
+		# Cloned handles already have the impersonation & JA3 options
+		uncached_calls, cached_calls = calls
+		assert cached_calls <= uncached_calls - 5
+		assert Adapter.profile_cache.stats() == {"max_size": 2, "size": 1, "compiled": 1, "duplicated": 2, "evicted": 0}
+
+		with requests.Session() as s:
+			s.mount("http://", Adapter(http_version="v1"))
+			assert "HTTP2-Settings" not in s.get(local_server, timeout=10).text.split(",")
+
+			s.mount("http://", Adapter(tls_configuration_options={"ja3_str": ja3}))
+			s.mount("http://", Adapter(impersonate_browser_type="safari"))
+			assert s.get(local_server, timeout=10).status_code == 200
+
+		# Least recently used first
+		stats = Adapter.profile_cache.stats()
+		assert (stats["size"], stats["compiled"], stats["evicted"]) == (2, 3, 1)
+		Adapter.profile_cache.clear()
+
+
+@pytest.mark.parametrize("stream_handler", [CurlStreamHandlerMulti, CurlStreamHandlerEventLoop, CurlStreamHandlerThreads, CurlStreamHandlerBase])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_curl_share_connections_across_threads(adapter_class, stream_handler):
+	with run_local_server() as local_server:
+		adapter = adapter_class(curl_share=True, stream_handler=stream_handler)
+		curl_infos = []
+
+		def fetch():
+			response = adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+			response.wait_for_body()
+			assert response.raw.read() == b"ok"
+			curl_infos.append(response.curl_info)
+
+		try:
+			for _ in range(2):
+				# Each thread has its own thread-local curl handle
+				thread = threading.Thread(target=fetch)
+				thread.start()
+				thread.join()
+		finally:
+			adapter.close()
+
+		assert [info["num_connects"] for info in curl_infos] == [1, 0]
+
+
+def test_curl_share_invalid_data():
+	with pytest.raises(ValueError):
+		CurlCffiAdapter(curl_share=["dns", "sessions"])
+
+
+@pytest.mark.parametrize("stream_handler", [CurlStreamHandlerMulti, CurlStreamHandlerEventLoop, CurlStreamHandlerThreads, CurlStreamHandlerBase])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_handle_pool_bounded_by_concurrency(adapter_class, stream_handler):
+	with run_local_server() as local_server:
+		adapter = adapter_class(handle_pool_size=2, stream_handler=stream_handler)
+
+		def fetch():
+			for _ in range(5):
+				response = adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+				assert response.raw.read() == b"ok"
+
+		threads = [threading.Thread(target=fetch) for _ in range(6)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		stats = adapter.handle_pool.stats()
+		adapter.close()
+
+		assert stats["created"] <= 2
+		assert stats["size"] <= 2
+		assert stats["in_use"] == 0
+		assert stats["reused"] == 30 - stats["created"]
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_handle_pool_reuses_connection_and_evicts_idle(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class(handle_pool_size=1, stream_handler=CurlStreamHandlerMulti)
+		with requests.Session() as s:
+			s.mount("http://", adapter)
+
+			s.get(f"{local_server}/get", timeout=10)
+			r = s.get(f"{local_server}/get", timeout=10)
+			assert r.curl_info["num_connects"] == 0
+
+			# A streaming response holds its handle until the body is received
+			streamed = s.get(f"{local_server}/slow", timeout=10, stream=True)
+			assert adapter.handle_pool.stats()["in_use"] == 1
+			assert streamed.content == b"x" * 10
+			assert adapter.handle_pool.stats()["in_use"] == 0
+
+			adapter.handle_pool.idle_timeout = 0
+			adapter.handle_pool.evict_idle()
+			assert adapter.handle_pool.stats()["evicted"] == 1
+			assert adapter.handle_pool.stats()["size"] == 0
+
+
+def test_handle_pool_checkout_timeout():
+	pool = CurlHandlePool(pycurl.Curl, max_size=1)
+	curl = pool.checkout()
+
+	with pytest.raises(TimeoutError):
+		pool.checkout(timeout=0.1)
+
+	pool.checkin(curl)
+	assert pool.checkout(timeout=0.1) is curl
+	assert pool.stats()["waits"] == 1
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_handle_pool_exhausted_by_unread_streams(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class(handle_pool_size=1, handle_pool_timeout=0.2)
+
+		# Never read, it keeps its handle
+		streamed = adapter.send(requests.Request("GET", f"{local_server}/slow").prepare(), stream=True, timeout=10)
+
+		with pytest.raises(TimeoutError, match="all 1 are in use"):
+			adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+
+		streamed.close()
+		assert adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10).raw.read() == b"ok"
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_multi_handler_shares_connections_across_handles(adapter_class):
+	with run_local_server() as local_server:
+		# No handle reuse: every request gets a new easy handle, but the multi (and its connections) is shared
+		adapter = adapter_class(stream_handler=CurlStreamHandlerMulti)
+		results = []
+
+		def fetch():
+			for _ in range(5):
+				response = adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+				assert response.raw.read() == b"ok"
+				results.append(response.curl_info["num_connects"])
+
+		threads = [threading.Thread(target=fetch) for _ in range(8)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		assert len(results) == 40
+		assert sum(results) <= 8
+
+		shared_multi = (
+			CurlStreamHandlerMulti.shared_curl_cffi_multi if adapter_class is CurlCffiAdapter 
+			else CurlStreamHandlerMulti.shared_pycurl_multi
+		)
+		assert shared_multi.transfers == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="No os.fork")
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_multi_handler_after_fork(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=CurlStreamHandlerMulti)
+		assert adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10).raw.read() == b"ok"
+
+		reader, writer = os.pipe()
+		pid = os.fork()
+		if pid == 0:
+			# The child doesn't touch the connection of the parent
+			try:
+				response = adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=5)
+				os.write(writer, b"%s %d" % (response.raw.read(), response.curl_info["num_connects"]))
+			finally:
+				os._exit(0)
+
+		os.close(writer)
+		response = adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+		assert response.raw.read() == b"ok"
+		assert response.curl_info["num_connects"] == 0
+
+		os.waitpid(pid, 0)
+		with os.fdopen(reader, "rb") as f:
+			assert f.read() == b"ok 1"
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_multi_handler_close_cancels_unfinished_transfer(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class(handle_pool_size=1, stream_handler=CurlStreamHandlerMulti)
+
+		streamed = adapter.send(requests.Request("GET", f"{local_server}/slow").prepare(), stream=True, timeout=10)
+		streamed.close()
+
+		# The handle went back to the pool
+		assert adapter.handle_pool.stats()["in_use"] == 0
+		assert adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10).raw.read() == b"ok"
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_event_loop_handler_multiplexes_threads(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=CurlStreamHandlerEventLoop)
+		bodies = []
+
+		def fetch():
+			for _ in range(5):
+				response = adapter.send(requests.Request("GET", f"{local_server}/bytes/50000").prepare(), timeout=10)
+				bodies.append(response.raw.read())
+
+		threads = [threading.Thread(target=fetch) for _ in range(8)]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+
+		assert len(bodies) == 40
+		assert all(len(body) == 50000 for body in bodies)
+
+		event_loop = (
+			CurlStreamHandlerEventLoop.event_loop_curl_cffi if adapter_class is CurlCffiAdapter 
+			else CurlStreamHandlerEventLoop.event_loop_pycurl
+		)
+		assert event_loop.transfers == 0
+		assert [thread.name for thread in threading.enumerate()].count(event_loop.thread_name) <= 2
+
+		# Closing an unfinished stream cancels its transfer on the loop
+		streamed = adapter.send(requests.Request("GET", f"{local_server}/slow").prepare(), stream=True, timeout=10)
+		streamed.close()
+		assert event_loop.transfers == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="No os.fork")
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_event_loop_handler_after_fork(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=CurlStreamHandlerEventLoop)
+		assert adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10).raw.read() == b"ok"
+
+		reader, writer = os.pipe()
+		pid = os.fork()
+		if pid == 0:
+			# The loop thread of the parent isn't running here, the child gets its own loop & connections
+			try:
+				response = adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=5)
+				os.write(writer, b"%s %d" % (response.raw.read(), response.curl_info["num_connects"]))
+			finally:
+				os._exit(0)
+
+		os.close(writer)
+		response = adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+		assert response.raw.read() == b"ok"
+		assert response.curl_info["num_connects"] == 0
+
+		os.waitpid(pid, 0)
+		with os.fdopen(reader, "rb") as f:
+			assert f.read() == b"ok 1"
+
+
+@pytest.mark.parametrize("handle_pool_size", [None, 4])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_asend_concurrent_requests(adapter_class, handle_pool_size):
+	with run_local_server() as local_server:
+		adapter = adapter_class(handle_pool_size=handle_pool_size)
+
+		async def main():
+			responses = await asyncio.gather(*[
+				adapter.asend(requests.Request("GET", f"{local_server}/bytes/20000").prepare(), timeout=10)
+				for _ in range(30)
+			])
+
+			# The connections are kept by the loop's multi handle
+			reused = await adapter.asend(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+
+			driver = CurlStreamHandlerAsyncio.get_driver(
+				asyncio.get_running_loop(), "curl_cffi" if adapter_class is CurlCffiAdapter else "pycurl"
+			)
+			return responses, reused, driver.transfers
+
+		responses, reused, transfers = asyncio.run(main())
+
+		assert [len(response.content) for response in responses] == [20000] * 30
+		assert all(response.status_code == 200 for response in responses)
+		assert reused.text == "ok"
+		assert reused.curl_info["num_connects"] == 0
+		assert transfers == 0
+
+		if handle_pool_size:
+			assert adapter.handle_pool.stats()["in_use"] == 0
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_asend_reuses_loop_handles(adapter_class, capfd):
+	with run_local_server() as local_server:
+		adapter = adapter_class(debug=True)
+
+		async def main():
+			for _ in range(3):
+				response = await adapter.asend(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+				assert response.text == "ok"
+
+			# Past `loop_handle_pool_size`, the other transfers get a handle of their own
+			await asyncio.gather(*[
+				adapter.asend(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10)
+				for _ in range(adapter.loop_handle_pool_size + 5)
+			])
+			return adapter._loop_handle_pool(asyncio.get_running_loop()).stats()
+
+		stats = asyncio.run(main())
+
+		assert stats["created"] == adapter.loop_handle_pool_size
+		assert stats["reused"] == 3
+		assert stats["in_use"] == 0
+
+		# The debug output of every handle
+		captured = capfd.readouterr()
+		assert (captured.out + captured.err).count("GET /get") >= 3 + adapter.loop_handle_pool_size + 5
+
+		adapter.close()
+		assert not adapter._loop_handle_pools
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_asend_stream(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class()
+
+		async def main():
+			response = await adapter.asend(requests.Request("GET", f"{local_server}/slow").prepare(), stream=True, timeout=10)
+			chunks = [chunk async for chunk in response.raw._fp.aiter_chunks()]
+
+			# Closing an unfinished stream cancels the transfer
+			cancelled = await adapter.asend(requests.Request("GET", f"{local_server}/slow").prepare(), stream=True, timeout=10)
+			cancelled.close()
+
+			waited = await adapter.asend(requests.Request("GET", f"{local_server}/slow").prepare(), stream=True, timeout=10)
+			await waited.wait_for_body()
+
+			return chunks, cancelled.raw._fp.perform_finished.is_set(), waited.content
+
+		chunks, cancelled, waited_content = asyncio.run(main())
+
+		assert b"".join(chunks) == b"x" * 10
+		assert cancelled
+		assert waited_content == b"x" * 10
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_httpx_transport(adapter_class):
+	httpx = pytest.importorskip("httpx")
+	from curl_adapter.httpx_transport import CurlTransport
+
+	with run_local_server() as local_server:
+		with httpx.Client(transport=CurlTransport(adapter=adapter_class())) as client:
+			response = client.get(f"{local_server}/bytes/30000")
+			assert response.status_code == 200
+			assert response.content == b"x" * 30000
+
+			response = client.post(f"{local_server}/echo", content=b"abc")
+			assert response.content == b"abc"
+			assert response.extensions["curl_info"]["num_connects"] == 0
+
+			# Streamed without buffering
+			with client.stream("GET", f"{local_server}/slow") as response:
+				assert list(response.iter_raw()) == [b"x" * 5, b"x" * 5]
+
+			with pytest.raises(httpx.ConnectError):
+				client.get("http://127.0.0.1:1/")
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_httpx_async_transport(adapter_class):
+	httpx = pytest.importorskip("httpx")
+	from curl_adapter.httpx_transport import AsyncCurlTransport
+
+	with run_local_server() as local_server:
+		async def main():
+			async with httpx.AsyncClient(transport=AsyncCurlTransport(adapter=adapter_class())) as client:
+				responses = await asyncio.gather(*[client.get(f"{local_server}/bytes/1000") for _ in range(20)])
+				assert [response.content for response in responses] == [b"x" * 1000] * 20
+
+				async with client.stream("GET", f"{local_server}/slow") as response:
+					assert [chunk async for chunk in response.aiter_raw()] == [b"x" * 5, b"x" * 5]
+
+				with pytest.raises(httpx.ConnectError):
+					await client.get("http://127.0.0.1:1/")
+
+		asyncio.run(main())
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_send_many(adapter_class):
+	with run_local_server() as local_server:
+		adapter = adapter_class()
+
+		batch = [requests.Request("GET", f"{local_server}/bytes/{size}") for size in range(1, 101)]
+		responses = list(adapter.send_many(batch, max_concurrency=20, ordered=True))
+
+		assert [len(response.content) for response in responses] == list(range(1, 101))
+		# Connections are reused across the batch
+		assert sum(response.curl_info["num_connects"] for response in responses) <= 20
+
+		# Per host limit: 6 requests of 0.5s, 2 at a time
+		start = time.time()
+		responses = list(adapter.send_many(
+			[requests.Request("GET", f"{local_server}/slow") for _ in range(6)], max_per_host=2
+		))
+		assert 1.4 < time.time() - start < 3
+		assert [response.content for response in responses] == [b"x" * 10] * 6
+
+		results = list(adapter.send_many(
+			[requests.Request("GET", "http://127.0.0.1:1/"), requests.Request("GET", f"{local_server}/get")],
+			ordered=True,
+			return_exceptions=True
+		))
+		assert isinstance(results[0], requests.exceptions.ConnectionError)
+		assert results[1].text == "ok"
+
+		with pytest.raises(requests.exceptions.ConnectionError):
+			list(adapter.send_many([requests.Request("GET", "http://127.0.0.1:1/")]))
+
+		adapter.close()
+
+
+def test_session_map():
+	from curl_adapter.batch import session_map
+
+	with run_local_server() as local_server:
+		with requests.Session() as s:
+			s.mount("http://", CurlCffiAdapter())
+
+			responses = list(session_map(s, [requests.Request("GET", f"{local_server}/get") for _ in range(5)]))
+			assert [response.text for response in responses] == ["ok"] * 5
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_gevent_driver_concurrent_transfers_without_greenlets(adapter_class, monkeypatch):
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=CurlStreamHandlerGevent, handle_pool_size=40)
+
+		def fetch():
+			return adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10).text
+
+		jobs = [gevent.spawn(fetch) for _ in range(40)]
+
+		# The driver runs on loop watchers only, it never spawns greenlets
+		spawned = []
+		monkeypatch.setattr(gevent, "spawn", lambda *args, **kwargs: spawned.append(args))
+		monkeypatch.setattr(gevent, "spawn_later", lambda *args, **kwargs: spawned.append(args))
+
+		gevent.joinall(jobs, timeout=30)
+
+		assert [job.value for job in jobs] == ["ok"] * 40
+		assert spawned == []
+
+		adapter.close()
+
+
+@pytest.mark.parametrize("adapter_class, curl_type", [(CurlCffiAdapter, "curl_cffi"), (PyCurlAdapter, "pycurl")])
+def test_gevent_handler_rotation_keeps_fds_stable(adapter_class, curl_type):
+	import os
+
+	class StreamHandler(CurlStreamHandlerGevent):
+		rotate_every = 50
+		max_connects = 4
+
+	def open_fds():
+		return len(os.listdir("/proc/self/fd"))
+
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=StreamHandler, handle_pool_size=10)
+
+		def fetch():
+			return adapter.send(requests.Request("GET", f"{local_server}/get").prepare(), timeout=10).text
+
+		def run_batch():
+			jobs = [gevent.spawn(fetch) for _ in range(10)]
+			gevent.joinall(jobs, timeout=30)
+			assert [job.value for job in jobs] == ["ok"] * 10
+
+		run_batch()
+		driver = StreamHandler.get_driver(curl_type)
+		fds = open_fds()
+
+		for _ in range(30):
+			run_batch()
+
+		# Rotated 6 times, each old multi drained & closed along with its connections
+		assert driver.closed
+		assert open_fds() <= fds + 4
+
+		stats = StreamHandler.get_driver(curl_type).stats()
+		assert stats["transfers"] == 0 and stats["results"] == 0
+		assert stats["watchers"] <= 4
+
+		adapter.close()
+
+
+@pytest.mark.parametrize("stream_handler", [CurlStreamHandlerMulti, CurlStreamHandlerEventLoop, CurlStreamHandlerThreads, CurlStreamHandlerGevent])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_stream_backpressure_bounds_buffer(adapter_class, stream_handler):
+	class StreamHandler(stream_handler):
+		max_buffer_size = 64 * 1024
+
+	sleep = gevent.sleep if stream_handler is CurlStreamHandlerGevent else time.sleep
+	size = 4 * 1024 * 1024
+
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=StreamHandler)
+
+		r = adapter.send(requests.Request("GET", f"{local_server}/bytes/{size}").prepare(), stream=True, timeout=10)
+		sleep(0.3)
+
+		received = 0
+		for chunk in r.iter_content(16 * 1024):
+			received += len(chunk)
+			if received % (512 * 1024) == 0:
+				sleep(0.01)
+
+		assert received == size
+		# At most one chunk (CURL_MAX_WRITE_SIZE) over the high-water mark
+		assert r.raw._fp.peak_buffered_size <= 64 * 1024 + 16 * 1024
+
+		# Without streaming, the body isn't bounded
+		r = adapter.send(requests.Request("GET", f"{local_server}/bytes/{size}").prepare(), timeout=10)
+		assert len(r.content) == size
+
+		adapter.close()
+
+
+def _queued_stream_handler(chunks):
+	import curl_cffi
+
+	handler = CurlStreamHandlerBase(curl_cffi.Curl())
+	for chunk in chunks:
+		handler.chunk_queue.put(chunk)
+	handler.chunk_queue.put(None)
+	handler.perform_finished.set()
+	return handler
+
+
+@pytest.mark.parametrize("read_sizes", [[1, 7, 100, 4096, 5], [16384], [3, 20000, 1]])
+def test_stream_handler_partial_reads(read_sizes):
+	chunks = [bytes([i]) * size for i, size in enumerate([10, 16384, 1, 3000, 16384])]
+	body = b"".join(chunks)
+	handler = _queued_stream_handler(chunks)
+
+	position = 0
+	for size in read_sizes:
+		assert handler.read(size) == body[position:position + size]
+		position += size
+
+	assert handler.read() == body[position:]
+
+
+def test_stream_handler_hands_over_whole_chunks():
+	chunks = [b"a" * 10, b"b" * 16384, b"c" * 100]
+	handler = _queued_stream_handler(chunks)
+
+	assert handler.read(10) is chunks[0]
+	assert handler.read(16384) is chunks[1]
+	assert handler.read() is chunks[2]
+
+
+def test_stream_handler_readinto():
+	chunks = [bytes([i]) * size for i, size in enumerate([10, 16384, 1, 3000])]
+	body = b"".join(chunks)
+	handler = _queued_stream_handler(chunks)
+
+	buffer = bytearray(5000)
+	view = memoryview(buffer)
+	received = b""
+	while True:
+		amt = handler.readinto(view[:4099])
+		if not amt:
+			break
+		received += buffer[:amt]
+
+	assert received == body
+	assert handler.closed
+
+
+@pytest.mark.parametrize("size_hint", [20000, 19394, 100])
+def test_stream_handler_readall_presized(size_hint):
+	chunks = [b"a" * 10, b"b" * 16384, b"c" * 3000]
+	handler = _queued_stream_handler(chunks)
+
+	assert handler.read(5) == b"a" * 5
+	# Shorter & longer bodies than expected too
+	assert handler.readall(size_hint) == b"".join(chunks)[5:]
+
+
+def test_stream_handler_readall_presize_limit():
+	# A bogus Content-Length isn't allocated
+	handler = _queued_stream_handler([b"abc"])
+	assert handler.readall(2**40) == b"abc"
+
+	handler = _queued_stream_handler([])
+	assert handler.readall(2**40) == b""
+
+	class LyingRequestHandler(LocalRequestHandler):
+		def do_GET(self):
+			self.send_response(200)
+			self.send_header("Content-Length", str(2**40))
+			self.end_headers()
+			self.wfile.write(b"abc")
+			self.wfile.flush()
+			self.close_connection = True
+
+	with run_local_server(LyingRequestHandler) as local_server:
+		with requests.Session() as s:
+			s.mount("http://", CurlCffiAdapter())
+			# Incomplete body, not a MemoryError
+			with pytest.raises(requests.exceptions.RequestException):
+				s.get(local_server, timeout=10)
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_raw_buffered_reader(adapter_class):
+	size = 300000
+
+	with run_local_server() as local_server:
+		adapter = adapter_class()
+
+		r = adapter.send(requests.Request("GET", f"{local_server}/bytes/{size}").prepare(), stream=True, timeout=10)
+		r.raw.auto_close = False
+		reader = io.BufferedReader(r.raw, 8192)
+
+		received = 0
+		while True:
+			data = reader.read(3000)
+			if not data:
+				break
+			received += len(data)
+		assert received == size
+
+		# Presized from Content-Length
+		r = adapter.send(requests.Request("GET", f"{local_server}/bytes/{size}").prepare(), stream=True, timeout=10)
+		assert len(r.raw.read()) == size
+
+		adapter.close()
+
+
+class RedirectRequestHandler(LocalRequestHandler):
+	'''
+		`/redirect/<status>/<path>` redirects to `/<path>`, with a `moved` body. `/headers` lists the names of the request headers.
+	'''
+
+	def _redirect(self):
+		_, _, status, target = self.path.split("/", 3)
+		self.send_response(int(status))
+		self.send_header("Location", f"/{target}")
+		self.send_header("Content-Length", "5")
+		self.end_headers()
+		self.wfile.write(b"moved")
+
+	def do_GET(self):
+		if self.path.startswith("/redirect/"):
+			return self._redirect()
+		if self.path == "/headers":
+			return self._send_body(",".join(sorted(self.headers.keys())).encode())
+		return super().do_GET()
+
+	def do_POST(self):
+		if self.path.startswith("/redirect/"):
+			self._read_request_body()
+			return self._redirect()
+		return super().do_POST()
+
+	do_PUT = do_POST
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_save_to_file(adapter_class, stream, tmp_path):
+	size = 1000000
+	path = tmp_path / "body"
+
+	with run_local_server() as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class())
+
+			r = s.get(f"{local_server}/bytes/{size}", headers={"X-Curl-Adapter-Save-To": str(path)}, stream=stream, timeout=10)
+			r.wait_for_body()
+
+			assert r.headers["Content-Length"] == str(size)
+			assert r.content == b""
+			assert path.read_bytes() == b"x" * size
+			assert r.curl_info["response_body_size"] == size
+
+			# A failed write aborts the transfer with its error
+			with pytest.raises(OSError) as error:
+				s.get(f"{local_server}/bytes/{size}", headers={"X-Curl-Adapter-Save-To": "/dev/full"}, stream=stream, timeout=10).content
+			assert not isinstance(error.value, requests.exceptions.RequestException)
+
+
+@pytest.mark.parametrize("stream", [False, True])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_save_to_file_after_redirects(adapter_class, stream, tmp_path):
+	size = 100000
+	path = tmp_path / "body"
+
+	with run_local_server(RedirectRequestHandler) as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class())
+
+			# Only the final response is saved
+			r = s.get(
+				f"{local_server}/redirect/302/redirect/307/bytes/{size}", 
+				headers={"X-Curl-Adapter-Save-To": str(path)}, stream=stream, timeout=10
+			)
+			r.wait_for_body()
+
+			assert [response.status_code for response in r.history] == [302, 307]
+			assert [response.content for response in r.history] == [b"moved", b"moved"]
+			assert r.status_code == 200
+			assert r.content == b""
+			assert path.read_bytes() == b"x" * size
+
+			# Never sent
+			r = s.get(f"{local_server}/redirect/302/headers", headers={"X-Curl-Adapter-Save-To": str(path)}, timeout=10)
+			assert r.content == b""
+			assert b"Host" in path.read_bytes()
+			assert b"X-Curl-Adapter" not in path.read_bytes()
+
+			# An empty final body makes an empty file
+			s.get(f"{local_server}/redirect/302/bytes/0", headers={"X-Curl-Adapter-Save-To": str(path)}, timeout=10)
+			assert path.read_bytes() == b""
+
+
+@pytest.mark.parametrize("stream_handler", [CurlStreamHandlerMulti, CurlStreamHandlerEventLoop, CurlStreamHandlerThreads, CurlStreamHandlerGevent])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_iter_content_without_chunk_size_yields_as_received(adapter_class, stream_handler):
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=stream_handler)
+
+		start = time.time()
+		r = adapter.send(requests.Request("GET", f"{local_server}/slow").prepare(), stream=True, timeout=10)
+
+		chunks = r.iter_content(chunk_size=None)
+		# The first half is yielded before the server's stall is over
+		assert next(chunks) == b"x" * 5
+		assert time.time() - start < 0.4
+
+		assert b"".join(chunks) == b"x" * 5
+
+		adapter.close()
+
+
+def test_stream_without_chunk_size_decodes_incrementally():
+	import gzip
+
+	body = b"".join(b"data: %d\n\n" % i for i in range(5000))
+	compressed = gzip.compress(body)
+	chunks = [compressed[i:i + 100] for i in range(0, len(compressed), 100)]
+
+	request = requests.Request("GET", "http://localhost/").prepare()
+	raw = CurlStreamResponse(
+		_queued_stream_handler(chunks),
+		request=request,
+		url=request.url,
+		method="GET",
+		headers=HTTPHeaderDict({"Content-Encoding": "gzip", "Content-Length": str(len(compressed))}),
+		header_list=[b"HTTP/1.1 200 OK"],
+		status=200,
+	)
+
+	decoded = list(raw.stream(None))
+	assert len(decoded) > 1
+	assert b"".join(decoded) == body
+	assert raw.length_remaining == 0
+
+
+@pytest.mark.parametrize("stream_handler", [CurlStreamHandlerMulti, CurlStreamHandlerEventLoop, CurlStreamHandlerThreads, CurlStreamHandlerGevent])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_spool_large_body_to_disk(adapter_class, stream_handler):
+	size = 4 * 1024 * 1024
+
+	with run_local_server() as local_server:
+		adapter = adapter_class(stream_handler=stream_handler, spool_threshold=64 * 1024)
+
+		r = adapter.send(requests.Request("GET", f"{local_server}/bytes/{size}").prepare(), stream=True, timeout=10)
+		r.wait_for_body()
+
+		handler = r.raw._fp
+		assert handler.peak_buffered_size <= 64 * 1024
+		assert handler.spooled_size >= size - 64 * 1024
+
+		received = 0
+		for chunk in r.iter_content(100 * 1024):
+			assert chunk == b"x" * len(chunk)
+			received += len(chunk)
+		assert received == size
+		assert handler._spool is None
+
+		# Small bodies stay in memory
+		r = adapter.send(requests.Request("GET", f"{local_server}/bytes/1000").prepare(), timeout=10)
+		assert r.content == b"x" * 1000
+		assert r.raw._fp.spooled_size == 0
+
+		adapter.close()
+
+
+def test_spool_keeps_chunk_order():
+	import curl_cffi
+
+	class StreamHandler(CurlStreamHandlerBase):
+		spool_threshold = 250
+
+	handler = StreamHandler(curl_cffi.Curl())
+	chunks = [bytes([i]) * 100 for i in range(10)]
+
+	for chunk in chunks[:5]:
+		handler._write_callback(chunk)
+	# Catching up, the next chunks are buffered in memory again
+	assert handler.read(450) == b"".join(chunks)[:450]
+	for chunk in chunks[5:]:
+		handler._write_callback(chunk)
+	handler._cleanup_after_perform()
+
+	assert handler.spooled_size == 600
+	assert handler.read() == b"".join(chunks)[450:]
+
+
+class CountingRequestHandler(LocalRequestHandler):
+	'''
+		Replies with the size of the request body, read in small pieces.
+	'''
+
+	def _count_request_body(self) -> int:
+		size = 0
+		if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+			while True:
+				chunk_size = int(self.rfile.readline().split(b";")[0], 16)
+				if chunk_size == 0:
+					self.rfile.readline()
+					return size
+				while chunk_size:
+					size += len(self.rfile.read(min(chunk_size, 65536)))
+					chunk_size -= min(chunk_size, 65536)
+				self.rfile.readline()
+
+		remaining = int(self.headers.get("Content-Length", 0))
+		while remaining:
+			size += len(self.rfile.read(min(remaining, 65536)))
+			remaining -= min(remaining, 65536)
+		return size
+
+	def do_POST(self):
+		return self._send_body(str(self._count_request_body()).encode())
+
+	do_PUT = do_POST
+
+
+@pytest.mark.parametrize("stream_handler", [CurlStreamHandlerMulti, CurlStreamHandlerEventLoop, CurlStreamHandlerThreads, CurlStreamHandlerGevent, CurlStreamHandlerBase])
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_streamed_request_body(adapter_class, stream_handler):
+	import tracemalloc
+
+	def body_chunks(count, size=65536):
+		for i in range(count):
+			yield bytes([i % 256]) * size
+
+	with run_local_server() as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class(stream_handler=stream_handler))
+
+			# Echoed, unknown length (chunked)
+			body = b"".join(body_chunks(10, 10000))
+			assert s.post(local_server, data=body_chunks(10, 10000), timeout=10).content == body
+			assert s.put(local_server, data=body_chunks(10, 10000), timeout=10).content == body
+
+			# Known length
+			assert s.put(local_server, data=io.BytesIO(body), timeout=10).content == body
+
+			# An error of the body is raised as is
+			def failing_body():
+				yield b"x"
+				raise ValueError("body error")
+
+			with pytest.raises(ValueError, match="body error"):
+				s.post(local_server, data=failing_body(), timeout=10)
+
+	with run_local_server(CountingRequestHandler) as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class(stream_handler=stream_handler))
+
+			tracemalloc.start()
+			try:
+				r = s.post(local_server, data=body_chunks(1024), timeout=30)
+				_, peak = tracemalloc.get_traced_memory()
+			finally:
+				tracemalloc.stop()
+
+			assert r.content == str(1024 * 65536).encode()
+			# 64 MB sent, a few chunks in memory at once
+			assert peak < 4 * 1024 * 1024
+
+
+class MultipartEchoRequestHandler(LocalRequestHandler):
+	'''
+		Echoes the request body, with its Content-Type.
+	'''
+
+	def do_POST(self):
+		body = self._read_request_body()
+		if self.path == "/redirect":
+			self.send_response(307)
+			self.send_header("Location", "/")
+			self.send_header("Content-Length", "0")
+			self.end_headers()
+			return
+		return self._send_body(body, content_type=self.headers.get("Content-Type", ""))
+
+
+def parse_multipart(content_type: str, body: bytes) -> list:
+	import email.parser
+	import email.policy
+
+	message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+		f"Content-Type: {content_type}\r\n\r\n".encode() + body
+	)
+	return [
+		(part.get_param("name", header="content-disposition"), part.get_filename(), part.get_payload(decode=True))
+		for part in message.iter_parts()
+	]
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_multipart_body(adapter_class, tmp_path):
+	from curl_adapter import CurlMultipart
+
+	path = tmp_path / "upload.bin"
+	path.write_bytes(bytes(range(256)) * 4096)
+
+	def files():
+		return {
+			"file": open(path, "rb"),
+			"named": ("custom.txt", io.BytesIO(b"in memory"), "text/plain"),
+			"raw": ("raw.bin", b"\0raw bytes"),
+		}
+	data = {"field": "value", "repeated": ["1", "2"]}
+
+	expected = requests.Request("POST", "http://localhost/", files=files(), data=data).prepare()
+	expected_parts = parse_multipart(expected.headers["Content-Type"], expected.body)
+
+	with run_local_server(MultipartEchoRequestHandler) as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class())
+
+			multipart = CurlMultipart(files=files(), data=data)
+			r = s.post(local_server, data=multipart, timeout=10)
+
+			assert r.headers["Content-Type"].startswith("multipart/form-data; boundary=")
+			assert parse_multipart(r.headers["Content-Type"], r.content) == expected_parts
+
+			# The file on disk is read by curl
+			assert [part.kind for part in multipart.parts] == ["data", "data", "data", "file", "stream", "data"]
+			# Freed with the transfer
+			assert multipart._mime is None
+
+			# Sent again, from the start of the stream parts
+			multipart = CurlMultipart(files=files(), data=data)
+			r = s.post(f"{local_server}/redirect", data=multipart, timeout=10)
+			assert r.history and r.history[0].status_code == 307
+			assert parse_multipart(r.headers["Content-Type"], r.content) == expected_parts
+
+			class Unseekable(io.RawIOBase):
+				def readable(self):
+					return True
+
+				def readinto(self, buffer):
+					return 0
+
+				def tell(self):
+					raise OSError("unseekable")
+
+			multipart = CurlMultipart(files={"stream": ("stream.bin", Unseekable())})
+			with pytest.raises(requests.exceptions.UnrewindableBodyError):
+				s.post(f"{local_server}/redirect", data=multipart, timeout=10)
+
+
+class ExpectRequestHandler(LocalRequestHandler):
+	'''
+		Rejects uploads to `/reject` with 413, before the body is sent when the client waits for `100 Continue`.
+	'''
+	expect_headers = []
+
+	def handle_expect_100(self):
+		if self.path == "/reject":
+			self.send_response(413)
+			self.send_header("Content-Length", "0")
+			self.send_header("Connection", "close")
+			self.end_headers()
+			return False
+		return super().handle_expect_100()
+
+	def do_POST(self):
+		self.expect_headers.append(self.headers.get("Expect"))
+		body = self._read_request_body()
+		if self.path == "/reject":
+			return self._send_body(b"", status=413)
+		return self._send_body(body)
+
+	do_PUT = do_POST
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_expect_continue(adapter_class):
+	size = 4 * 1024 * 1024
+	body = b"x" * size
+
+	with run_local_server(ExpectRequestHandler) as local_server:
+		with requests.Session() as s:
+			options = {"http_version": "v1"} if adapter_class is CurlCffiAdapter else {}  # No h2c upgrade, it doesn't wait
+			s.mount("http://", adapter_class(expect_continue_threshold=1024 * 1024, expect_continue_timeout=5, **options))
+
+			# Rejected before the body is sent
+			r = s.post(f"{local_server}/reject", data=body, timeout=10)
+			assert r.status_code == 413
+			assert r.curl_info["request_body_size"] == 0
+
+			r = s.put(f"{local_server}/reject", data=io.BytesIO(body), timeout=10)
+			assert r.status_code == 413
+			assert r.curl_info["request_body_size"] == 0
+
+			# Accepted, sent after `100 Continue`
+			ExpectRequestHandler.expect_headers.clear()
+			assert s.post(local_server, data=body, timeout=10).content == body
+			# Below the threshold, sent right away
+			assert s.post(local_server, data=b"small", timeout=10).content == b"small"
+			assert ExpectRequestHandler.expect_headers == ["100-continue", None]
+
+			# Disabled for a request, the whole body is sent
+			r = s.post(f"{local_server}/reject", data=body, headers={"X-Curl-Adapter-Expect-Continue-Threshold": "off"}, timeout=10)
+			assert r.status_code == 413
+			assert r.curl_info["request_body_size"] == size
+
+
+class ExpectRedirectRequestHandler(RedirectRequestHandler):
+	expect_headers = []
+
+	def do_POST(self):
+		self.expect_headers.append(self.headers.get("Expect"))
+		return super().do_POST()
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_expect_continue_after_redirects(adapter_class):
+	body = b"x" * 4096
+
+	ExpectRedirectRequestHandler.expect_headers.clear()
+
+	with run_local_server(ExpectRedirectRequestHandler) as local_server:
+		with requests.Session() as s:
+			options = {"http_version": "v1"} if adapter_class is CurlCffiAdapter else {}
+			s.mount("http://", adapter_class(**options))
+
+			# The per-request threshold holds for the resent body too
+			r = s.post(
+				f"{local_server}/redirect/307/redirect/308/echo", data=body, 
+				headers={"X-Curl-Adapter-Expect-Continue-Threshold": "1024"}, timeout=10
+			)
+			assert [response.status_code for response in r.history] == [307, 308]
+			assert r.content == body
+			assert ExpectRedirectRequestHandler.expect_headers == ["100-continue"] * 3
+
+
+class EncodingEchoRequestHandler(LocalRequestHandler):
+	'''
+		Echoes the request body as received, with its Content-Encoding in `X-Request-Content-Encoding`.
+	'''
+
+	def do_POST(self):
+		body = self._read_request_body()
+		self.send_response(200)
+		self.send_header("X-Request-Content-Encoding", self.headers.get("Content-Encoding", ""))
+		self.send_header("X-Request-Transfer-Encoding", self.headers.get("Transfer-Encoding", ""))
+		self.send_header("Content-Length", str(len(body)))
+		self.end_headers()
+		self.wfile.write(body)
+
+	do_PUT = do_POST
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_request_body_compression(adapter_class):
+	import gzip
+	import tracemalloc
+	import zlib
+	import brotli
+
+	body = b"".join(b'{"id": %d, "value": "%s"}\n' % (i, b"x" * (i % 50)) for i in range(20000))
+
+	def body_chunks(data, size=10000):
+		for offset in range(0, len(data), size):
+			yield data[offset:offset + size]
+
+	with run_local_server(EncodingEchoRequestHandler) as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class(request_compression={"127.0.0.1": "gzip", "*": "br"}))
+
+			# Whole body, with its compressed length
+			r = s.post(local_server, data=body, timeout=10)
+			assert r.headers["X-Request-Content-Encoding"] == "gzip"
+			assert r.headers["X-Request-Transfer-Encoding"] == ""
+			assert len(r.content) < len(body) / 5
+			assert gzip.decompress(r.content) == body
+
+			# Streamed
+			r = s.put(local_server, data=body_chunks(body), timeout=10)
+			assert r.headers["X-Request-Content-Encoding"] == "gzip"
+			assert r.headers["X-Request-Transfer-Encoding"] == "chunked"
+			assert gzip.decompress(r.content) == body
+
+			r = s.post(local_server, data=io.BytesIO(body), headers={"X-Curl-Adapter-Compress": "br"}, timeout=10)
+			assert r.headers["X-Request-Content-Encoding"] == "br"
+			assert brotli.decompress(r.content) == body
+
+			r = s.post(local_server, data=body, headers={"X-Curl-Adapter-Compress": "deflate"}, timeout=10)
+			assert zlib.decompress(r.content) == body
+
+			# Below the threshold, disabled, or already encoded
+			r = s.post(local_server, data=b"small", timeout=10)
+			assert (r.headers["X-Request-Content-Encoding"], r.content) == ("", b"small")
+
+			r = s.post(local_server, data=body, headers={"X-Curl-Adapter-Compress": "off"}, timeout=10)
+			assert (r.headers["X-Request-Content-Encoding"], r.content) == ("", body)
+
+			encoded = gzip.compress(body)
+			r = s.post(local_server, data=encoded, headers={"Content-Encoding": "gzip"}, timeout=10)
+			assert r.content == encoded
+
+			# The request itself is unchanged
+			assert r.request.body == encoded and "Transfer-Encoding" not in r.request.headers
+
+	with run_local_server(CountingRequestHandler) as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class(request_compression="gzip"))
+
+			chunk = b"".join(b'{"id": %d}\n' % i for i in range(6000))
+
+			tracemalloc.start()
+			try:
+				r = s.post(local_server, data=(chunk for _ in range(1000)), timeout=30)
+				_, peak = tracemalloc.get_traced_memory()
+			finally:
+				tracemalloc.stop()
+
+			# Over 60 MB compressed as it's sent
+			assert int(r.content) < len(chunk) * 1000 / 5
+			assert peak < 4 * 1024 * 1024
+
+
+class EncodingEchoRedirectRequestHandler(RedirectRequestHandler, EncodingEchoRequestHandler):
+	pass
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_request_body_compression_after_redirects(adapter_class):
+	import gzip
+
+	body = b"x" * 4096
+
+	with run_local_server(EncodingEchoRedirectRequestHandler) as local_server:
+		with requests.Session() as s:
+			s.mount("http://", adapter_class())
+
+			# The per-request encoding holds for the resent body too
+			r = s.post(f"{local_server}/redirect/307/redirect/308/echo", data=body, headers={"X-Curl-Adapter-Compress": "gzip"}, timeout=10)
+			assert [response.status_code for response in r.history] == [307, 308]
+			assert r.headers["X-Request-Content-Encoding"] == "gzip"
+			assert gzip.decompress(r.content) == body
+
+		with requests.Session() as s:
+			s.mount("http://", adapter_class(request_compression="gzip", request_compression_threshold=1024))
+
+			# The threshold is in bytes, 1200 here
+			r = s.post(local_server, data="é" * 600, timeout=10)
+			assert r.headers["X-Request-Content-Encoding"] == "gzip"
+			assert gzip.decompress(r.content) == ("é" * 600).encode()
+
+
+def test_rotating_adapter():
+	from curl_adapter import CurlCffiRotatingAdapter
+
+	profiles = {
+		"h2": {"impersonate_browser_type": "chrome", "weight": 2},
+		"h1": {"impersonate_browser_type": "chrome", "http_version": "v1"},
+	}
+
+	with run_local_server(HeaderNamesRequestHandler) as local_server:
+		with requests.Session() as s:
+			adapter = CurlCffiRotatingAdapter(profiles, policy="round_robin")
+			s.mount("http://", adapter)
+
+			responses = [s.get(local_server, timeout=10) for _ in range(6)]
+			assert [r.curl_profile for r in responses] == ["h2", "h1", "h2"] * 2
+			for r in responses:
+				assert ("HTTP2-Settings" in r.text.split(",")) == (r.curl_profile == "h2")
+
+			# A connection per profile, kept alive
+			ports = {}
+			for r in responses:
+				ports.setdefault(r.curl_profile, set()).add(r.curl_info["local_port"])
+			assert len(ports["h2"]) == len(ports["h1"]) == 1
+			assert ports["h2"] != ports["h1"]
+
+			r = s.get(local_server, headers={"X-Curl-Adapter-Profile": "h1"}, timeout=10)
+			assert r.curl_profile == "h1" and "X-Curl-Adapter-Profile" not in r.text.split(",")
+			with pytest.raises(ValueError):
+				s.get(local_server, headers={"X-Curl-Adapter-Profile": "firefox"}, timeout=10)
+
+		with CurlCffiRotatingAdapter(profiles, handle_pool_size=4, prewarm_handles=2) as adapter:
+			assert adapter.adapters["h1"].handle_pool.stats()["idle"] == 2
+			assert set(adapter.warm_up(local_server)) == {"h2", "h1"}
+			assert adapter.adapters["h1"].handle_pool.stats()["created"] == 2
+
+	with pytest.raises(ValueError):
+		CurlCffiRotatingAdapter(profiles, curl_share=["dns"])
+
+
+@contextmanager
+def run_local_tls_server(tmp_path, request_handler=LocalRequestHandler):
+	'''
+		HTTPS version of `run_local_server`, with a certificate of a new CA (openssl command line). Yields the URL & CA file.
+	'''
+	import shutil
+	import ssl
+	import subprocess
+
+	if not shutil.which("openssl"):
+		pytest.skip("The openssl command is required.")
+
+	def openssl(*args):
+		subprocess.run(["openssl", *args], cwd=tmp_path, check=True, capture_output=True)
+
+	openssl("req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", "ca.key", "-out", "ca.pem", "-days", "1", "-subj", "/CN=Test CA")
+	openssl("req", "-newkey", "rsa:2048", "-nodes", "-keyout", "server.key", "-out", "server.csr", "-subj", "/CN=127.0.0.1")
+	(tmp_path / "ext.cnf").write_text("subjectAltName=IP:127.0.0.1\n")
+	openssl(
+		"x509", "-req", "-in", "server.csr", "-CA", "ca.pem", "-CAkey", "ca.key", "-CAcreateserial",
+		"-out", "server.pem", "-days", "1", "-extfile", "ext.cnf"
+	)
+
+	context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+	context.load_cert_chain(tmp_path / "server.pem", tmp_path / "server.key")
+
+	server = LocalHTTPServer(("127.0.0.1", 0), request_handler)
+	server.socket = context.wrap_socket(server.socket, server_side=True)
+	thread = threading.Thread(target=server.serve_forever, daemon=True)
+	thread.start()
+
+	try:
+		yield f"https://127.0.0.1:{server.server_port}", str(tmp_path / "ca.pem")
+	finally:
+		server.shutdown()
+		server.server_close()
+
+
+@pytest.mark.parametrize("adapter_class", [CurlCffiAdapter, PyCurlAdapter])
+def test_cert_paths_checked_once(adapter_class, tmp_path, monkeypatch):
+	import os
+	import curl_adapter.ca_bundle
+
+	with run_local_tls_server(tmp_path) as (local_server, ca_file):
+		stat_calls = []
+		os_stat = os.stat
+		monkeypatch.setattr(curl_adapter.ca_bundle.os, "stat", lambda path: stat_calls.append(path) or os_stat(path))
+
+		with requests.Session() as s:
+			s.mount("https://", adapter_class(reuse_curl_handle=True))
+			for _ in range(3):
+				assert s.get(f"{local_server}/get", verify=ca_file, timeout=10).text == "ok"
+			assert stat_calls.count(ca_file) == 1
+
+			# Checked again after a while
+			monkeypatch.setattr(curl_adapter.ca_bundle, "PATH_CACHE_TTL", 0)
+			os.rename(ca_file, ca_file + ".old")
+			with pytest.raises(OSError):
+				s.get(f"{local_server}/get", verify=ca_file, timeout=10)
+
+
+def test_ca_bundle(tmp_path):
+	with run_local_tls_server(tmp_path) as (local_server, ca_file):
+		with open(ca_file, "rb") as f:
+			ca_data = f.read()
+
+		for ca_bundle in (ca_file, ca_data):
+			with requests.Session() as s:
+				s.trust_env = False # verify=True, not REQUESTS_CA_BUNDLE
+				s.mount("https://", CurlCffiAdapter(reuse_curl_handle=True, ca_bundle=ca_bundle))
+				for _ in range(2):
+					assert s.get(f"{local_server}/get", timeout=10).text == "ok"
+
+		# Loaded once, for every adapter
+		assert CurlCffiAdapter(ca_bundle=ca_file).ca_bundle is CurlCffiAdapter(ca_bundle=ca_file).ca_bundle
+
+		with requests.Session() as s:
+			s.trust_env = False
+			# Only the bundle is trusted (certifi's)
+			s.mount("https://", CurlCffiAdapter(reuse_curl_handle=True, ca_bundle=True))
+			with pytest.raises(requests.exceptions.SSLError):
+				s.get(f"{local_server}/get", timeout=10)
+
+			# Other bundles are loaded in memory too
+			assert s.get(f"{local_server}/get", verify=ca_file, timeout=10).text == "ok"
+			with pytest.raises(requests.exceptions.SSLError):
+				s.get(f"{local_server}/get", timeout=10)
+
+
+def test_ca_bundle_reloaded(tmp_path, monkeypatch):
+	import curl_adapter.ca_bundle
+	from curl_adapter.ca_bundle import CurlCABundle
+
+	monkeypatch.setattr(curl_adapter.ca_bundle, "PATH_CACHE_TTL", 0)
+
+	with run_local_tls_server(tmp_path) as (local_server, ca_file):
+		import certifi
+
+		rotated_file = str(tmp_path / "rotated.pem")
+		with open(certifi.where(), "rb") as f:
+			certifi_data = f.read()
+		with open(rotated_file, "wb") as f:
+			f.write(certifi_data)
+
+		with requests.Session() as s:
+			s.trust_env = False
+			s.mount("https://", CurlCffiAdapter(reuse_curl_handle=True, ca_bundle=rotated_file))
+			with pytest.raises(requests.exceptions.SSLError):
+				s.get(f"{local_server}/get", headers={"Connection": "close"}, timeout=10)
+
+			# The CA was added to the file
+			bundle = CurlCABundle.from_file(rotated_file)
+			with open(ca_file, "rb") as f:
+				ca_data = f.read()
+			with open(rotated_file, "wb") as f:
+				f.write(certifi_data + ca_data)
+
+			assert CurlCABundle.from_file(rotated_file) is not bundle
+			assert s.get(f"{local_server}/get", timeout=10).text == "ok"
+
+
+class SessionReusedRequestHandler(LocalRequestHandler):
+	def do_GET(self):
+		return self._send_body(str(self.connection.session_reused).encode())
+
+
+def test_tls_session_store(tmp_path):
+	import os
+	import stat
+	from curl_adapter.tls_sessions import CurlTLSSessionStore
+
+	store_path = str(tmp_path / "tls-sessions.json")
+
+	with run_local_tls_server(tmp_path, SessionReusedRequestHandler) as (local_server, ca_file):
+		def get(adapter):
+			s = requests.Session()
+			s.mount("https://", adapter)
+			return s.get(local_server, verify=ca_file, headers={"Connection": "close"}, timeout=10).text
+
+		adapter = CurlCffiAdapter(tls_session_store=CurlTLSSessionStore(store_path), tls_session_export_interval=0)
+		assert get(adapter) == "False"
+		assert get(adapter) == "True"
+		# Exported during the last request
+		assert os.path.exists(store_path)
+		adapter.close()
+		assert stat.S_IMODE(os.stat(store_path).st_mode) == 0o600
+
+		# Restarted
+		assert get(CurlCffiAdapter(curl_share=["ssl_session"])) == "False"
+		store = CurlTLSSessionStore(store_path)
+		assert store.sessions(adapter.tls_session_profile())
+		assert get(CurlCffiAdapter(tls_session_store=store)) == "True"
+
+		# Another profile
+		assert get(CurlCffiAdapter(tls_session_store=store, http_version="v1")) == "False"
+
+	with pytest.raises(ValueError):
+		CurlCffiAdapter(tls_session_store=store, curl_share=["dns"])